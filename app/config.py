@@ -6,6 +6,18 @@ class Settings:
     
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./vegakash.db")
+    # PostgreSQL: keep expenses partitioned by month (enable once with
+    # `python -m tools.partitions enable`); `tools.partitions create` (cron) adds the next
+    # PARTITION_MONTHS_AHEAD months and startup warns when any of them is missing
+    EXPENSE_PARTITIONING: bool = os.getenv("EXPENSE_PARTITIONING", "False").lower() == "true"
+    PARTITION_MONTHS_AHEAD: int = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+    # Apply migrations at startup; set to false in production and run
+    # `alembic upgrade head` as a separate deployment step instead
+    AUTO_CREATE_SCHEMA: bool = os.getenv("AUTO_CREATE_SCHEMA", "True").lower() == "true"
+    # PostgreSQL lock_timeout for migrations, so blocked DDL fails instead of stalling traffic
+    MIGRATION_LOCK_TIMEOUT: str = os.getenv("MIGRATION_LOCK_TIMEOUT", "5s")
+    # Configure mappers and open a DB connection before serving the first request
+    STARTUP_WARMUP: bool = os.getenv("STARTUP_WARMUP", "True").lower() == "true"
     
     # API Configuration
     API_TITLE: str = "VegaKash API"
@@ -27,6 +39,28 @@ class Settings:
     # OpenAI Configuration
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     
+    # AI model backend: openai, mock (offline, deterministic) or local (llama-cpp-python)
+    AI_BACKEND: str = os.getenv("AI_BACKEND", "openai").lower()
+    MODEL_NAME: str = os.getenv("MODEL_NAME", "gpt-3.5-turbo")
+    MOCK_LATENCY_MS: float = float(os.getenv("MOCK_LATENCY_MS", "300"))
+    MOCK_TOKENS: int = int(os.getenv("MOCK_TOKENS", "120"))
+    LOCAL_MODEL_PATH: str = os.getenv("LOCAL_MODEL_PATH", "")
+    # Mock backend: fraction of calls that raise, to rehearse upstream incidents
+    MOCK_ERROR_RATE: float = float(os.getenv("MOCK_ERROR_RATE", "0"))
+    # Seconds before a model call is abandoned (the route then falls back)
+    MODEL_TIMEOUT_SECONDS: float = float(os.getenv("MODEL_TIMEOUT_SECONDS", "10"))
+    
+    # Circuit breaker on model calls: opens when BREAKER_FAILURE_RATE of the last
+    # BREAKER_WINDOW calls failed or BREAKER_SLOW_CALL_RATE took over BREAKER_SLOW_CALL_SECONDS,
+    # sends requests straight to the fallback for BREAKER_OPEN_SECONDS, then probes
+    BREAKER_WINDOW: int = int(os.getenv("BREAKER_WINDOW", "20"))
+    BREAKER_MINIMUM_CALLS: int = int(os.getenv("BREAKER_MINIMUM_CALLS", "5"))
+    BREAKER_FAILURE_RATE: float = float(os.getenv("BREAKER_FAILURE_RATE", "0.5"))
+    BREAKER_SLOW_CALL_RATE: float = float(os.getenv("BREAKER_SLOW_CALL_RATE", "0.5"))
+    BREAKER_SLOW_CALL_SECONDS: float = float(os.getenv("BREAKER_SLOW_CALL_SECONDS", "5"))
+    BREAKER_OPEN_SECONDS: float = float(os.getenv("BREAKER_OPEN_SECONDS", "30"))
+    BREAKER_HALF_OPEN_CALLS: int = int(os.getenv("BREAKER_HALF_OPEN_CALLS", "2"))
+    
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
     
@@ -34,9 +68,50 @@ class Settings:
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
     DEBUG: bool = os.getenv("DEBUG", "True").lower() == "true"
     
+    # Response compression (bytes); brotli is used when brotli-asgi is installed
+    COMPRESSION_MINIMUM_SIZE: int = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1000"))
+    
+    # Seconds a /health database ping result is reused
+    HEALTH_CACHE_SECONDS: float = float(os.getenv("HEALTH_CACHE_SECONDS", "5"))
+    
+    # Seconds memoized AI spending features are trusted while the change-log version
+    # is unchanged (bounds staleness from writes made outside the API)
+    FEATURES_CACHE_SECONDS: float = float(os.getenv("FEATURES_CACHE_SECONDS", "60"))
+    
+    # Chat answers reused for similar questions asked against the same spending data
+    CHAT_CACHE_SIZE: int = int(os.getenv("CHAT_CACHE_SIZE", "256"))
+    CHAT_CACHE_THRESHOLD: float = float(os.getenv("CHAT_CACHE_THRESHOLD", "0.85"))
+    CHAT_CACHE_SECONDS: float = float(os.getenv("CHAT_CACHE_SECONDS", "3600"))
+    
+    # Group commit for POST /expenses: concurrent single inserts wait up to
+    # WRITE_BATCH_MAX_DELAY_MS and are committed together, at most WRITE_BATCH_MAX_SIZE at a time.
+    # Each waiting request holds one of AnyIO's 40 worker threads, so keep the size below that
+    WRITE_BATCHING: bool = os.getenv("WRITE_BATCHING", "False").lower() == "true"
+    WRITE_BATCH_MAX_SIZE: int = int(os.getenv("WRITE_BATCH_MAX_SIZE", "32"))
+    WRITE_BATCH_MAX_DELAY_MS: float = float(os.getenv("WRITE_BATCH_MAX_DELAY_MS", "5"))
+    
+    # Embedded DuckDB copy of expenses for analytics (needs duckdb), synced from the change
+    # log every DUCKDB_SYNC_SECONDS; analytics use the primary while it lags more than DUCKDB_MAX_LAG_SECONDS
+    DUCKDB_MIRROR: bool = os.getenv("DUCKDB_MIRROR", "False").lower() == "true"
+    DUCKDB_PATH: str = os.getenv("DUCKDB_PATH", ":memory:")
+    DUCKDB_SYNC_SECONDS: float = float(os.getenv("DUCKDB_SYNC_SECONDS", "5"))
+    DUCKDB_MAX_LAG_SECONDS: float = float(os.getenv("DUCKDB_MAX_LAG_SECONDS", "30"))
+    
+    # Cold archive: `python -m tools.archive` moves expenses older than ARCHIVE_AFTER_DAYS
+    # into Parquet files (needs pyarrow), kept in ARCHIVE_DIR or an Azure Blob container
+    ARCHIVE_AFTER_DAYS: int = int(os.getenv("ARCHIVE_AFTER_DAYS", "730"))
+    ARCHIVE_BACKEND: str = os.getenv("ARCHIVE_BACKEND", "local").lower()
+    ARCHIVE_DIR: str = os.getenv("ARCHIVE_DIR", "./archive")
+    AZURE_STORAGE_CONNECTION_STRING: str = os.getenv("AZURE_STORAGE_CONNECTION_STRING", "")
+    ARCHIVE_CONTAINER: str = os.getenv("ARCHIVE_CONTAINER", "expense-archive")
+    
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     
+    # Instrumentation: Server-Timing response header and slow request logging (ms)
+    SERVER_TIMING: bool = os.getenv("SERVER_TIMING", "True").lower() == "true"
+    SLOW_REQUEST_MS: float = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+    
     # Azure App Service specific
     PORT: int = int(os.getenv("PORT", "8000"))
 
@@ -1,11 +1,18 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from app.routes.expense_routes import router as expense_router
+from app.routes.expense_routes import EXPENSE_INSERTS, router as expense_router
 from app.routes.ai_routes import router as ai_router
-from app.utils.database import engine, Base
+from app.routes.dashboard_routes import router as dashboard_router
+from app.utils.database import SessionLocal, engine, check_database, init_schema, warm_up_database
+from app.services import analytics_mirror, partitions
+from app.utils import categories
+from app.utils.metrics import CONTENT_TYPE, render_prometheus
+from app.utils.instrumentation import InstrumentedRoute, TimingMiddleware, install_sqlalchemy_hooks
 from app.schemas import ErrorResponse
 from app.config import settings
 import logging
@@ -19,12 +26,48 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Create database tables
-try:
-    Base.metadata.create_all(bind=engine)
-    logger.info("Database tables created successfully")
-except Exception as e:
-    logger.error(f"Error creating database tables: {e}")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Prepare the database before serving requests, instead of at import time"""
+    if settings.AUTO_CREATE_SCHEMA:
+        try:
+            method = init_schema()
+            logger.info(f"Database schema is up to date ({method})")
+        except Exception as e:
+            logger.error(f"Error creating database tables: {e}")
+
+    try:
+        count = categories.load(engine)
+        logger.info(f"Loaded {count} expense categories")
+    except Exception as e:
+        logger.warning(f"Could not load categories, using built-in defaults: {e}")
+
+    if settings.EXPENSE_PARTITIONING:
+        # Read-only check; partitions are created by `python -m tools.partitions create` (cron)
+        try:
+            with SessionLocal() as db:
+                missing = partitions.missing_months(db, settings.PARTITION_MONTHS_AHEAD)
+            if missing:
+                logger.warning(
+                    f"Missing expense partitions: {', '.join(partitions.partition_name(month) for month in missing)} "
+                    "(run `python -m tools.partitions create`)"
+                )
+        except Exception as e:
+            logger.warning(f"Could not check expense partitions: {e}")
+
+    if analytics_mirror.start(SessionLocal):
+        logger.info("DuckDB analytics mirror sync started")
+
+    if settings.STARTUP_WARMUP:
+        try:
+            warm_up_database()
+        except Exception as e:
+            logger.warning(f"Database warm-up failed: {e}")
+
+    yield
+    analytics_mirror.stop()
+    EXPENSE_INSERTS.close()
+    engine.dispose()
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -32,9 +75,13 @@ app = FastAPI(
     description=settings.API_DESCRIPTION,
     version=settings.API_VERSION,
     docs_url="/docs" if settings.DEBUG else None,
-    redoc_url="/redoc" if settings.DEBUG else None
+    redoc_url="/redoc" if settings.DEBUG else None,
+    lifespan=lifespan
 )
 
+app.router.route_class = InstrumentedRoute
+install_sqlalchemy_hooks(engine)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -44,6 +91,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses (list and analytics payloads); prefer brotli when available
+try:
+    from brotli_asgi import BrotliMiddleware
+    app.add_middleware(BrotliMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE, gzip_fallback=True)
+except ImportError:
+    app.add_middleware(GZipMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+
+# Per-request timing (outermost, so it covers every other middleware)
+app.add_middleware(TimingMiddleware)
+
 # Custom exception handlers
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -103,6 +160,7 @@ async def general_exception_handler(request: Request, exc: Exception):
 # Include routers - Note: removed /api/v1 prefix to match frontend expectations
 app.include_router(expense_router, tags=["Expenses"])
 app.include_router(ai_router, tags=["AI Insights"])
+app.include_router(dashboard_router, tags=["Dashboard"])
 
 @app.get("/")
 def read_root():
@@ -117,21 +175,30 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    """Health check endpoint"""
-    try:
-        # You could add database connectivity check here
-        return {
-            "status": "healthy",
-            "message": "VegaKash API is running successfully",
-            "timestamp": "2024-11-01T00:00:00Z"
-        }
-    except Exception as e:
-        logger.error(f"Health check failed: {e}")
+    """Health check endpoint with a cached database ping"""
+    database = check_database()
+    if database["status"] != "ok":
+        logger.error(f"Health check failed: {database['error']}")
         return JSONResponse(
             status_code=503,
             content={
                 "status": "unhealthy",
                 "message": "Service unavailable",
-                "error": str(e)
+                "error": database["error"],
+                "timestamp": database["checked_at"]
             }
-        )
\ No newline at end of file
+        )
+    return {
+        "status": "healthy",
+        "message": "VegaKash API is running successfully",
+        "timestamp": database["checked_at"],
+        "database": {
+            "status": database["status"],
+            "latency_ms": database["latency_ms"]
+        }
+    }
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics endpoint"""
+    return PlainTextResponse(render_prometheus(), media_type=CONTENT_TYPE)
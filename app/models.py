@@ -1,90 +1,96 @@
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Text, Index, CheckConstraint
+from sqlalchemy import (BigInteger, Column, Integer, SmallInteger, String, Date, DateTime, Text, Index,
+                        CheckConstraint, ForeignKey, event, insert, select)
 from sqlalchemy.sql import func
-from sqlalchemy.orm import validates
+from sqlalchemy.ext.hybrid import hybrid_property
 from app.utils.database import Base
+from app.utils import categories
+from app.utils.money import from_paise, to_paise
+from app.utils.validation import expense_values
 from datetime import datetime
-import re
+
+class Category(Base):
+    """
+    Lookup table of expense categories, cached in app.utils.categories
+    """
+    __tablename__ = "categories"
+
+    id = Column(SmallInteger, primary_key=True, autoincrement=False)
+    name = Column(String(50), nullable=False, unique=True)
+
+    def __repr__(self):
+        return f"<Category(id={self.id}, name='{self.name}')>"
+
+
+@event.listens_for(Category.__table__, "after_create")
+def _seed_categories(table, connection, **kw):
+    """Seed the default categories when the table is created outside of migrations"""
+    connection.execute(insert(table), [{"id": i, "name": name} for i, name in categories.DEFAULT_CATEGORIES])
+
 
 class Expense(Base):
     """
-    Expense model for storing financial expense records with optimizations and constraints
+    Expense model for storing financial expense records with optimizations and constraints.
+
+    Field validation lives in app.utils.validation (run once per write by the
+    routes), not in per-attribute ORM hooks.
     """
     __tablename__ = "expenses"
 
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    title = Column(String(200), nullable=False, index=True)
-    category = Column(String(100), nullable=False, index=True)
-    amount = Column(Float, nullable=False)
-    date = Column(Date, nullable=False, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    title = Column(String(200), nullable=False)
+    category_id = Column(SmallInteger, ForeignKey("categories.id", name="fk_expenses_category_id"), nullable=False)
+    # Stored in integer paise so SUM() is exact; use the `amount` hybrid for rupees
+    amount_paise = Column(BigInteger, nullable=False)
+    date = Column(Date, nullable=False)
     description = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    # Row version for optimistic concurrency (ETag / If-Match); bumped by every API update
+    version = Column(Integer, server_default="1", nullable=False)
 
-    # Add composite indexes for better query performance
+    # Composite indexes also serve lookups on their leading column, so the
+    # single-column category_id/date indexes are not needed (see tools/index_advisor.py)
     __table_args__ = (
-        Index('idx_expense_category_date', 'category', 'date'),
-        Index('idx_expense_date_amount', 'date', 'amount'),
+        Index('idx_expense_category_date', 'category_id', 'date'),
+        Index('idx_expense_date_amount', 'date', 'amount_paise'),
         Index('idx_expense_created_at', 'created_at'),
-        Index('idx_expense_amount_desc', 'amount'),
+        Index('idx_expense_amount_desc', 'amount_paise'),
         Index('idx_expense_title_search', 'title'),
         # Add database-level constraints
-        CheckConstraint('amount > 0', name='check_positive_amount'),
+        CheckConstraint('amount_paise > 0', name='check_positive_amount'),
         CheckConstraint('length(title) > 0', name='check_non_empty_title'),
     )
 
-    @validates('title')
-    def validate_title(self, key, title):
-        """Validate title field"""
-        if not title or not title.strip():
-            raise ValueError("Title cannot be empty")
-        # Remove extra whitespace and limit length
-        cleaned_title = re.sub(r'\s+', ' ', title.strip())
-        if len(cleaned_title) > 200:
-            raise ValueError("Title cannot exceed 200 characters")
-        return cleaned_title
-
-    @validates('category')
-    def validate_category(self, key, category):
-        """Validate category field with mapping for old category names"""
-        # Map old category names to new ones
-        category_mapping = {
-            'Food & Dining': 'Food',
-            'Bills & Utilities': 'Utilities',
-            'Others': 'Other',
-            'Travel': 'Other'  # Map Travel to Other since it's not in our list
-        }
-        
-        # Apply mapping if category exists in mapping
-        if category in category_mapping:
-            category = category_mapping[category]
-        
-        allowed_categories = [
-            'Food', 'Transportation', 'Entertainment', 'Shopping', 
-            'Healthcare', 'Education', 'Utilities', 'Other'
-        ]
-        if category not in allowed_categories:
-            raise ValueError(f"Category must be one of: {', '.join(allowed_categories)}")
-        return category
-
-    @validates('amount')
-    def validate_amount(self, key, amount):
-        """Validate amount field"""
-        if amount <= 0:
-            raise ValueError("Amount must be positive")
-        if amount > 1000000:
-            raise ValueError("Amount cannot exceed ₹10,00,000")
-        # Round to 2 decimal places
-        return round(float(amount), 2)
-
-    @validates('description')
-    def validate_description(self, key, description):
-        """Validate description field"""
-        if description is not None:
-            cleaned_desc = description.strip()
-            if len(cleaned_desc) > 500:
-                raise ValueError("Description cannot exceed 500 characters")
-            return cleaned_desc if cleaned_desc else None
-        return description
+    @hybrid_property
+    def category(self):
+        """Category name, resolved through the in-memory category registry"""
+        return categories.category_name(self.category_id)
+
+    @category.inplace.setter
+    def _category_setter(self, value):
+        # Maps old category names and raises ValueError for unknown ones
+        self.category_id = categories.category_id(value)
+
+    @category.inplace.expression
+    @classmethod
+    def _category_expression(cls):
+        return select(Category.name).where(Category.id == cls.category_id).scalar_subquery()
+
+    @hybrid_property
+    def amount(self):
+        """Amount in rupees (display value; exact arithmetic should use amount_paise)"""
+        if self.amount_paise is None:
+            return None
+        return float(from_paise(self.amount_paise))
+
+    @amount.inplace.setter
+    def _amount_setter(self, value):
+        self.amount_paise = to_paise(value)
+
+    @amount.inplace.expression
+    @classmethod
+    def _amount_expression(cls):
+        return cls.amount_paise / 100.0
 
     def __repr__(self):
         return f"<Expense(id={self.id}, title='{self.title}', category='{self.category}', amount={self.amount}, date='{self.date}')>"
@@ -117,10 +123,7 @@ class Expense(Base):
     @classmethod
     def get_category_choices(cls):
         """Get list of valid category choices"""
-        return [
-            'Food', 'Transportation', 'Entertainment', 'Shopping', 
-            'Healthcare', 'Education', 'Utilities', 'Other'
-        ]
+        return categories.names()
 
     def to_dict(self, include_computed=True):
         """Convert model instance to dictionary"""
@@ -147,10 +150,9 @@ class Expense(Base):
 
     def update_from_dict(self, data):
         """Update instance from dictionary"""
-        allowed_fields = ['title', 'category', 'amount', 'date', 'description']
-        for field, value in data.items():
-            if field in allowed_fields and value is not None:
-                setattr(self, field, value)
+        provided = {field: value for field, value in data.items() if value is not None}
+        for column, value in expense_values(provided, partial=True).items():
+            setattr(self, column, value)
 
     @classmethod
     def search_expenses(cls, session, query_text, limit=50):
@@ -164,7 +166,9 @@ class Expense(Base):
     @classmethod
     def get_expenses_by_category(cls, session, category, limit=None):
         """Get expenses filtered by category"""
-        query = session.query(cls).filter(cls.category == category).order_by(cls.date.desc())
+        query = session.query(cls).filter(
+            cls.category_id == categories.category_id(category)
+        ).order_by(cls.date.desc())
         if limit:
             query = query.limit(limit)
         return query.all()
@@ -176,4 +180,60 @@ class Expense(Base):
         cutoff_date = date.today() - timedelta(days=days)
         return session.query(cls).filter(
             cls.date >= cutoff_date
-        ).order_by(cls.date.desc()).limit(limit).all()
\ No newline at end of file
+        ).order_by(cls.date.desc()).limit(limit).all()
+
+class ExpenseChange(Base):
+    """
+    Append-only log of expense writes, read by GET /expenses/changes.
+    The autoincrement version orders the feed (see app.services.change_log).
+    """
+    __tablename__ = "expense_changes"
+
+    version = Column(Integer, primary_key=True, autoincrement=True)
+    # No foreign key: delete entries outlive the expense they tombstone
+    expense_id = Column(Integer, nullable=False)
+    operation = Column(String(10), nullable=False)
+    changed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        CheckConstraint("operation IN ('insert', 'update', 'delete', 'archive')", name='check_change_operation'),
+        # Never reuse a version on SQLite, even if the newest log rows are deleted
+        {'sqlite_autoincrement': True},
+    )
+
+    def __repr__(self):
+        return f"<ExpenseChange(version={self.version}, expense_id={self.expense_id}, operation='{self.operation}')>"
+
+
+class ExpenseRollup(Base):
+    """
+    Daily per-category totals of archived expenses (see app.services.archive).
+    The rows themselves live in Parquet files; analytics add these rollups
+    to the live expenses so totals still cover the whole history.
+    """
+    __tablename__ = "expense_rollups"
+
+    date = Column(Date, primary_key=True)
+    category_id = Column(SmallInteger, ForeignKey("categories.id", name="fk_expense_rollups_category_id"), primary_key=True)
+    total_paise = Column(BigInteger, nullable=False)
+    expense_count = Column(Integer, nullable=False)
+    max_paise = Column(BigInteger, nullable=False)
+
+    def __repr__(self):
+        return f"<ExpenseRollup(date='{self.date}', category_id={self.category_id}, count={self.expense_count})>"
+
+
+class ExpenseArchive(Base):
+    """Manifest of Parquet files holding archived expenses"""
+    __tablename__ = "expense_archives"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(200), nullable=False, unique=True)
+    first_date = Column(Date, nullable=False)
+    last_date = Column(Date, nullable=False)
+    row_count = Column(Integer, nullable=False)
+    size_bytes = Column(BigInteger, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<ExpenseArchive(name='{self.name}', first_date='{self.first_date}', last_date='{self.last_date}')>"
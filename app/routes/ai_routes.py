@@ -1,27 +1,62 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from app.models import Expense
+from app.services import circuit_breaker, dashboard
+from app.services.model_backends import get_backend
+from app.services.semantic_cache import SemanticCache
+from app.services.spending_features import get_features
 from app.utils.database import get_db
+from app.utils.instrumentation import InstrumentedRoute, span
+from app.utils.metrics import Counter, Gauge, Histogram, record_cache_lookup
 from app.schemas import InsightData
+from app.config import settings
 import json
-import os
-from typing import List, Dict, Any
-from datetime import datetime, timedelta
+import time
+from datetime import datetime
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
-
-def generate_fallback_insights(expenses, category_totals, total_spent):
-    """Generate rule-based insights when AI is not available."""
-    avg_amount = total_spent / len(expenses) if expenses else 0
+router = APIRouter(route_class=InstrumentedRoute)
+
+MODEL_REQUESTS = Counter(
+    "ai_model_requests_total", "Chat completion calls by model backend and outcome", labelnames=("backend", "outcome")
+)
+MODEL_LATENCY = Histogram(
+    "ai_model_request_duration_seconds",
+    "Chat completion latency by model backend",
+    labelnames=("backend",),
+    buckets=(0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0, 30.0),
+)
+AI_FALLBACKS = Counter("ai_fallback_total", "Responses served by the rule-based fallback", labelnames=("endpoint",))
+
+# Sends requests straight to the rule-based fallbacks while the model backend is failing or slow
+MODEL_BREAKER = circuit_breaker.CircuitBreaker(
+    "model",
+    window=settings.BREAKER_WINDOW,
+    minimum_calls=settings.BREAKER_MINIMUM_CALLS,
+    failure_rate=settings.BREAKER_FAILURE_RATE,
+    slow_call_rate=settings.BREAKER_SLOW_CALL_RATE,
+    slow_call_seconds=settings.BREAKER_SLOW_CALL_SECONDS,
+    open_seconds=settings.BREAKER_OPEN_SECONDS,
+    half_open_calls=settings.BREAKER_HALF_OPEN_CALLS,
+)
+MODEL_BREAKER_STATE = Gauge(
+    "ai_model_circuit_state",
+    "Model circuit breaker state (0 closed, 1 half-open, 2 open)",
+    callback=lambda: {(): circuit_breaker.STATE_VALUES[MODEL_BREAKER.state]},
+)
+
+def generate_fallback_insights(features):
+    """Generate rule-based insights from spending features when AI is not available."""
+    total_spent = features.total_spent
+    category_totals = features.category_totals
+    avg_amount = features.average_expense
     
     # Generate patterns
     patterns = [
-        f"You've made {len(expenses)} expense entries",
+        f"You've made {features.expense_count} expense entries",
         f"Average expense amount: ₹{avg_amount:.2f}",
     ]
     
@@ -31,9 +66,8 @@ def generate_fallback_insights(expenses, category_totals, total_spent):
     
     # Generate outliers
     outliers = []
-    if expenses:
-        amounts = [e.amount for e in expenses]
-        max_amount = max(amounts)
+    if not features.is_empty:
+        max_amount = features.max_expense
         if max_amount > avg_amount * 3:
             outliers.append(f"High expense detected: ₹{max_amount:.2f}")
         
@@ -62,34 +96,46 @@ def generate_fallback_insights(expenses, category_totals, total_spent):
         "suggestions": suggestions[:5]  # Limit to 5 suggestions
     }
 
-# Initialize OpenAI client only if API key is available
-openai_client = None
-openai_available = False
-
-if os.getenv("OPENAI_API_KEY"):
+CHAT_CACHE = SemanticCache(
+    max_entries=settings.CHAT_CACHE_SIZE,
+    threshold=settings.CHAT_CACHE_THRESHOLD,
+    ttl_seconds=settings.CHAT_CACHE_SECONDS,
+)
+
+def model_backend():
+    """The model backend to try, or None when it is unavailable or its circuit is open."""
+    backend = get_backend()
+    if backend is None or not MODEL_BREAKER.allows_requests():
+        return None
+    return backend
+
+def _chat_completion(messages, temperature, max_tokens):
+    """Run a chat completion on the configured model backend, timed as the request's "model" span."""
+    backend = get_backend()
+    start = time.perf_counter()
+    outcome = "error"
     try:
-        from openai import OpenAI
-        openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        openai_available = True
-        logger.info("✅ OpenAI client initialized successfully")
-    except ImportError as e:
-        logger.warning(f"❌ OpenAI library not available: {e}")
-        openai_client = None
-        openai_available = False
-    except Exception as e:
-        logger.error(f"❌ Error initializing OpenAI client: {e}")
-        openai_client = None
-        openai_available = False
-else:
-    logger.warning("❌ OPENAI_API_KEY not found in environment variables")
+        with span("model"):
+            content = MODEL_BREAKER.call(
+                lambda: backend.complete(messages, temperature=temperature, max_tokens=max_tokens)
+            )
+        outcome = "success"
+        return content
+    except circuit_breaker.CircuitOpenError:
+        outcome = "short_circuited"
+        raise
+    finally:
+        MODEL_REQUESTS.inc(backend.name, outcome)
+        if outcome != "short_circuited":
+            MODEL_LATENCY.observe(time.perf_counter() - start, backend.name)
 
 @router.post("/ai/insights", response_model=InsightData)
 def generate_insights(db: Session = Depends(get_db)):
     """Generate AI-powered financial insights from expense data."""
     try:
-        expenses = db.query(Expense).all()
+        features = get_features(db)
         
-        if not expenses:
+        if features.is_empty:
             return InsightData(
                 total_spent=0.0,
                 top_categories=[],
@@ -98,30 +144,14 @@ def generate_insights(db: Session = Depends(get_db)):
                 suggestions=["Start adding expenses to get personalized insights"]
             )
         
-        # Calculate total spent
-        total_spent = sum(expense.amount for expense in expenses)
-        
-        # Get top categories
-        category_totals = {}
-        for expense in expenses:
-            category_totals[expense.category] = category_totals.get(expense.category, 0) + expense.amount
-        
-        top_categories = sorted(category_totals.items(), key=lambda x: x[1], reverse=True)[:3]
-        top_categories = [f"{cat}: ₹{amount:.2f}" for cat, amount in top_categories]
+        total_spent = features.total_spent
+        top_categories = [f"{cat}: ₹{amount:.2f}" for cat, amount in features.top_categories(3)]
         
         # Prepare data for AI analysis
-        data = [
-            {
-                "title": e.title,
-                "category": e.category,
-                "amount": e.amount,
-                "date": e.date.isoformat(),
-                "description": e.description or ""
-            } for e in expenses
-        ]
-
-        # Try to use OpenAI if available
-        if openai_available and openai_client:
+        data = list(features.sample_transactions)
+
+        # Try the AI model backend if available
+        if model_backend() is not None:
             try:
                 # Enhanced prompt for better insights
                 prompt = f"""
@@ -130,8 +160,8 @@ def generate_insights(db: Session = Depends(get_db)):
                 
                 EXPENSE DATA SUMMARY:
                 - Total Amount Spent: ₹{total_spent:.2f}
-                - Number of Transactions: {len(expenses)}
-                - Time Period: {expenses[0].date} to {expenses[-1].date}
+                - Number of Transactions: {features.expense_count}
+                - Time Period: {features.first_date} to {features.last_date}
                 - Top Categories: {', '.join([cat.split(':')[0] for cat in top_categories[:3]])}
                 
                 DETAILED TRANSACTIONS:
@@ -165,8 +195,7 @@ def generate_insights(db: Session = Depends(get_db)):
                 Return ONLY the JSON object, no additional text or formatting.
                 """
 
-                response = openai_client.chat.completions.create(
-                    model="gpt-3.5-turbo",
+                ai_content = _chat_completion(
                     messages=[
                         {
                             "role": "system", 
@@ -181,8 +210,6 @@ def generate_insights(db: Session = Depends(get_db)):
                     max_tokens=1200
                 )
 
-                ai_content = response.choices[0].message.content.strip()
-                
                 # Clean the response to ensure it's valid JSON
                 if ai_content.startswith('```json'):
                     ai_content = ai_content.replace('```json', '').replace('```', '').strip()
@@ -197,7 +224,8 @@ def generate_insights(db: Session = Depends(get_db)):
                     
                 except (json.JSONDecodeError, ValueError) as e:
                     logger.error(f"AI response parsing error: {e}")
-                    ai_insights = generate_fallback_insights(expenses, category_totals, total_spent)
+                    AI_FALLBACKS.inc("insights")
+                    ai_insights = generate_fallback_insights(features)
                 
                 return InsightData(
                     total_spent=total_spent,
@@ -208,12 +236,13 @@ def generate_insights(db: Session = Depends(get_db)):
                 )
                 
             except Exception as e:
-                logger.error(f"OpenAI API error: {e}")
+                logger.error(f"AI model error: {e}")
                 # Fallback to rule-based insights
                 pass
         
         # Fallback: Generate rule-based insights
-        ai_insights = generate_fallback_insights(expenses, category_totals, total_spent)
+        AI_FALLBACKS.inc("insights")
+        ai_insights = generate_fallback_insights(features)
         
         return InsightData(
             total_spent=total_spent,
@@ -231,33 +260,8 @@ def generate_insights(db: Session = Depends(get_db)):
 def get_spending_trends(days: int = 30, db: Session = Depends(get_db)):
     """Get spending trends over the specified number of days."""
     try:
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        
-        expenses = db.query(Expense).filter(
-            Expense.date >= start_date.date(),
-            Expense.date <= end_date.date()
-        ).all()
-        
-        # Group by date
-        daily_spending = {}
-        for expense in expenses:
-            date_str = expense.date.isoformat()
-            daily_spending[date_str] = daily_spending.get(date_str, 0) + expense.amount
-        
-        # Group by category for the period
-        category_spending = {}
-        for expense in expenses:
-            category_spending[expense.category] = category_spending.get(expense.category, 0) + expense.amount
-        
-        return {
-            "period_days": days,
-            "total_expenses": len(expenses),
-            "total_amount": sum(expense.amount for expense in expenses),
-            "daily_spending": daily_spending,
-            "category_breakdown": category_spending,
-            "average_daily": sum(daily_spending.values()) / max(len(daily_spending), 1)
-        }
+        features = get_features(db, *dashboard.trend_period(days))
+        return dashboard.spending_trends(features, days)
         
     except Exception as e:
         logger.error(f"Error getting spending trends: {str(e)}")
@@ -267,40 +271,31 @@ def get_spending_trends(days: int = 30, db: Session = Depends(get_db)):
 def generate_savings_suggestions(db: Session = Depends(get_db)):
     """Generate AI-powered savings suggestions based on expense patterns."""
     try:
-        expenses = db.query(Expense).all()
+        features = get_features(db)
         
-        if not expenses:
+        if features.is_empty:
             return {
                 "suggestions": ["Start tracking expenses to get personalized savings suggestions"],
                 "potential_savings": 0,
                 "priority_areas": []
             }
         
-        # Calculate category spending
-        category_totals = {}
-        monthly_expenses = {}
-        
-        for expense in expenses:
-            category_totals[expense.category] = category_totals.get(expense.category, 0) + expense.amount
-            month_key = expense.date.strftime("%Y-%m")
-            if month_key not in monthly_expenses:
-                monthly_expenses[month_key] = 0
-            monthly_expenses[month_key] += expense.amount
-        
-        total_spent = sum(expense.amount for expense in expenses)
-        avg_monthly = sum(monthly_expenses.values()) / len(monthly_expenses) if monthly_expenses else 0
+        category_totals = features.category_totals
+        monthly_expenses = features.monthly_totals
+        total_spent = features.total_spent
+        avg_monthly = features.monthly_average
         
         # Prepare data for AI
         expense_data = {
             "total_spent": total_spent,
             "average_monthly": avg_monthly,
-            "top_categories": dict(sorted(category_totals.items(), key=lambda x: x[1], reverse=True)[:5]),
+            "top_categories": dict(features.top_categories(5)),
             "monthly_breakdown": monthly_expenses,
-            "expense_count": len(expenses)
+            "expense_count": features.expense_count
         }
         
-        # Try to use OpenAI for savings suggestions
-        if openai_available and openai_client:
+        # Try the AI model backend for savings suggestions
+        if model_backend() is not None:
             try:
                 prompt = f"""
                 As a financial advisor, analyze this expense data and provide specific savings recommendations:
@@ -326,8 +321,7 @@ def generate_savings_suggestions(db: Session = Depends(get_db)):
                 Focus on realistic, achievable savings with specific amounts.
                 """
                 
-                response = openai_client.chat.completions.create(
-                    model="gpt-3.5-turbo",
+                ai_content = _chat_completion(
                     messages=[
                         {"role": "system", "content": "You are a financial advisor providing specific savings recommendations. Return only JSON."},
                         {"role": "user", "content": prompt}
@@ -336,8 +330,6 @@ def generate_savings_suggestions(db: Session = Depends(get_db)):
                     max_tokens=800
                 )
                 
-                ai_content = response.choices[0].message.content.strip()
-                
                 # Clean response
                 if ai_content.startswith('```json'):
                     ai_content = ai_content.replace('```json', '').replace('```', '').strip()
@@ -349,15 +341,16 @@ def generate_savings_suggestions(db: Session = Depends(get_db)):
                     pass
                     
             except Exception as e:
-                logger.error(f"OpenAI API error for savings: {e}")
+                logger.error(f"AI model error for savings: {e}")
         
         # Fallback savings suggestions
+        AI_FALLBACKS.inc("savings_suggestions")
         suggestions = []
         potential_savings = 0
         priority_areas = []
         
         # Analyze top spending categories
-        sorted_categories = sorted(category_totals.items(), key=lambda x: x[1], reverse=True)
+        sorted_categories = list(category_totals.items())
         
         for category, amount in sorted_categories[:3]:
             percentage = (amount / total_spent) * 100
@@ -394,31 +387,38 @@ def chat_with_ai(message: str = Query(..., description="The chat message from us
         logger.info(f"🤖 Chat request received: '{message}'")
         
         # Get user's expense data for context
-        expenses = db.query(Expense).all()
-        logger.info(f"📊 Found {len(expenses)} expenses in database")
+        features = get_features(db)
+        has_expenses = not features.is_empty
+        logger.info(f"📊 Found {features.expense_count} expenses in database")
+        
+        # Reuse the answer to a similar question asked against the same spending data
+        context_key = (features.version, features.expense_count, features.total_paise, features.last_date)
+        cached_response = CHAT_CACHE.get(message, context_key)
+        record_cache_lookup("chat_semantic", cached_response is not None)
+        if cached_response is not None:
+            return {
+                "response": cached_response,
+                "timestamp": datetime.now().isoformat(),
+                "context_available": has_expenses,
+                "specialist_mode": "ai_powered",
+                "response_type": "comprehensive_financial_advice"
+            }
         
         # Prepare comprehensive financial context
         financial_context = ""
-        if expenses:
-            total_spent = sum(e.amount for e in expenses)
-            category_totals = {}
-            monthly_trends = {}
-            
-            for expense in expenses:
-                category_totals[expense.category] = category_totals.get(expense.category, 0) + expense.amount
-                month_key = expense.date.strftime("%Y-%m")
-                monthly_trends[month_key] = monthly_trends.get(month_key, 0) + expense.amount
-            
-            top_categories = sorted(category_totals.items(), key=lambda x: x[1], reverse=True)[:5]
-            avg_monthly = sum(monthly_trends.values()) / max(len(monthly_trends), 1)
+        if has_expenses:
+            total_spent = features.total_spent
+            category_totals = features.category_totals
+            top_categories = features.top_categories(5)
+            avg_monthly = features.monthly_average
             
             financial_context = f"""
             USER'S FINANCIAL PROFILE:
             💰 Total Expenses Tracked: ₹{total_spent:,.2f}
-            📊 Number of Transactions: {len(expenses)}
+            📊 Number of Transactions: {features.expense_count}
             📈 Average Monthly Spending: ₹{avg_monthly:,.2f}
             🏆 Top Spending Categories: {', '.join([f"{cat}: ₹{amount:,.2f}" for cat, amount in top_categories[:3]])}
-            📅 Tracking Period: {expenses[0].date.strftime('%b %Y')} to {expenses[-1].date.strftime('%b %Y')}
+            📅 Tracking Period: {features.first_date.strftime('%b %Y')} to {features.last_date.strftime('%b %Y')}
             📋 Active Categories: {len(category_totals)} different expense types
             """
             logger.info(f"💼 User financial context prepared - Total: ₹{total_spent:,.2f}, Categories: {len(category_totals)}")
@@ -426,10 +426,10 @@ def chat_with_ai(message: str = Query(..., description="The chat message from us
             financial_context = "USER'S FINANCIAL PROFILE: New user - No expense tracking data available yet."
             logger.info("👤 New user - no expense data available")
         
-        # Try to use OpenAI if available for comprehensive financial advice
-        if openai_available and openai_client:
+        # Try the AI model backend for comprehensive financial advice
+        if model_backend() is not None:
             try:
-                logger.info("🤖 Sending request to OpenAI GPT-3.5-turbo")
+                logger.info(f"🤖 Sending request to the {get_backend().name} model backend ({settings.MODEL_NAME})")
                 
                 enhanced_prompt = f"""
                 You are VegaKash AI - A Comprehensive Personal Finance Specialist & Investment Advisor.
@@ -476,8 +476,7 @@ def chat_with_ai(message: str = Query(..., description="The chat message from us
                 Provide detailed, professional financial advice with specific recommendations and action steps.
                 """
                 
-                response = openai_client.chat.completions.create(
-                    model="gpt-3.5-turbo",
+                ai_response = _chat_completion(
                     messages=[
                         {
                             "role": "system", 
@@ -503,30 +502,31 @@ def chat_with_ai(message: str = Query(..., description="The chat message from us
                     max_tokens=200    # Reduced token limit for concise chat responses
                 )
                 
-                ai_response = response.choices[0].message.content.strip()
-                logger.info(f"✅ OpenAI response received: {len(ai_response)} characters")
+                logger.info(f"✅ AI model response received: {len(ai_response)} characters")
+                CHAT_CACHE.put(message, context_key, ai_response)
                 
                 return {
                     "response": ai_response,
                     "timestamp": datetime.now().isoformat(),
-                    "context_available": bool(expenses),
+                    "context_available": has_expenses,
                     "specialist_mode": "ai_powered",
                     "response_type": "comprehensive_financial_advice"
                 }
                 
             except Exception as e:
-                logger.error(f"❌ OpenAI API error for financial specialist chat: {e}")
+                logger.error(f"❌ AI model error for financial specialist chat: {e}")
                 # Continue to fallback
         
         logger.info("📱 Using enhanced fallback responses")
+        AI_FALLBACKS.inc("chat")
         
         # Enhanced fallback responses with comprehensive financial advice
         message_lower = message.lower()
         
         # Investment-related queries
         if any(word in message_lower for word in ["invest", "investment", "mutual fund", "sip", "stock", "portfolio", "return"]):
-            if expenses:
-                monthly_avg = sum(monthly_trends.values()) / max(len(monthly_trends), 1)
+            if has_expenses:
+                monthly_avg = features.monthly_average
                 potential_savings = monthly_avg * 0.2  # Suggest 20% savings
                 response_text = f"""💼 INVESTMENT ADVICE:
 
@@ -603,10 +603,10 @@ Start tracking expenses to determine investment capacity!
         
         # General spending and budgeting
         elif any(word in message_lower for word in ["spending", "expense", "budget", "save", "money", "month"]):
-            if expenses:
-                total = sum(e.amount for e in expenses)
-                top_cat = max(category_totals.items(), key=lambda x: x[1])
-                monthly_avg = sum(monthly_trends.values()) / max(len(monthly_trends), 1)
+            if has_expenses:
+                total = features.total_spent
+                top_cat = features.top_categories(1)[0]
+                monthly_avg = features.monthly_average
                 
                 response_text = f"""💰 YOUR SPENDING SNAPSHOT:
 
@@ -661,7 +661,7 @@ Start tracking expenses to determine investment capacity!
         return {
             "response": response_text,
             "timestamp": datetime.now().isoformat(),
-            "context_available": bool(expenses),
+            "context_available": has_expenses,
             "specialist_mode": "enhanced_fallback",
             "response_type": "comprehensive_financial_advice"
         }
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.services import dashboard
+from app.utils.database import get_db
+from app.utils.instrumentation import InstrumentedRoute
+from app.utils.serialization import FastJSONResponse
+from typing import Optional
+
+router = APIRouter(route_class=InstrumentedRoute)
+
+
+@router.get("/dashboard", response_class=FastJSONResponse)
+def get_dashboard(
+    db: Session = Depends(get_db),
+    sections: Optional[str] = Query(
+        None, description=f"Comma-separated sections to include (default: all): {', '.join(dashboard.SECTIONS)}"
+    ),
+    days: int = Query(30, ge=1, le=365, description="Window for spending_trends, in days")
+):
+    """Get the dashboard and insights page data in one request."""
+    names = [name.strip() for name in sections.split(",") if name.strip()] if sections else list(dashboard.SECTIONS)
+    unknown = [name for name in names if name not in dashboard.SECTIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown dashboard sections: {', '.join(unknown)} (expected {', '.join(dashboard.SECTIONS)})"
+        )
+    try:
+        return {name: dashboard.section(db, name, days) for name in names}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error building dashboard: {str(e)}")
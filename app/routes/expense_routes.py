@@ -1,27 +1,177 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, asc, and_, or_
+from sqlalchemy import delete, exists, insert, select, update
 from app.schemas import ExpenseCreate, ExpenseOut, ExpenseUpdate
-from app.models import Expense
-from app.utils.database import get_db
+from app.models import Category, Expense, ExpenseRollup
+from app.config import settings
+from app.services import archive, change_log, expense_filters, write_batcher
+from app.utils import categories as category_registry
+from app.utils.database import SessionLocal, get_db
+from app.utils.instrumentation import InstrumentedRoute
+from app.utils.money import from_paise, mean_rupees
+from app.utils.validation import expense_values
+from app.utils.serialization import FORMAT_PATTERN, FastJSONResponse, columnar_response, rows_to_dicts
 from typing import List, Optional
 from datetime import date, datetime
+from decimal import Decimal
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
+
+EXPENSE_FIELDS = ("id", "title", "category", "amount", "date", "description", "created_at", "updated_at", "version")
+# Read paths select these columns as plain rows and serialize them directly,
+# skipping ORM hydration and ExpenseOut validation (response_model stays for the docs)
+# Categories are read as their integer id and named from the in-memory registry
+EXPENSE_COLUMNS = tuple(
+    Expense.category_id if field == "category" else getattr(Expense, field) for field in EXPENSE_FIELDS
+)
+CATEGORY_INDEX = EXPENSE_FIELDS.index("category")
+COLUMNS_BY_FIELD = dict(zip(EXPENSE_FIELDS, EXPENSE_COLUMNS))
+FIELDS_DESCRIPTION = f"Comma-separated fields to return (default: all): {', '.join(EXPENSE_FIELDS)}"
+CATEGORY_BREAKDOWN_FIELDS = ("category", "amount", "count", "percentage")
+MONTHLY_TREND_FIELDS = ("month", "amount", "count", "average")
+BULK_MAX_ITEMS = 1000
+# Core table inserts skip the ORM bulk-insert machinery (several times faster for executemany)
+EXPENSES_TABLE = Expense.__table__
+
+
+def name_categories(rows, i=CATEGORY_INDEX):
+    """Replace the category id (at position i) in each selected expense row with its name"""
+    name = category_registry.category_name
+    return [row[:i] + (name(row[i]),) + row[i + 1:] for row in rows]
+
+
+def select_fields(fields: Optional[str]):
+    """
+    Parse a ``fields=`` list into (field names, columns to select).
+
+    Only the requested columns are selected and serialized, so a list view
+    asking for id,title,amount never reads the description text.
+    """
+    if not fields:
+        return EXPENSE_FIELDS, EXPENSE_COLUMNS
+    names = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in COLUMNS_BY_FIELD]
+    if unknown or not names:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown) or fields} (expected {', '.join(EXPENSE_FIELDS)})"
+        )
+    return names, tuple(COLUMNS_BY_FIELD[name] for name in names)
+
+
+def serialize_rows(rows, names):
+    """Selected rows as dicts, with category ids replaced by names"""
+    if "category" in names:
+        rows = name_categories(rows, names.index("category"))
+    return rows_to_dicts(rows, names)
+
+
+def expense_response(row, names=EXPENSE_FIELDS, status_code=200):
+    """One expense row as JSON, with its row version as the ETag when selected"""
+    content = serialize_rows([row], names)[0]
+    headers = {"ETag": f'"{content["version"]}"'} if "version" in content else None
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
+
+
+def parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    """Expected row version from an If-Match header ("3", W/"3"); None when absent or *"""
+    if if_match is None or if_match.strip() == "*":
+        return None
+    tag = if_match.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    try:
+        return int(tag.strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid If-Match header: {if_match} (expected an expense ETag)")
+
+
+def missing_or_stale(db: Session, expense_id: int, expected: Optional[int]) -> HTTPException:
+    """Explain a conditional write that matched no row: 404, or 412 if the row exists with another version"""
+    if expected is not None and db.execute(select(Expense.id).where(Expense.id == expense_id)).first():
+        return HTTPException(status_code=412, detail="Expense was modified by another request (version mismatch)")
+    return HTTPException(status_code=404, detail="Expense not found")
+
+
+def insert_expense_batch(batch: List[dict]) -> list:
+    """
+    Insert queued expenses in one transaction, returning a row (or the error) per expense.
+
+    The batch is tried as one executemany INSERT; if that fails, each
+    expense is retried behind its own savepoint so one bad row only fails
+    its own request.
+    """
+    db = SessionLocal()
+    try:
+        statement = insert(EXPENSES_TABLE).returning(*EXPENSE_COLUMNS, sort_by_parameter_order=True)
+        try:
+            results = db.execute(statement, batch).all()
+        except Exception:
+            db.rollback()
+            results = []
+            for values in batch:
+                try:
+                    with db.begin_nested():
+                        results.append(db.execute(insert(EXPENSES_TABLE).values(**values).returning(*EXPENSE_COLUMNS)).one())
+                except Exception as e:
+                    results.append(e)
+        change_log.record(db, change_log.INSERT, [row.id for row in results if not isinstance(row, Exception)])
+        db.commit()
+        return results
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+EXPENSE_INSERTS = write_batcher.WriteBatcher(
+    "expense_inserts",
+    insert_expense_batch,
+    max_batch=settings.WRITE_BATCH_MAX_SIZE,
+    max_delay_ms=settings.WRITE_BATCH_MAX_DELAY_MS,
+)
 
 @router.post("/expenses", response_model=ExpenseOut)
 def create_expense(expense: ExpenseCreate, db: Session = Depends(get_db)):
     """Create a new expense entry."""
     try:
-        db_expense = Expense(**expense.model_dump())
-        db.add(db_expense)
+        values = expense_values(expense.model_dump())
+        if settings.WRITE_BATCHING:
+            # Committed together with other inserts arriving within the batch window
+            return expense_response(EXPENSE_INSERTS.submit(values))
+        # INSERT ... RETURNING hands back the stored row; no refresh SELECT after the commit
+        row = db.execute(insert(EXPENSES_TABLE).values(**values).returning(*EXPENSE_COLUMNS)).one()
+        change_log.record(db, change_log.INSERT, [row.id])
         db.commit()
-        db.refresh(db_expense)
-        return db_expense
+        return expense_response(row)
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=400, detail=f"Error creating expense: {str(e)}")
 
+@router.post("/expenses/bulk")
+def create_expenses_bulk(
+    expenses: List[ExpenseCreate] = Body(..., max_length=BULK_MAX_ITEMS),
+    db: Session = Depends(get_db)
+):
+    """Create many expenses in one transaction."""
+    rows = []
+    for index, expense in enumerate(expenses):
+        try:
+            rows.append(expense_values(expense.model_dump()))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Error in expense {index}: {str(e)}")
+    if not rows:
+        return {"created": 0, "ids": []}
+    try:
+        # One executemany INSERT ... RETURNING instead of a flush per ORM object
+        ids = db.execute(insert(EXPENSES_TABLE).returning(EXPENSES_TABLE.c.id, sort_by_parameter_order=True), rows).scalars().all()
+        change_log.record(db, change_log.INSERT, ids)
+        db.commit()
+        return {"created": len(ids), "ids": ids}
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Error creating expenses: {str(e)}")
+
 @router.get("/expenses", response_model=List[ExpenseOut])
 def get_expenses(
     db: Session = Depends(get_db),
@@ -30,94 +180,152 @@ def get_expenses(
     category: Optional[str] = Query(None, description="Filter by category"),
     date_from: Optional[date] = Query(None, description="Filter expenses from this date"),
     date_to: Optional[date] = Query(None, description="Filter expenses to this date"),
-    min_amount: Optional[float] = Query(None, ge=0, description="Minimum amount filter"),
-    max_amount: Optional[float] = Query(None, ge=0, description="Maximum amount filter"),
+    min_amount: Optional[Decimal] = Query(None, ge=0, description="Minimum amount filter"),
+    max_amount: Optional[Decimal] = Query(None, ge=0, description="Maximum amount filter"),
     search: Optional[str] = Query(None, description="Search in title and description"),
-    sort_by: str = Query("date", description="Sort by field (date, amount, title)"),
-    sort_order: str = Query("desc", description="Sort order (asc, desc)")
+    sort_by: str = Query("date", description=f"Sort by field ({', '.join(expense_filters.SORT_COLUMNS)})"),
+    sort_order: str = Query("desc", pattern="(?i)^(asc|desc)$", description="Sort order (asc, desc)"),
+    date_range: Optional[List[str]] = Query(None, description="Date range start..end (YYYY-MM-DD, either side optional); repeat to match any of several"),
+    amount_range: Optional[List[str]] = Query(None, description="Amount range min..max (either side optional); repeat to match any of several"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    response_format: str = Query("json", alias="format", pattern=FORMAT_PATTERN, description="Response format (json, columns)")
 ):
     """Get expenses with filtering, pagination, and sorting."""
+    names, columns = select_fields(fields)
     try:
-        query = db.query(Expense)
-        
-        # Apply filters
-        if category:
-            query = query.filter(Expense.category.ilike(f"%{category}%"))
-        
-        if date_from:
-            query = query.filter(Expense.date >= date_from)
-            
-        if date_to:
-            query = query.filter(Expense.date <= date_to)
-            
-        if min_amount is not None:
-            query = query.filter(Expense.amount >= min_amount)
-            
-        if max_amount is not None:
-            query = query.filter(Expense.amount <= max_amount)
-            
-        if search:
-            search_filter = or_(
-                Expense.title.ilike(f"%{search}%"),
-                Expense.description.ilike(f"%{search}%")
-            )
-            query = query.filter(search_filter)
-        
-        # Apply sorting
-        sort_column = getattr(Expense, sort_by, Expense.date)
-        if sort_order.lower() == "asc":
-            query = query.order_by(asc(sort_column))
+        # Category names become category_id equality/IN, sorting is limited to indexed columns
+        plan = expense_filters.plan(
+            category=category, date_from=date_from, date_to=date_to,
+            min_amount=min_amount, max_amount=max_amount,
+            date_ranges=date_range or (), amount_ranges=amount_range or (),
+            search=search, sort_by=sort_by, sort_order=sort_order
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        rows = None
+        if plan.empty:
+            rows = []
         else:
-            query = query.order_by(desc(sort_column))
+            # Merge in archived rows when the Parquet archive can match (None: live table only)
+            rows = archive.query_expenses(db, plan, columns, names, skip, limit)
+        if rows is None:
+            rows = plan.apply(db.query(*columns)).offset(skip).limit(limit).all()
         
-        # Apply pagination
-        expenses = query.offset(skip).limit(limit).all()
-        return expenses
+        if "category" in names:
+            rows = name_categories(rows, names.index("category"))
+        if response_format == "columns":
+            response = columnar_response(rows, names)
+        else:
+            response = FastJSONResponse(rows_to_dicts(rows, names))
+        if settings.DEBUG:
+            response.headers["X-Query-Plan"] = plan.describe()
+        return response
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching expenses: {str(e)}")
 
+# Declared before /expenses/{expense_id} so "changes" is not parsed as an id
+@router.get("/expenses/changes", response_class=FastJSONResponse)
+def get_expense_changes(
+    db: Session = Depends(get_db),
+    since: int = Query(0, ge=0, description="Last change version the client has applied (0 for a full sync)"),
+    limit: int = Query(500, ge=1, le=change_log.MAX_CHANGES, description="Maximum change log entries to read")
+):
+    """Get expenses inserted, updated or deleted after a change version."""
+    try:
+        changes, version, has_more = change_log.changes_since(
+            db, since, limit, EXPENSE_COLUMNS,
+            lambda rows: serialize_rows(rows, EXPENSE_FIELDS)
+        )
+        return {
+            "since": since,
+            "version": version,
+            "has_more": has_more,
+            "changes": changes
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching expense changes: {str(e)}")
+
 @router.get("/expenses/{expense_id}", response_model=ExpenseOut)
-def get_expense(expense_id: int, db: Session = Depends(get_db)):
+def get_expense(
+    expense_id: int,
+    db: Session = Depends(get_db),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+):
     """Get a specific expense by ID."""
-    expense = db.query(Expense).filter(Expense.id == expense_id).first()
-    if not expense:
+    names, columns = select_fields(fields)
+    row = db.query(*columns).filter(Expense.id == expense_id).first()
+    if not row:
+        # Archived expenses stay readable (but not writable)
+        row = archive.archived_expense(db, expense_id, names)
+    if not row:
         raise HTTPException(status_code=404, detail="Expense not found")
-    return expense
+    return expense_response(row, names)
 
 @router.put("/expenses/{expense_id}", response_model=ExpenseOut)
-def update_expense(expense_id: int, expense_update: ExpenseUpdate, db: Session = Depends(get_db)):
+def update_expense(
+    expense_id: int,
+    expense_update: ExpenseUpdate,
+    db: Session = Depends(get_db),
+    if_match: Optional[str] = Header(None, description="ETag of the version being updated; 412 if it changed since")
+):
     """Update an existing expense."""
+    expected = parse_if_match(if_match)
     try:
-        expense = db.query(Expense).filter(Expense.id == expense_id).first()
-        if not expense:
-            raise HTTPException(status_code=404, detail="Expense not found")
-        
         # Update only provided fields
-        update_data = expense_update.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(expense, field, value)
+        update_data = expense_values(expense_update.model_dump(exclude_unset=True), partial=True)
+        conditions = [EXPENSES_TABLE.c.id == expense_id]
+        if expected is not None:
+            conditions.append(EXPENSES_TABLE.c.version == expected)
         
-        db.commit()
-        db.refresh(expense)
-        return expense
+        if update_data:
+            # UPDATE ... RETURNING: the version check, the write and the new row in one statement
+            row = db.execute(
+                update(EXPENSES_TABLE).where(*conditions)
+                .values(**update_data, version=EXPENSES_TABLE.c.version + 1)
+                .returning(*EXPENSE_COLUMNS)
+            ).first()
+        else:
+            row = db.execute(select(*EXPENSE_COLUMNS).where(*conditions)).first()
+        if row is None:
+            raise missing_or_stale(db, expense_id, expected)
+        
+        if update_data:
+            change_log.record(db, change_log.UPDATE, [expense_id])
+            db.commit()
+        return expense_response(row)
         
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=400, detail=f"Error updating expense: {str(e)}")
 
 @router.delete("/expenses/{expense_id}")
-def delete_expense(expense_id: int, db: Session = Depends(get_db)):
+def delete_expense(
+    expense_id: int,
+    db: Session = Depends(get_db),
+    if_match: Optional[str] = Header(None, description="ETag of the version being deleted; 412 if it changed since")
+):
     """Delete an expense."""
+    expected = parse_if_match(if_match)
     try:
-        expense = db.query(Expense).filter(Expense.id == expense_id).first()
-        if not expense:
-            raise HTTPException(status_code=404, detail="Expense not found")
+        conditions = [EXPENSES_TABLE.c.id == expense_id]
+        if expected is not None:
+            conditions.append(EXPENSES_TABLE.c.version == expected)
+        deleted = db.execute(delete(EXPENSES_TABLE).where(*conditions).returning(EXPENSES_TABLE.c.id)).first()
+        if deleted is None:
+            raise missing_or_stale(db, expense_id, expected)
         
-        db.delete(expense)
+        change_log.record(db, change_log.DELETE, [expense_id])
         db.commit()
         return {"message": "Expense deleted successfully"}
         
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=400, detail=f"Error deleting expense: {str(e)}")
@@ -126,9 +334,10 @@ def delete_expense(expense_id: int, db: Session = Depends(get_db)):
 def get_expense_summary(db: Session = Depends(get_db)):
     """Get expense summary statistics."""
     try:
-        expenses = db.query(Expense).all()
+        # Integer SUM per category (archived expenses through their rollups); totals are exact
+        rows = [row[:3] for row in archive.grouped_totals(db, ("category_id",))]
         
-        if not expenses:
+        if not rows:
             return {
                 "total_expenses": 0,
                 "total_amount": 0.0,
@@ -137,27 +346,21 @@ def get_expense_summary(db: Session = Depends(get_db)):
                 "expense_count": 0
             }
         
-        total_amount = sum(expense.amount for expense in expenses)
-        average_amount = total_amount / len(expenses)
+        total_count = sum(count for _, count, _ in rows)
+        total_paise = sum(paise for _, _, paise in rows)
         
         # Category breakdown
-        categories = {}
-        for expense in expenses:
-            if expense.category in categories:
-                categories[expense.category]["count"] += 1
-                categories[expense.category]["amount"] += expense.amount
-            else:
-                categories[expense.category] = {
-                    "count": 1,
-                    "amount": expense.amount
-                }
+        categories = {
+            category_registry.category_name(category_id): {"count": count, "amount": from_paise(paise)}
+            for category_id, count, paise in rows
+        }
         
         return {
-            "total_expenses": len(expenses),
-            "total_amount": total_amount,
-            "average_amount": average_amount,
+            "total_expenses": total_count,
+            "total_amount": from_paise(total_paise),
+            "average_amount": mean_rupees(total_paise, total_count),
             "categories": categories,
-            "expense_count": len(expenses)
+            "expense_count": total_count
         }
         
     except Exception as e:
@@ -167,55 +370,52 @@ def get_expense_summary(db: Session = Depends(get_db)):
 def get_categories(db: Session = Depends(get_db)):
     """Get list of all unique categories."""
     try:
-        categories = db.query(Expense.category).distinct().all()
-        return [cat[0] for cat in categories if cat[0]]
+        # One index probe per category instead of a DISTINCT over every expense
+        used = exists().where(Expense.category_id == Category.id) | exists().where(ExpenseRollup.category_id == Category.id)
+        category_ids = db.execute(select(Category.id).where(used).order_by(Category.id)).scalars()
+        return [category_registry.category_name(category_id) for category_id in category_ids]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching categories: {str(e)}")
 
-@router.get("/expenses/analytics/category-breakdown")
-def get_category_breakdown(db: Session = Depends(get_db)):
+@router.get("/expenses/analytics/category-breakdown", response_class=FastJSONResponse)
+def get_category_breakdown(
+    db: Session = Depends(get_db),
+    response_format: str = Query("json", alias="format", pattern=FORMAT_PATTERN, description="Response format (json, columns)")
+):
     """Get expense breakdown by category for charts."""
     try:
-        expenses = db.query(Expense).all()
+        rows = [
+            (category_id, paise, count)
+            for category_id, count, paise, _ in archive.grouped_totals(db, ("category_id",))
+        ]
         
-        if not expenses:
+        if not rows:
+            if response_format == "columns":
+                return columnar_response([], CATEGORY_BREAKDOWN_FIELDS, total_amount=0)
             return {
                 "categories": [],
                 "total_amount": 0
             }
         
-        # Calculate category breakdown
-        category_totals = {}
-        total_amount = 0
-        
-        for expense in expenses:
-            category = expense.category
-            amount = expense.amount
-            total_amount += amount
-            
-            if category in category_totals:
-                category_totals[category]["amount"] += amount
-                category_totals[category]["count"] += 1
-            else:
-                category_totals[category] = {
-                    "amount": amount,
-                    "count": 1
-                }
+        total_paise = sum(paise for _, paise, _ in rows)
+        total_amount = from_paise(total_paise)
         
         # Convert to list format for charts
         categories = []
-        for category, data in category_totals.items():
-            percentage = (data["amount"] / total_amount * 100) if total_amount > 0 else 0
+        for category_id, paise, count in rows:
+            percentage = (paise / total_paise * 100) if total_paise > 0 else 0
             categories.append({
-                "category": category,
-                "amount": data["amount"],
-                "count": data["count"],
+                "category": category_registry.category_name(category_id),
+                "amount": from_paise(paise),
+                "count": count,
                 "percentage": round(percentage, 2)
             })
         
         # Sort by amount descending
         categories.sort(key=lambda x: x["amount"], reverse=True)
         
+        if response_format == "columns":
+            return columnar_response(categories, CATEGORY_BREAKDOWN_FIELDS, total_amount=total_amount)
         return {
             "categories": categories,
             "total_amount": total_amount
@@ -224,35 +424,41 @@ def get_category_breakdown(db: Session = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting category breakdown: {str(e)}")
 
-@router.get("/expenses/analytics/monthly-trends")
-def get_monthly_trends(db: Session = Depends(get_db)):
+@router.get("/expenses/analytics/monthly-trends", response_class=FastJSONResponse)
+def get_monthly_trends(
+    db: Session = Depends(get_db),
+    response_format: str = Query("json", alias="format", pattern=FORMAT_PATTERN, description="Response format (json, columns)")
+):
     """Get monthly spending trends for charts."""
     try:
-        expenses = db.query(Expense).all()
+        # One row per day from the database, folded into months here so the
+        # query stays portable (no dialect-specific date formatting)
+        rows = [(day, paise, count) for day, count, paise, _ in archive.grouped_totals(db, ("date",))]
         
-        if not expenses:
+        if not rows:
+            if response_format == "columns":
+                return columnar_response([], MONTHLY_TREND_FIELDS, total_months=0)
             return {
                 "months": [],
                 "total_months": 0
             }
         
-        # Group expenses by month
+        # Group daily totals by month
         monthly_data = {}
         
-        for expense in expenses:
+        for day, paise, count in rows:
             # Format month as YYYY-MM
-            month_key = expense.date.strftime("%Y-%m")
-            month_display = expense.date.strftime("%b %Y")
+            month_key = day.strftime("%Y-%m")
             
             if month_key not in monthly_data:
                 monthly_data[month_key] = {
-                    "month": month_display,
-                    "amount": 0,
+                    "month": day.strftime("%b %Y"),
+                    "paise": 0,
                     "count": 0
                 }
             
-            monthly_data[month_key]["amount"] += expense.amount
-            monthly_data[month_key]["count"] += 1
+            monthly_data[month_key]["paise"] += paise
+            monthly_data[month_key]["count"] += count
         
         # Convert to sorted list
         months = []
@@ -260,11 +466,13 @@ def get_monthly_trends(db: Session = Depends(get_db)):
             data = monthly_data[month_key]
             months.append({
                 "month": data["month"],
-                "amount": data["amount"],
+                "amount": from_paise(data["paise"]),
                 "count": data["count"],
-                "average": data["amount"] / data["count"] if data["count"] > 0 else 0
+                "average": mean_rupees(data["paise"], data["count"])
             })
         
+        if response_format == "columns":
+            return columnar_response(months, MONTHLY_TREND_FIELDS, total_months=len(months))
         return {
             "months": months,
             "total_months": len(months)
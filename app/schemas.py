@@ -1,12 +1,13 @@
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 from datetime import date as date_type, datetime
+from decimal import Decimal
 from typing import Optional, List
 
 class ExpenseCreate(BaseModel):
     """Schema for creating a new expense"""
     title: str = Field(..., min_length=1, max_length=200, description="Title of the expense")
     category: str = Field(..., min_length=1, max_length=100, description="Category of the expense")
-    amount: float = Field(..., gt=0, le=1000000, description="Amount spent (must be positive)")
+    amount: Decimal = Field(..., gt=0, le=1000000, description="Amount spent in rupees (must be positive, stored to the paisa)")
     date: date_type = Field(..., description="Date of the expense")
     description: Optional[str] = Field(None, max_length=500, description="Optional description")
 
@@ -14,7 +15,7 @@ class ExpenseUpdate(BaseModel):
     """Schema for updating an existing expense"""
     title: Optional[str] = Field(None, min_length=1, max_length=200)
     category: Optional[str] = Field(None, min_length=1, max_length=100)
-    amount: Optional[float] = Field(None, gt=0, le=1000000)
+    amount: Optional[Decimal] = Field(None, gt=0, le=1000000)
     date: Optional[date_type] = None
     description: Optional[str] = Field(None, max_length=500)
 
@@ -28,6 +29,7 @@ class ExpenseOut(BaseModel):
     description: Optional[str] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
+    version: Optional[int] = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -0,0 +1,237 @@
+"""
+Embedded DuckDB mirror of the expenses table for analytics.
+
+When DUCKDB_MIRROR is enabled, a background thread keeps a columnar copy of
+the columns analytics aggregate (id, category_id, amount_paise, date) in
+DuckDB. It is fed incrementally from the change log: the mirror remembers
+the last change version it applied and replays the changes after it (each
+changed expense is deleted and its current row re-inserted). The first sync
+bulk-loads the table.
+
+`live_totals` answers the GROUP BY queries behind the summary, category
+breakdown, monthly trends and spending features with DuckDB's vectorized
+execution. Requests never sync the mirror themselves: while it is behind,
+they are answered from it as it stands (so analytics can miss at most the
+last DUCKDB_MAX_LAG_SECONDS of changes) and the background thread is woken
+to catch up. It returns None (callers then query the primary) when the
+mirror is disabled, has not loaded yet, or has not caught up with the
+primary for more than DUCKDB_MAX_LAG_SECONDS.
+"""
+import logging
+import threading
+import time
+from datetime import date
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Expense
+from app.services import change_log
+from app.utils.metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("id", "category_id", "amount_paise", "date")
+GROUP_KEYS = ("date", "category_id")
+
+INSERT_CHUNK = 50000
+# Parallel unnests zip the column lists back into rows
+INSERT_COLUMNS = (
+    "INSERT INTO expenses SELECT unnest(?::BIGINT[]), unnest(?::SMALLINT[]), unnest(?::BIGINT[]), unnest(?::DATE[])"
+)
+
+ANALYTICS_QUERIES = Counter(
+    "analytics_queries_total", "Analytics aggregations by the store that answered them", labelnames=("source",)
+)
+
+
+class AnalyticsMirror:
+    """DuckDB copy of the analytics columns of expenses, synced from the change log"""
+
+    def __init__(self, path: str = ":memory:", max_lag_seconds: float = 30.0,
+                 clock=time.monotonic):
+        import duckdb
+
+        self.max_lag_seconds = max_lag_seconds
+        self.clock = clock
+        self._connection = duckdb.connect(path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS expenses "
+            "(id BIGINT NOT NULL, category_id SMALLINT NOT NULL, amount_paise BIGINT NOT NULL, date DATE NOT NULL)"
+        )
+        self._connection.execute("CREATE TABLE IF NOT EXISTS sync_state (version BIGINT NOT NULL)")
+        row = self._connection.execute("SELECT max(version) FROM sync_state").fetchone()
+        self._write_lock = threading.Lock()
+        self.version: Optional[int] = row[0]
+        # Last time the mirror was known to match the primary
+        self.synced_at: Optional[float] = None
+
+    def _set_version(self, cursor, version: int) -> None:
+        cursor.execute("DELETE FROM sync_state")
+        cursor.execute("INSERT INTO sync_state VALUES (?)", [version])
+        self.version = version
+
+    @staticmethod
+    def _insert(cursor, rows: Sequence[Tuple]) -> None:
+        """Insert rows as one statement per chunk, passing each column as a list parameter"""
+        for start in range(0, len(rows), INSERT_CHUNK):
+            cursor.execute(INSERT_COLUMNS, [list(values) for values in zip(*rows[start:start + INSERT_CHUNK])])
+
+    def _load(self, db: Session) -> None:
+        """Bulk-copy every expense (changes made during the copy are replayed by the next sync)"""
+        version = change_log.current_version(db)
+        rows = db.execute(select(*(getattr(Expense, column) for column in COLUMNS))).all()
+        with self._connection.cursor() as cursor:
+            cursor.execute("BEGIN")
+            cursor.execute("DELETE FROM expenses")
+            self._insert(cursor, rows)
+            self._set_version(cursor, version)
+            cursor.execute("COMMIT")
+        logger.info(f"Analytics mirror loaded {len(rows)} expenses at change version {version}")
+
+    def sync(self, db: Session) -> int:
+        """Apply changes from the primary; returns how many expenses changed"""
+        with self._write_lock:
+            if self.version is not None and change_log.current_version(db) < self.version:
+                # A persisted mirror of a different (or restored) primary database
+                self.version = None
+            if self.version is None:
+                self._load(db)
+                self.synced_at = self.clock()
+                return 0
+            changed = 0
+            while True:
+                changes, version, has_more = change_log.changes_since(
+                    db, self.version, change_log.MAX_CHANGES, [getattr(Expense, column) for column in COLUMNS],
+                    lambda rows: [dict(zip(COLUMNS, row)) for row in rows],
+                )
+                if changes:
+                    upserts = [tuple(change["expense"][column] for column in COLUMNS)
+                               for change in changes if change["expense"] is not None]
+                    with self._connection.cursor() as cursor:
+                        cursor.execute("BEGIN")
+                        cursor.execute("DELETE FROM expenses WHERE id IN (SELECT unnest(?::BIGINT[]))",
+                                       [[change["id"] for change in changes]])
+                        self._insert(cursor, upserts)
+                        self._set_version(cursor, version)
+                        cursor.execute("COMMIT")
+                    changed += len(changes)
+                if not has_more:
+                    break
+            self.synced_at = self.clock()
+            return changed
+
+    def lag_seconds(self, db: Session) -> Optional[float]:
+        """0 when the mirror has every change, else seconds since it last matched the primary (None: never loaded)"""
+        if self.version is None or self.synced_at is None:
+            return None
+        if change_log.current_version(db) <= self.version:
+            self.synced_at = self.clock()
+            return 0.0
+        return self.clock() - self.synced_at
+
+    def grouped_totals(self, keys: Sequence[str], period_start: Optional[date] = None,
+                       period_end: Optional[date] = None) -> List[Tuple]:
+        """(*keys, count, total_paise, max_paise) per group, ordered by keys"""
+        if any(key not in GROUP_KEYS for key in keys):
+            raise ValueError(f"Cannot group the analytics mirror by {keys}")
+        conditions, parameters = [], []
+        if period_start is not None:
+            conditions.append("date >= ?")
+            parameters.append(period_start)
+        if period_end is not None:
+            conditions.append("date <= ?")
+            parameters.append(period_end)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        group = ", ".join(keys)
+        with self._connection.cursor() as cursor:
+            return cursor.execute(
+                f"SELECT {group}, count(*), sum(amount_paise), max(amount_paise) FROM expenses {where} "
+                f"GROUP BY {group} ORDER BY {group}", parameters
+            ).fetchall()
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+_mirror: Optional[AnalyticsMirror] = None
+_unavailable = False
+_mirror_lock = threading.Lock()
+_stop = threading.Event()
+# Set by requests that find the mirror behind, so the sync thread does not wait out its interval
+_wake = threading.Event()
+_worker: Optional[threading.Thread] = None
+
+
+def get_mirror() -> Optional[AnalyticsMirror]:
+    """The configured mirror, or None when DUCKDB_MIRROR is off or duckdb is not installed"""
+    global _mirror, _unavailable
+    if not settings.DUCKDB_MIRROR or _unavailable:
+        return None
+    if _mirror is None:
+        with _mirror_lock:
+            if _mirror is None and not _unavailable:
+                try:
+                    _mirror = AnalyticsMirror(settings.DUCKDB_PATH, settings.DUCKDB_MAX_LAG_SECONDS)
+                except ImportError as e:
+                    logger.warning(f"❌ DuckDB analytics mirror unavailable: {e}")
+                    _unavailable = True
+    return _mirror
+
+
+def live_totals(db: Session, keys: Sequence[str], period_start: Optional[date] = None,
+                period_end: Optional[date] = None) -> Optional[List[Tuple]]:
+    """Grouped totals of live expenses from the mirror, or None to query the primary instead"""
+    mirror = get_mirror()
+    if mirror is None:
+        return None
+    lag = mirror.lag_seconds(db)
+    if lag is None or lag > mirror.max_lag_seconds:
+        ANALYTICS_QUERIES.inc("primary")
+        return None
+    if lag > 0:
+        _wake.set()
+    ANALYTICS_QUERIES.inc("mirror")
+    return mirror.grouped_totals(keys, period_start, period_end)
+
+
+def _run(session_factory, interval: float) -> None:
+    while not _stop.is_set():
+        try:
+            with session_factory() as db:
+                get_mirror().sync(db)
+        except Exception as e:
+            logger.warning(f"Analytics mirror sync failed: {e}")
+        _wake.wait(interval)
+        _wake.clear()
+
+
+def start(session_factory) -> bool:
+    """Start the background sync thread (no-op when the mirror is disabled); returns whether it runs"""
+    global _worker
+    if get_mirror() is None:
+        return False
+    _stop.clear()
+    _wake.clear()
+    _worker = threading.Thread(target=_run, args=(session_factory, settings.DUCKDB_SYNC_SECONDS),
+                               name="analytics-mirror-sync", daemon=True)
+    _worker.start()
+    return True
+
+
+def stop() -> None:
+    global _worker
+    _stop.set()
+    _wake.set()
+    if _worker is not None:
+        _worker.join()
+        _worker = None
+
+
+ANALYTICS_MIRROR_VERSION = Gauge(
+    "analytics_mirror_change_version",
+    "Last change log version applied to the DuckDB analytics mirror",
+    callback=lambda: {} if _mirror is None or _mirror.version is None else {(): _mirror.version},
+)
@@ -0,0 +1,408 @@
+"""
+Cold archive of old expenses in Parquet files.
+
+`archive_expenses` moves expenses dated before a cutoff out of the hot
+table into one zstd-compressed Parquet file (rows sorted by date, so each
+row group covers a narrow date span). Their daily per-category totals stay
+in the database as ``expense_rollups``, and analytics read them through
+`grouped_totals`, so summaries and trends keep covering the full history
+without touching the files.
+
+Archived expenses are logged as ``archive`` changes, not deletes, so
+delta-sync clients keep them, and the API keeps serving them: GET /expenses
+merges the live rows with archived rows read from memory-mapped Parquet
+(filters pushed down, so row groups outside the requested dates are
+skipped, and files that cannot reach the requested page are not opened),
+and GET /expenses/{id} falls back to `archived_expense`.
+
+Files are written to ARCHIVE_DIR, or to an Azure Blob Storage container
+(``azure-storage-blob``, optional) with a local read-through cache.
+pyarrow is needed to archive and to read archived rows; analytics only
+need the rollups.
+"""
+import io
+import logging
+import os
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, insert, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Expense, ExpenseArchive, ExpenseRollup
+from app.services import analytics_mirror, change_log
+from app.services.expense_filters import SORT_COLUMNS, FilterPlan
+from app.utils import categories
+
+logger = logging.getLogger(__name__)
+
+ROW_GROUP_SIZE = 65536
+
+# API field -> archived column (amount is derived from amount_paise)
+ARCHIVE_COLUMNS = {
+    "id": "id",
+    "title": "title",
+    "category": "category_id",
+    "amount": "amount_paise",
+    "date": "date",
+    "description": "description",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+    "version": "version",
+}
+SORT_FIELDS = {"date": "date", "amount": "amount_paise", "title": "title",
+               "created_at": "created_at", "id": "id", "category": "category_id"}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError(f"The expense archive needs pyarrow (pip install pyarrow): {e}")
+    return pyarrow
+
+
+def _schema(pa):
+    return pa.schema([
+        ("id", pa.int64()),
+        ("title", pa.string()),
+        ("category_id", pa.int16()),
+        ("amount_paise", pa.int64()),
+        ("date", pa.date32()),
+        ("description", pa.string()),
+        ("created_at", pa.timestamp("us", tz="UTC")),
+        ("updated_at", pa.timestamp("us", tz="UTC")),
+        ("version", pa.int32()),
+    ])
+
+
+class LocalArchiveStore:
+    """Parquet files in a local directory"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def put(self, name: str, data: bytes) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        partial = self.path(name) + ".partial"
+        with open(partial, "wb") as fh:
+            fh.write(data)
+        os.replace(partial, self.path(name))
+
+    def local_path(self, name: str) -> str:
+        """A local file that can be memory-mapped"""
+        return self.path(name)
+
+
+class AzureBlobArchiveStore(LocalArchiveStore):
+    """Blobs in an Azure Storage container, downloaded to a local cache directory on first read"""
+
+    def __init__(self, connection_string: str, container: str, cache_dir: str):
+        super().__init__(cache_dir)
+        try:
+            from azure.storage.blob import BlobServiceClient
+        except ImportError as e:
+            raise RuntimeError(f"ARCHIVE_BACKEND=azure needs azure-storage-blob: {e}")
+        self.container = BlobServiceClient.from_connection_string(connection_string).get_container_client(container)
+
+    def put(self, name: str, data: bytes) -> None:
+        self.container.upload_blob(name, data, overwrite=True)
+        super().put(name, data)
+
+    def local_path(self, name: str) -> str:
+        path = self.path(name)
+        if not os.path.exists(path):
+            os.makedirs(self.root, exist_ok=True)
+            partial = path + ".partial"
+            with open(partial, "wb") as fh:
+                self.container.download_blob(name).readinto(fh)
+            os.replace(partial, path)
+        return path
+
+
+def create_store():
+    """The archive store selected by ARCHIVE_BACKEND"""
+    if settings.ARCHIVE_BACKEND == "local":
+        return LocalArchiveStore(settings.ARCHIVE_DIR)
+    if settings.ARCHIVE_BACKEND == "azure":
+        return AzureBlobArchiveStore(settings.AZURE_STORAGE_CONNECTION_STRING, settings.ARCHIVE_CONTAINER,
+                                     settings.ARCHIVE_DIR)
+    raise ValueError(f"Unknown ARCHIVE_BACKEND '{settings.ARCHIVE_BACKEND}' (expected local or azure)")
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = create_store()
+    return _store
+
+
+def _merge_rollups(db: Session, rows: Sequence) -> None:
+    """Add the daily per-category totals of archived rows to expense_rollups"""
+    daily: Dict[Tuple[date, int], List[int]] = {}
+    for row in rows:
+        entry = daily.setdefault((row.date, row.category_id), [0, 0, 0])
+        entry[0] += row.amount_paise
+        entry[1] += 1
+        entry[2] = max(entry[2], row.amount_paise)
+    totals = [key + tuple(values) for key, values in daily.items()]
+    key = tuple_(ExpenseRollup.date, ExpenseRollup.category_id)
+    greatest = func.max if db.get_bind().dialect.name == "sqlite" else func.greatest
+    existing = set()
+    for start in range(0, len(totals), 500):
+        keys = [(day, category_id) for day, category_id, *_ in totals[start:start + 500]]
+        existing.update(tuple(row) for row in db.execute(
+            select(ExpenseRollup.date, ExpenseRollup.category_id).where(key.in_(keys))
+        ))
+    new = []
+    for day, category_id, paise, count, largest in totals:
+        if (day, category_id) in existing:
+            # Expenses added later with an already archived date
+            db.execute(
+                update(ExpenseRollup)
+                .where(ExpenseRollup.date == day, ExpenseRollup.category_id == category_id)
+                .values(total_paise=ExpenseRollup.total_paise + paise,
+                        expense_count=ExpenseRollup.expense_count + count,
+                        max_paise=greatest(ExpenseRollup.max_paise, largest))
+            )
+        else:
+            new.append({"date": day, "category_id": category_id, "total_paise": paise,
+                        "expense_count": count, "max_paise": largest})
+    if new:
+        db.execute(insert(ExpenseRollup), new)
+
+
+def write_archive(db: Session, rows: Sequence, store=None) -> Optional[ExpenseArchive]:
+    """
+    Write expense rows (with at least the archive columns, sorted by date) to a new Parquet file;
+    returns its manifest entry.
+
+    Also adds their rollups and logs them as ``archive`` changes; the caller
+    takes the rows out of the live table and commits. None if there are no rows.
+    """
+    if not rows:
+        return None
+    pa = _pyarrow()
+    store = store or get_store()
+    schema = _schema(pa)
+    table = pa.table([pa.array([getattr(row, column.name) for row in rows], type=column.type) for column in schema],
+                     schema=schema)
+    buffer = io.BytesIO()
+    pa.parquet.write_table(table, buffer, compression="zstd", row_group_size=ROW_GROUP_SIZE)
+    first, last = rows[0].date, rows[-1].date
+    name = f"expenses_{first}_{last}_{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}.parquet"
+    store.put(name, buffer.getvalue())
+
+    _merge_rollups(db, rows)
+    manifest = ExpenseArchive(name=name, first_date=first, last_date=last,
+                              row_count=len(rows), size_bytes=buffer.tell())
+    db.add(manifest)
+    change_log.record(db, change_log.ARCHIVE, [row.id for row in rows])
+    db.flush()
+    logger.info(f"Archived {len(rows)} expenses ({first}..{last}) to {name}")
+    return manifest
+
+
+def archive_expenses(db: Session, cutoff: date, store=None) -> Optional[ExpenseArchive]:
+    """
+    Move expenses dated before cutoff into a new Parquet file; returns its manifest entry (None if nothing to move).
+
+    The file is written before the database changes, so a failed run leaves
+    at most an unreferenced file. Archived expenses are logged as ``archive``
+    changes. The caller commits.
+    """
+    rows = db.execute(
+        select(*(getattr(Expense, name) for name in _schema(_pyarrow()).names))
+        .where(Expense.date < cutoff)
+        .order_by(Expense.date, Expense.id)
+    ).all()
+    manifest = write_archive(db, rows, store)
+    # Delete exactly the rows written to the file, not ones added since the SELECT
+    ids = [row.id for row in rows]
+    for start in range(0, len(ids), 500):
+        db.execute(delete(Expense).where(Expense.id.in_(ids[start:start + 500])))
+    return manifest
+
+
+def grouped_totals(db: Session, keys: Sequence[str], period_start: Optional[date] = None,
+                   period_end: Optional[date] = None) -> List[Tuple]:
+    """
+    (*keys, count, total_paise, max_paise) over live expenses and archived rollups, ordered by keys.
+
+    `keys` are "date" and/or "category_id". Live expenses are aggregated by
+    the DuckDB analytics mirror when it is enabled and current.
+    """
+    sources = [
+        (ExpenseRollup, func.sum(ExpenseRollup.expense_count), func.sum(ExpenseRollup.total_paise),
+         func.max(ExpenseRollup.max_paise)),
+    ]
+    live = analytics_mirror.live_totals(db, keys, period_start, period_end)
+    if live is None:
+        sources.append(
+            (Expense, func.count(Expense.id), func.sum(Expense.amount_paise), func.max(Expense.amount_paise))
+        )
+    merged: Dict[Tuple, List[int]] = {}
+    for model, count, total, largest in sources:
+        group = [getattr(model, key) for key in keys]
+        conditions = []
+        if period_start is not None:
+            conditions.append(model.date >= period_start)
+        if period_end is not None:
+            conditions.append(model.date <= period_end)
+        rows = db.execute(select(*group, count, total, largest).where(*conditions).group_by(*group)).all()
+        if model is ExpenseRollup and live is not None:
+            rows += live
+        for row in rows:
+            key = tuple(row[:len(keys)])
+            n, paise, most = row[len(keys):]
+            entry = merged.get(key)
+            if entry is None:
+                merged[key] = [n, paise, most]
+            else:
+                entry[0] += n
+                entry[1] += paise
+                entry[2] = max(entry[2], most)
+    return [key + tuple(values) for key, values in sorted(merged.items())]
+
+
+def _archives_for(db: Session, plan: FilterPlan) -> List[Tuple[str, date, date]]:
+    """(name, first date, last date) of the archive files the plan's date filters can reach (all without one)"""
+    archives = db.execute(select(ExpenseArchive.name, ExpenseArchive.first_date, ExpenseArchive.last_date)
+                          .order_by(ExpenseArchive.first_date)).all()
+    if not plan.date_filters:
+        return [tuple(archive) for archive in archives]
+    return [(name, first, last) for name, first, last in archives if plan.overlaps(first, last)]
+
+
+def _filter_expression(pc, plan: FilterPlan):
+    ranges_conditions = []
+    for column, filters in (("date", plan.date_filters), ("amount_paise", plan.amount_filters)):
+        for ranges in filters:
+            clauses = []
+            for low, high in ranges:
+                bounds = []
+                if low is not None:
+                    bounds.append(pc.field(column) >= low)
+                if high is not None:
+                    bounds.append(pc.field(column) <= high)
+                clause = bounds[0]
+                for bound in bounds[1:]:
+                    clause = clause & bound
+                clauses.append(clause)
+            condition = clauses[0]
+            for clause in clauses[1:]:
+                condition = condition | clause
+            ranges_conditions.append(condition)
+    if plan.category_ids:
+        ranges_conditions.append(pc.field("category_id").isin(plan.category_ids))
+    if plan.search:
+        ranges_conditions.append(pc.match_substring(pc.field("title"), plan.search, ignore_case=True)
+                                 | pc.match_substring(pc.field("description"), plan.search, ignore_case=True))
+    if not ranges_conditions:
+        return None
+    expression = ranges_conditions[0]
+    for condition in ranges_conditions[1:]:
+        expression = expression & condition
+    return expression
+
+
+def _sort_value(value: Any) -> Any:
+    # Archived timestamps are UTC-aware; SQLite returns naive UTC ones
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _field_rows(values: Dict[str, List], names: Sequence[str]) -> List[Tuple]:
+    """Archived column values as tuples of the `names` fields"""
+    if "amount" in names:
+        # Same value as the Expense.amount SQL expression
+        values = {**values, "amount": [paise / 100.0 for paise in values["amount_paise"]]}
+    columns = [values["amount" if name == "amount" else ARCHIVE_COLUMNS[name]] for name in names]
+    return list(zip(*columns))
+
+
+def archived_rows(db: Session, plan: FilterPlan, names: Sequence[str], limit: int,
+                  files: Optional[List[str]] = None, store=None) -> List[Tuple]:
+    """
+    The first `limit` archived expenses matching the plan, in its sort order.
+
+    Rows are tuples of the `names` fields (categories as ids, like the SQL
+    rows) followed by the sort value.
+    """
+    files = [name for name, _, _ in _archives_for(db, plan)] if files is None else files
+    if not files:
+        return []
+    pa = _pyarrow()
+    store = store or get_store()
+    expression = _filter_expression(pa.compute, plan)
+    needed = sorted({ARCHIVE_COLUMNS[name] for name in names} | {SORT_FIELDS[plan.sort_by]})
+    tables = [
+        pa.parquet.read_table(store.local_path(name), columns=needed, filters=expression, memory_map=True)
+        for name in files
+    ]
+    table = pa.concat_tables(tables)
+    sort_column = SORT_FIELDS[plan.sort_by]
+    if plan.sort_by != "category":
+        table = table.sort_by([(sort_column, "descending" if plan.descending else "ascending")]).slice(0, limit)
+
+    values = {column: table.column(column).to_pylist() for column in needed}
+    if plan.sort_by == "category":
+        sort_values = [categories.category_name(i) for i in values["category_id"]]
+    else:
+        sort_values = values[sort_column]
+    rows = [row + (sort_value,) for row, sort_value in zip(_field_rows(values, names), sort_values)]
+    if plan.sort_by == "category":
+        rows.sort(key=lambda row: row[-1], reverse=plan.descending)
+        rows = rows[:limit]
+    return rows
+
+
+def query_expenses(db: Session, plan: FilterPlan, columns: Sequence, names: Sequence[str],
+                   skip: int, limit: int) -> Optional[List[Tuple]]:
+    """
+    A page of expenses from the live table merged with archived ones, or
+    None when no archive file can match the plan (query the table alone then).
+    """
+    archives = _archives_for(db, plan)
+    if not archives:
+        return None
+    sort_column = SORT_COLUMNS[plan.sort_by][0]
+    hot = plan.apply(db.query(*columns, sort_column)).limit(skip + limit).all()
+    if plan.sort_by == "date" and len(hot) == skip + limit:
+        # A full page of live rows: only files with days that sort before its last row can change it
+        boundary = hot[-1][-1]
+        archives = [(name, first, last) for name, first, last in archives
+                    if (last >= boundary if plan.descending else first <= boundary)]
+    if not archives:
+        return [tuple(row[:-1]) for row in hot[skip:]]
+    cold = archived_rows(db, plan, names, skip + limit, [name for name, _, _ in archives])
+    merged = sorted(list(hot) + cold, key=lambda row: _sort_value(row[-1]), reverse=plan.descending)
+    return [tuple(row[:-1]) for row in merged[skip:skip + limit]]
+
+
+def archived_expense(db: Session, expense_id: int, names: Sequence[str], store=None) -> Optional[Tuple]:
+    """One archived expense as a tuple of the `names` fields (category as id), or None"""
+    files = db.execute(select(ExpenseArchive.name).order_by(ExpenseArchive.first_date.desc())).scalars().all()
+    if not files:
+        return None
+    pa = _pyarrow()
+    store = store or get_store()
+    needed = sorted({ARCHIVE_COLUMNS[name] for name in names})
+    for name in files:
+        # Row group statistics on id skip most of each file
+        table = pa.parquet.read_table(store.local_path(name), columns=needed,
+                                      filters=pa.compute.field("id") == expense_id, memory_map=True)
+        if table.num_rows:
+            values = {column: table.column(column).to_pylist()[:1] for column in needed}
+            return _field_rows(values, names)[0]
+    return None
@@ -0,0 +1,105 @@
+"""
+Expense change log and the delta-sync feed built on it.
+
+Every API write appends (expense id, operation) rows to ``expense_changes``
+in the same transaction as the write. The autoincrement ``version`` is the
+sync cursor: a client that has applied everything up to version N asks for
+changes after N and gets each changed expense once, as its current row, as
+a delete tombstone or as an ``archive`` entry for an expense that left the
+live table without being deleted (moved to the Parquet archive or a
+detached partition); clients keep their copy of those.
+
+On PostgreSQL, writers take a transaction-scoped advisory lock before
+logging, so versions become visible in commit order and a reader can never
+see version N+1 while N is still uncommitted (which would let a client
+skip N). SQLite serializes writers already.
+"""
+from typing import Callable, Dict, Iterable, List, Sequence, Set, Tuple
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.models import Expense, ExpenseChange
+
+INSERT = "insert"
+UPDATE = "update"
+DELETE = "delete"
+ARCHIVE = "archive"
+
+MAX_CHANGES = 1000
+
+# Arbitrary application-wide key for pg_advisory_xact_lock
+_LOG_LOCK_KEY = 0x76656761
+
+CHANGES_TABLE = ExpenseChange.__table__
+
+
+def record(db: Session, operation: str, expense_ids: Iterable[int]) -> None:
+    """Log writes to expenses; call before committing the transaction that made them"""
+    rows = [{"expense_id": expense_id, "operation": operation} for expense_id in expense_ids]
+    if not rows:
+        return
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _LOG_LOCK_KEY})
+    db.execute(insert(CHANGES_TABLE), rows)
+
+
+def current_version(db: Session) -> int:
+    """Latest change version (0 before the first logged write)"""
+    return db.execute(select(func.max(ExpenseChange.version))).scalar() or 0
+
+
+def changes_since(db: Session, since: int, limit: int, columns: Sequence,
+                  serialize: Callable[[List], List[Dict]]) -> Tuple[List[Dict], int, bool]:
+    """
+    Changes after version `since`, at most `limit` log entries.
+
+    Returns (changes, version, has_more). Each expense appears once, at the
+    position of its latest change in the page: ``upsert`` with the current
+    row (`columns` selected, turned into dicts with an "id" by `serialize`),
+    ``delete`` or ``archive`` (no row; the expense still exists, outside the
+    live table).
+    `version` is the cursor for the next call.
+    """
+    entries = db.execute(
+        select(ExpenseChange.version, ExpenseChange.expense_id, ExpenseChange.operation)
+        .where(ExpenseChange.version > since)
+        .order_by(ExpenseChange.version)
+        .limit(limit + 1)
+    ).all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    if not entries:
+        return [], since, False
+
+    latest: Dict[int, Tuple[int, str]] = {}
+    for version, expense_id, operation in entries:
+        latest.pop(expense_id, None)
+        latest[expense_id] = (version, operation)
+
+    live_ids = [expense_id for expense_id, (_, operation) in latest.items() if operation not in (DELETE, ARCHIVE)]
+    current: Dict[int, Dict] = {}
+    archived_later: Set[int] = set()
+    if live_ids:
+        rows = db.execute(select(*columns).where(Expense.id.in_(live_ids))).all()
+        current = {expense["id"]: expense for expense in serialize(rows)}
+        gone = [expense_id for expense_id in live_ids if expense_id not in current]
+        if gone:
+            # Rows that left after this page: archived ones must not become tombstones
+            archived_later = set(db.execute(
+                select(ExpenseChange.expense_id)
+                .where(ExpenseChange.version > entries[-1][0], ExpenseChange.operation == ARCHIVE,
+                       ExpenseChange.expense_id.in_(gone))
+            ).scalars())
+
+    changes = []
+    for expense_id, (version, operation) in latest.items():
+        expense = current.get(expense_id)
+        if expense is not None:
+            changes.append({"version": version, "operation": "upsert", "id": expense_id, "expense": expense})
+        elif operation == ARCHIVE or expense_id in archived_later:
+            changes.append({"version": version, "operation": ARCHIVE, "id": expense_id, "expense": None})
+        else:
+            # Deleted (possibly later than this page); the row is gone either way
+            changes.append({"version": version, "operation": DELETE, "id": expense_id, "expense": None})
+    return changes, entries[-1][0], has_more
@@ -0,0 +1,133 @@
+"""
+Circuit breaker for calls to slow or unreliable upstream services.
+
+The breaker keeps the outcomes of the last `window` calls. When enough of
+them failed or took longer than `slow_call_seconds`, it opens and rejects
+calls immediately (callers go straight to their fallback) for
+`open_seconds`. It then half-opens and lets a few probe calls through:
+if they all succeed quickly it closes again, otherwise it re-opens.
+"""
+import threading
+import time
+from collections import deque
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Gauge values for each state
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the upstream while the breaker is open"""
+
+
+class CircuitBreaker:
+    """Count-based sliding-window breaker with failure-rate and slow-call-rate thresholds"""
+
+    def __init__(self, name: str, window: int = 20, minimum_calls: int = 5,
+                 failure_rate: float = 0.5, slow_call_rate: float = 0.5, slow_call_seconds: float = 5.0,
+                 open_seconds: float = 30.0, half_open_calls: int = 2,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.minimum_calls = minimum_calls
+        self.failure_rate = failure_rate
+        self.slow_call_rate = slow_call_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.clock = clock
+        self._lock = threading.Lock()
+        # (failed, slow) per call, most recent last
+        self._outcomes = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        # Bumped on every state change, so calls that finish after one are not counted
+        self._epoch = 0
+
+    def _refresh(self) -> None:
+        # Caller holds the lock
+        if self._state == OPEN and self.clock() - self._opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN)
+
+    def _transition(self, state: str) -> None:
+        self._state = state
+        self._epoch += 1
+        self._outcomes.clear()
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        if state == OPEN:
+            self._opened_at = self.clock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def allows_requests(self) -> bool:
+        """Whether a call could go through now (does not reserve a half-open probe)"""
+        with self._lock:
+            self._refresh()
+            if self._state == HALF_OPEN:
+                return self._probes_in_flight < self.half_open_calls
+            return self._state == CLOSED
+
+    def _acquire(self) -> int:
+        with self._lock:
+            self._refresh()
+            if self._state == OPEN:
+                raise CircuitOpenError(f"Circuit '{self.name}' is open")
+            if self._state == HALF_OPEN:
+                if self._probes_in_flight >= self.half_open_calls:
+                    raise CircuitOpenError(f"Circuit '{self.name}' is half-open and probing")
+                self._probes_in_flight += 1
+            return self._epoch
+
+    def _record(self, epoch: int, failed: bool, elapsed: float) -> None:
+        slow = elapsed >= self.slow_call_seconds
+        with self._lock:
+            if epoch != self._epoch:
+                # Started before the last state change
+                return
+            if self._state == HALF_OPEN:
+                self._probes_in_flight -= 1
+                if failed or slow:
+                    self._transition(OPEN)
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_calls:
+                        self._transition(CLOSED)
+                return
+
+            self._outcomes.append((failed, slow))
+            calls = len(self._outcomes)
+            if calls < self.minimum_calls:
+                return
+            failures = sum(1 for outcome in self._outcomes if outcome[0])
+            slow_calls = sum(1 for outcome in self._outcomes if outcome[1])
+            if failures / calls >= self.failure_rate or slow_calls / calls >= self.slow_call_rate:
+                self._transition(OPEN)
+
+    def call(self, func: Callable[[], T]) -> T:
+        """Run func through the breaker; raises CircuitOpenError without calling it while open"""
+        epoch = self._acquire()
+        start = self.clock()
+        failed = True
+        try:
+            result = func()
+            failed = False
+            return result
+        finally:
+            self._record(epoch, failed, self.clock() - start)
+
+    def reset(self) -> None:
+        """Close the breaker and forget recorded outcomes"""
+        with self._lock:
+            self._transition(CLOSED)
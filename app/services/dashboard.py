@@ -0,0 +1,140 @@
+"""
+Dashboard sections built from memoized spending features.
+
+Every section the dashboard and insights pages show (summary, category
+breakdown, monthly trends, recent spending trends) is derived from the
+SpendingFeatures aggregates, so one page view costs at most two GROUP BY
+queries (all time and the trend window), and none while both are memoized.
+Each section is cached under its own key and rebuilt only when the features
+it was built from are replaced.
+"""
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.services.spending_features import SpendingFeatures, get_features
+from app.utils.metrics import record_cache_lookup
+from app.utils.money import from_paise, mean_rupees
+
+
+def summary(features: SpendingFeatures) -> Dict[str, Any]:
+    """Same shape as GET /expenses/stats/summary"""
+    if features.is_empty:
+        return {
+            "total_expenses": 0,
+            "total_amount": 0.0,
+            "average_amount": 0.0,
+            "categories": [],
+            "expense_count": 0
+        }
+    counts = dict(features.category_counts)
+    return {
+        "total_expenses": features.expense_count,
+        "total_amount": from_paise(features.total_paise),
+        "average_amount": mean_rupees(features.total_paise, features.expense_count),
+        "categories": {
+            name: {"count": counts[name], "amount": from_paise(paise)}
+            for name, paise in features.category_totals_paise
+        },
+        "expense_count": features.expense_count
+    }
+
+
+def category_breakdown(features: SpendingFeatures) -> Dict[str, Any]:
+    """Same shape as GET /expenses/analytics/category-breakdown"""
+    if features.is_empty:
+        return {"categories": [], "total_amount": 0}
+    total_paise = features.total_paise
+    counts = dict(features.category_counts)
+    return {
+        "categories": [
+            {
+                "category": name,
+                "amount": from_paise(paise),
+                "count": counts[name],
+                "percentage": round(paise / total_paise * 100, 2) if total_paise > 0 else 0
+            }
+            for name, paise in features.category_totals_paise
+        ],
+        "total_amount": from_paise(total_paise)
+    }
+
+
+def monthly_trends(features: SpendingFeatures) -> Dict[str, Any]:
+    """Same shape as GET /expenses/analytics/monthly-trends"""
+    counts = dict(features.monthly_counts)
+    months = [
+        {
+            "month": datetime.strptime(month, "%Y-%m").strftime("%b %Y"),
+            "amount": from_paise(paise),
+            "count": counts[month],
+            "average": mean_rupees(paise, counts[month])
+        }
+        for month, paise in features.monthly_totals_paise
+    ]
+    return {"months": months, "total_months": len(months)}
+
+
+def spending_trends(features: SpendingFeatures, days: int) -> Dict[str, Any]:
+    """Same shape as GET /ai/spending-trends"""
+    daily_spending = features.daily_totals
+    return {
+        "period_days": days,
+        "total_expenses": features.expense_count,
+        "total_amount": features.total_spent,
+        "daily_spending": daily_spending,
+        "category_breakdown": features.category_totals,
+        "average_daily": sum(daily_spending.values()) / max(len(daily_spending), 1)
+    }
+
+
+def trend_period(days: int, today: date = None) -> Tuple[date, date]:
+    """The last `days` days up to today, as passed to get_features by /ai/spending-trends"""
+    end = today or datetime.now().date()
+    return end - timedelta(days=days), end
+
+
+# Section name -> builder taking (features, days)
+SECTIONS: Dict[str, Callable[[SpendingFeatures, int], Dict[str, Any]]] = {
+    "summary": lambda features, days: summary(features),
+    "category_breakdown": lambda features, days: category_breakdown(features),
+    "monthly_trends": lambda features, days: monthly_trends(features),
+    "spending_trends": spending_trends,
+}
+
+# Sections computed over the trend window instead of all time
+WINDOWED_SECTIONS = frozenset({"spending_trends"})
+
+# (section, days) -> (features the section was built from, section)
+_sections: Dict[Hashable, Tuple[SpendingFeatures, Dict[str, Any]]] = {}
+_sections_lock = threading.Lock()
+
+
+def section(db: Session, name: str, days: int = 30) -> Dict[str, Any]:
+    """One dashboard section, rebuilt only when its underlying features change"""
+    if name in WINDOWED_SECTIONS:
+        features = get_features(db, *trend_period(days))
+        key = (name, days)
+    else:
+        features = get_features(db)
+        key = (name, None)
+
+    with _sections_lock:
+        entry = _sections.get(key)
+    if entry is not None and entry[0] is features:
+        record_cache_lookup("dashboard_section", True)
+        return entry[1]
+
+    record_cache_lookup("dashboard_section", False)
+    built = SECTIONS[name](features, days)
+    with _sections_lock:
+        _sections[key] = (features, built)
+    return built
+
+
+def clear() -> None:
+    """Drop every cached section"""
+    with _sections_lock:
+        _sections.clear()
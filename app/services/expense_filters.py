@@ -0,0 +1,206 @@
+"""
+Filter planner for expense list queries.
+
+Turns the GET /expenses query parameters into SQL conditions that the
+expense indexes can serve: category names become equality/IN on
+category_id (resolved against the category registry, never LIKE), amounts
+compare the integer column, sorting is limited to indexed columns, and the
+plan records which index is expected to drive the query so it can be
+reported (``X-Query-Plan`` in DEBUG mode).
+"""
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, asc, desc, false, or_
+
+from app.models import Expense
+from app.utils import categories
+from app.utils.money import to_paise
+
+# Sortable fields -> (column, index that returns rows in that order)
+SORT_COLUMNS = {
+    "date": (Expense.date, "idx_expense_date_amount"),
+    "amount": (Expense.amount_paise, "idx_expense_amount_desc"),
+    "title": (Expense.title, "idx_expense_title_search"),
+    "created_at": (Expense.created_at, "idx_expense_created_at"),
+    "id": (Expense.id, "primary key"),
+    # Category name order (a lookup per row); no index returns rows in that order
+    "category": (Expense.category, None),
+}
+
+RANGE_SEPARATOR = ".."
+
+Range = Tuple[Optional[Any], Optional[Any]]
+
+
+@dataclass
+class FilterPlan:
+    """Conditions and ordering for one expense query, plus how the indexes should serve it"""
+    conditions: List[Any] = field(default_factory=list)
+    order_by: Any = None
+    index: Optional[str] = None
+    ordered_by_index: bool = False
+    # A filter that cannot match anything (e.g. an unknown category); skip the query
+    empty: bool = False
+    steps: List[str] = field(default_factory=list)
+    # The parsed filters, for sources other than SQL (the Parquet archive)
+    category_ids: List[int] = field(default_factory=list)
+    # Each list of ranges is OR-ed; the lists are AND-ed (amounts in paise)
+    date_filters: List[List[Range]] = field(default_factory=list)
+    amount_filters: List[List[Range]] = field(default_factory=list)
+    search: Optional[str] = None
+    sort_by: str = "date"
+    descending: bool = True
+
+    def apply(self, query):
+        """Add the plan's WHERE and ORDER BY to a query"""
+        if self.conditions:
+            query = query.filter(*self.conditions)
+        return query.order_by(self.order_by)
+
+    def describe(self) -> str:
+        """One-line summary, e.g. ``index=idx_expense_category_date; category_id = 1; order by date desc (index)``"""
+        if self.empty:
+            return "; ".join(["skipped (no possible matches)"] + self.steps)
+        return "; ".join([f"index={self.index or 'none (scan)'}"] + self.steps)
+
+    def overlaps(self, first: date, last: date) -> bool:
+        """Whether the date filters can match a day between first and last (no date filter: never)"""
+        return bool(self.date_filters) and all(
+            any((low is None or low <= last) and (high is None or high >= first) for low, high in ranges)
+            for ranges in self.date_filters
+        )
+
+
+def parse_range(value: str, convert) -> Range:
+    """Parse ``start..end`` (either side may be empty) with `convert` applied to each bound"""
+    if RANGE_SEPARATOR not in value:
+        raise ValueError(f"Range '{value}' must look like start..end")
+    start, end = (part.strip() for part in value.split(RANGE_SEPARATOR, 1))
+    low = convert(start) if start else None
+    high = convert(end) if end else None
+    if low is None and high is None:
+        raise ValueError(f"Range '{value}' needs a start or an end")
+    if low is not None and high is not None and low > high:
+        raise ValueError(f"Range '{value}' starts after it ends")
+    return low, high
+
+
+def _amount(value: str) -> int:
+    try:
+        return to_paise(Decimal(value))
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount '{value}'")
+
+
+def _date(value: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid date '{value}' (expected YYYY-MM-DD)")
+
+
+def _range_condition(column, ranges: Sequence[Range]):
+    """OR of closed ranges on one column"""
+    clauses = []
+    for low, high in ranges:
+        bounds = []
+        if low is not None:
+            bounds.append(column >= low)
+        if high is not None:
+            bounds.append(column <= high)
+        clauses.append(and_(*bounds))
+    return clauses[0] if len(clauses) == 1 else or_(*clauses)
+
+
+def _describe_ranges(name: str, ranges: Sequence[Range]) -> str:
+    return " or ".join(f"{name} in [{'' if low is None else low}..{'' if high is None else high}]"
+                       for low, high in ranges)
+
+
+def plan(category: Optional[str] = None, date_from: Optional[date] = None, date_to: Optional[date] = None,
+         min_amount: Optional[Decimal] = None, max_amount: Optional[Decimal] = None,
+         date_ranges: Sequence[str] = (), amount_ranges: Sequence[str] = (),
+         search: Optional[str] = None, sort_by: str = "date", sort_order: str = "desc") -> FilterPlan:
+    """
+    Plan the filters and ordering for GET /expenses.
+
+    `category` is a comma-separated list of names or name fragments;
+    `date_ranges` and `amount_ranges` are ``start..end`` strings, OR-ed
+    together within each list. Raises ValueError for unknown sort fields or
+    malformed ranges.
+    """
+    if sort_by not in SORT_COLUMNS:
+        raise ValueError(f"Cannot sort by '{sort_by}' (expected one of: {', '.join(SORT_COLUMNS)})")
+    descending = sort_order.lower() != "asc"
+    result = FilterPlan(search=search or None, sort_by=sort_by, descending=descending)
+
+    # Filters are added in index column order: category_id, date, amount_paise
+    category_ids: List[int] = []
+    if category:
+        for fragment in (part.strip() for part in category.split(",")):
+            if fragment:
+                category_ids.extend(i for i in categories.matching_ids(fragment) if i not in category_ids)
+        if not category_ids:
+            result.empty = True
+            result.conditions.append(false())
+            result.steps.append(f"category '{category}' matches nothing")
+        elif len(category_ids) == 1:
+            result.conditions.append(Expense.category_id == category_ids[0])
+            result.steps.append(f"category_id = {category_ids[0]}")
+        else:
+            category_ids.sort()
+            result.conditions.append(Expense.category_id.in_(category_ids))
+            result.steps.append(f"category_id in {tuple(category_ids)}")
+
+    # date_from/date_to and min/max_amount are AND-ed with the OR of the extra ranges
+    date_filters = []
+    if date_from is not None or date_to is not None:
+        date_filters.append([(date_from, date_to)])
+    if date_ranges:
+        date_filters.append([parse_range(value, _date) for value in date_ranges])
+    amount_filters = []
+    if min_amount is not None or max_amount is not None:
+        amount_filters.append([(None if min_amount is None else to_paise(min_amount),
+                                None if max_amount is None else to_paise(max_amount))])
+    if amount_ranges:
+        amount_filters.append([parse_range(value, _amount) for value in amount_ranges])
+
+    result.category_ids = category_ids
+    result.date_filters = date_filters
+    result.amount_filters = amount_filters
+    for column, name, filters in ((Expense.date, "date", date_filters),
+                                  (Expense.amount_paise, "amount_paise", amount_filters)):
+        for ranges in filters:
+            result.conditions.append(_range_condition(column, ranges))
+            result.steps.append(_describe_ranges(name, ranges))
+
+    if search:
+        # Leading-wildcard LIKE cannot use an index; it filters whatever the index returns
+        result.conditions.append(or_(Expense.title.ilike(f"%{search}%"), Expense.description.ilike(f"%{search}%")))
+        result.steps.append("title/description contains search text")
+
+    sort_column, sort_index = SORT_COLUMNS[sort_by]
+    result.order_by = desc(sort_column) if descending else asc(sort_column)
+
+    if result.empty:
+        return result
+    # Pick the index that narrows the most and, where possible, also returns rows in order
+    if category_ids:
+        # One probe per category id; a single id also returns rows in date order
+        result.index = "idx_expense_category_date"
+        result.ordered_by_index = len(category_ids) == 1 and sort_by == "date"
+    elif date_filters:
+        result.index = "idx_expense_date_amount"
+        result.ordered_by_index = sort_by == "date"
+    elif amount_filters:
+        result.index = "idx_expense_amount_desc"
+        result.ordered_by_index = sort_by == "amount"
+    else:
+        result.index = sort_index
+        result.ordered_by_index = sort_index is not None
+    result.steps.append(f"order by {sort_by} {'desc' if descending else 'asc'}"
+                        f" ({'index' if result.ordered_by_index else 'sort'})")
+    return result
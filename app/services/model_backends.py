@@ -0,0 +1,208 @@
+"""
+Chat model backends for the AI routes.
+
+Every backend takes OpenAI-style chat messages and returns the reply text.
+The backend is picked with AI_BACKEND:
+
+- ``openai``: the OpenAI API (needs OPENAI_API_KEY)
+- ``mock``: deterministic offline stand-in with configurable latency and
+  output size, for load tests on machines without network access
+- ``local``: a small GGUF model through llama-cpp-python (optional dependency)
+"""
+import abc
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+Messages = List[Dict[str, str]]
+
+
+class ModelBackend(abc.ABC):
+    """Interface implemented by every chat model backend"""
+
+    name = "base"
+
+    def available(self) -> bool:
+        """Whether the backend can serve requests (credentials, model files, libraries)"""
+        return True
+
+    @abc.abstractmethod
+    def complete(self, messages: Messages, temperature: float = 0.3, max_tokens: int = 200) -> str:
+        """Reply text for the chat `messages`"""
+
+
+class OpenAIBackend(ModelBackend):
+    """OpenAI chat completions; the SDK is imported and the client created on first use"""
+
+    name = "openai"
+
+    def __init__(self, api_key: str, model: str, timeout: float = 10.0):
+        self.api_key = api_key
+        self.model = model
+        self.timeout = timeout
+        self._client = None
+        self._initialized = False
+        self._lock = threading.Lock()
+
+    def client(self):
+        """The shared OpenAI client, or None when no API key or SDK is available"""
+        if self._initialized:
+            return self._client
+
+        with self._lock:
+            if self._initialized:
+                return self._client
+
+            if not self.api_key:
+                logger.warning("❌ OPENAI_API_KEY not found in environment variables")
+            else:
+                try:
+                    from openai import OpenAI
+                    # No SDK retries: failures go to the circuit breaker and the rule-based fallback
+                    self._client = OpenAI(api_key=self.api_key, timeout=self.timeout, max_retries=0)
+                    logger.info("✅ OpenAI client initialized successfully")
+                except ImportError as e:
+                    logger.warning(f"❌ OpenAI library not available: {e}")
+                except Exception as e:
+                    logger.error(f"❌ Error initializing OpenAI client: {e}")
+            self._initialized = True
+            return self._client
+
+    def available(self) -> bool:
+        return self.client() is not None
+
+    def complete(self, messages: Messages, temperature: float = 0.3, max_tokens: int = 200) -> str:
+        response = self.client().chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+        return response.choices[0].message.content.strip()
+
+
+class MockBackend(ModelBackend):
+    """
+    Deterministic stand-in: sleeps for the configured latency and returns
+    about `tokens` words derived from a hash of the prompt. Prompts that ask
+    for JSON get an object with every key the AI routes parse.
+
+    `error_rate` makes that fraction of calls raise, and a latency above
+    `timeout` times out, to rehearse upstream incidents.
+    """
+
+    name = "mock"
+
+    def __init__(self, latency_ms: float, tokens: int, error_rate: float = 0.0, timeout: float = 10.0):
+        self.latency_ms = latency_ms
+        self.tokens = tokens
+        self.error_rate = error_rate
+        self.timeout = timeout
+
+    def _words(self, seed: str, count: int) -> List[str]:
+        digest = hashlib.sha256(seed.encode("utf-8")).hexdigest()
+        return [f"mock{digest[i % len(digest)]}{i}" for i in range(max(count, 1))]
+
+    def complete(self, messages: Messages, temperature: float = 0.3, max_tokens: int = 200) -> str:
+        if self.latency_ms / 1000 > self.timeout:
+            time.sleep(self.timeout)
+            raise TimeoutError(f"Mock backend timed out after {self.timeout}s")
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000)
+        if self.error_rate and random.random() < self.error_rate:
+            raise RuntimeError("Mock backend error")
+
+        prompt = "\n".join(message["content"] for message in messages)
+        words = self._words(prompt, min(self.tokens, max_tokens))
+        if "json" not in prompt.lower():
+            return " ".join(words)
+
+        # Spread the words over three items in each list field
+        third = max(len(words) // 9, 1)
+        chunks = [" ".join(words[i * third:(i + 1) * third]) or "mock" for i in range(9)]
+        return json.dumps({
+            "patterns": chunks[0:3],
+            "outliers": chunks[3:6],
+            "suggestions": chunks[6:9],
+            "potential_savings": len(words) * 10,
+            "priority_areas": ["Food"],
+        })
+
+
+class LocalModelBackend(ModelBackend):
+    """Small local model (GGUF) through llama-cpp-python, loaded on first use"""
+
+    name = "local"
+
+    def __init__(self, model_path: str, context_size: int = 2048):
+        self.model_path = model_path
+        self.context_size = context_size
+        self._llm = None
+        self._load_error: Optional[str] = None
+        # llama.cpp contexts are not thread-safe; serialize generations
+        self._lock = threading.Lock()
+
+    def _model(self):
+        if self._llm is None and self._load_error is None:
+            try:
+                from llama_cpp import Llama
+                self._llm = Llama(model_path=self.model_path, n_ctx=self.context_size, verbose=False)
+                logger.info(f"✅ Local model loaded from {self.model_path}")
+            except ImportError as e:
+                self._load_error = f"llama-cpp-python not installed: {e}"
+            except Exception as e:
+                self._load_error = str(e)
+            if self._load_error:
+                logger.warning(f"❌ Local model unavailable: {self._load_error}")
+        return self._llm
+
+    def available(self) -> bool:
+        if not self.model_path:
+            return False
+        if self._llm is not None:
+            return True
+        with self._lock:
+            return self._model() is not None
+
+    def complete(self, messages: Messages, temperature: float = 0.3, max_tokens: int = 200) -> str:
+        with self._lock:
+            result = self._model().create_chat_completion(
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+        return result["choices"][0]["message"]["content"].strip()
+
+
+def create_backend(name: str) -> ModelBackend:
+    """Build the backend named by AI_BACKEND"""
+    if name == "openai":
+        return OpenAIBackend(settings.OPENAI_API_KEY, settings.MODEL_NAME, settings.MODEL_TIMEOUT_SECONDS)
+    if name == "mock":
+        return MockBackend(settings.MOCK_LATENCY_MS, settings.MOCK_TOKENS,
+                           settings.MOCK_ERROR_RATE, settings.MODEL_TIMEOUT_SECONDS)
+    if name == "local":
+        return LocalModelBackend(settings.LOCAL_MODEL_PATH)
+    raise ValueError(f"Unknown AI_BACKEND '{name}' (expected openai, mock or local)")
+
+
+_backend: Optional[ModelBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> Optional[ModelBackend]:
+    """The configured backend, or None when it cannot serve requests (routes then use fallbacks)"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend(settings.AI_BACKEND)
+    return _backend if _backend.available() else None
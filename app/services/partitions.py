@@ -0,0 +1,211 @@
+"""
+Monthly range partitioning of ``expenses`` on PostgreSQL.
+
+Optional: `enable` rebuilds ``expenses`` as a table declaratively
+partitioned by ``RANGE (date)``, one partition per month
+(``expenses_y2025m01``) plus ``expenses_default`` for dates outside them.
+Queries filter ``date`` with plain range comparisons, so PostgreSQL prunes
+the months a date-bounded query cannot touch and only scans the remaining
+partitions' (smaller) indexes.
+
+The primary key becomes ``(id, date)``, as partitioned tables require; ids
+still come from the one sequence. Lookups by id alone probe every
+partition's key index.
+
+Future months are created ahead of time with ``python -m tools.partitions
+create``, run from cron or a scheduled job (startup only warns when they are
+missing: creating one can move rows out of the default partition, which is
+not something every worker should race to do on boot). Old months are
+detached and written to the Parquet archive (see app.services.archive), so
+the API and analytics keep them and the detached table can be dropped
+without losing anything. Other databases keep the plain table and every
+function here is a no-op on them.
+"""
+import logging
+import re
+from datetime import date
+from typing import List, Optional, Tuple
+
+from sqlalchemy import column, select, table, text
+from sqlalchemy.orm import Session
+
+from app.models import Expense, ExpenseArchive
+from app.services import archive
+
+logger = logging.getLogger(__name__)
+
+TABLE = "expenses"
+DEFAULT_PARTITION = "expenses_default"
+# expenses_y2025m01; also matches detached partitions, which keep their names
+PARTITION_NAME = re.compile(r"^expenses_y(\d{4})m(\d{2})$")
+
+
+def add_months(month: date, months: int) -> date:
+    """First day of the month `months` after `month`"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"expenses_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    """Month a partition table holds, or None for other tables"""
+    match = PARTITION_NAME.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def is_partition_table(name: str) -> bool:
+    """Tables created here rather than by the migrations (alembic ignores them)"""
+    return name == DEFAULT_PARTITION or partition_month(name) is not None
+
+
+def _is_postgresql(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def is_partitioned(db: Session) -> bool:
+    if not _is_postgresql(db):
+        return False
+    return bool(db.execute(text(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"
+    ), {"table": TABLE}).first())
+
+
+def list_partitions(db: Session) -> List[Tuple[str, str]]:
+    """(partition, bound) for every attached partition, e.g. ``FOR VALUES FROM ('2025-01-01') TO ('2025-02-01')``"""
+    if not is_partitioned(db):
+        return []
+    return [tuple(row) for row in db.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = to_regclass(:table) ORDER BY c.relname"
+    ), {"table": TABLE})]
+
+
+def _create_partition(db: Session, parent: str, month: date) -> None:
+    name = partition_name(month)
+    bounds = {"start": month, "end": add_months(month, 1)}
+    bound_sql = f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+    has_default = db.execute(text("SELECT to_regclass(:name)"), {"name": DEFAULT_PARTITION}).scalar()
+    in_default = has_default and db.execute(text(
+        f"SELECT 1 FROM {DEFAULT_PARTITION} WHERE date >= :start AND date < :end LIMIT 1"
+    ), bounds).first()
+    if not in_default:
+        db.execute(text(f"CREATE TABLE {name} PARTITION OF {parent} {bound_sql}"))
+        return
+    # The month's rows are in the default partition: move them into the new one
+    db.execute(text(f"ALTER TABLE {parent} DETACH PARTITION {DEFAULT_PARTITION}"))
+    db.execute(text(f"CREATE TABLE {name} PARTITION OF {parent} {bound_sql}"))
+    db.execute(text(f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE date >= :start AND date < :end"), bounds)
+    db.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE date >= :start AND date < :end"), bounds)
+    db.execute(text(f"ALTER TABLE {parent} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+
+
+def missing_months(db: Session, months_ahead: int = 3, today: Optional[date] = None) -> List[date]:
+    """This month and the next `months_ahead` months that have no partition yet (none unless partitioned)"""
+    if not is_partitioned(db):
+        return []
+    existing = {name for name, _ in list_partitions(db)}
+    current = (today or date.today()).replace(day=1)
+    months = (add_months(current, offset) for offset in range(months_ahead + 1))
+    return [month for month in months if partition_name(month) not in existing]
+
+
+def ensure_partitions(db: Session, months_ahead: int = 3, today: Optional[date] = None) -> List[str]:
+    """Create the partitions for this month and the next `months_ahead` months; returns the ones created"""
+    created = []
+    for month in missing_months(db, months_ahead, today):
+        _create_partition(db, TABLE, month)
+        created.append(partition_name(month))
+    return created
+
+
+def _swap_in(db: Session, new_table: str, primary_key: str) -> None:
+    """Replace expenses with `new_table` (already filled), keeping the id sequence, key, indexes and foreign key"""
+    sequence = db.execute(text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": TABLE}).scalar()
+    if sequence:
+        db.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {new_table}.id"))
+    db.execute(text(f"DROP TABLE {TABLE}"))
+    db.execute(text(f"ALTER TABLE {new_table} RENAME TO {TABLE}"))
+    db.execute(text(f"ALTER TABLE {TABLE} ADD CONSTRAINT expenses_pkey PRIMARY KEY ({primary_key})"))
+    db.execute(text(
+        f"ALTER TABLE {TABLE} ADD CONSTRAINT fk_expenses_category_id FOREIGN KEY (category_id) REFERENCES categories (id)"
+    ))
+    # On a partitioned table, each index is created on every partition (and on future ones)
+    for index in Expense.__table__.indexes:
+        index.create(db.connection())
+
+
+def enable(db: Session, months_ahead: int = 3, today: Optional[date] = None) -> List[str]:
+    """
+    Rebuild expenses as a monthly partitioned table; returns the partitions created.
+
+    Copies every row while holding an EXCLUSIVE lock (reads continue, writes
+    wait), so run it in a maintenance window on large tables.
+    """
+    if not _is_postgresql(db):
+        raise ValueError("Expense partitioning needs PostgreSQL")
+    if is_partitioned(db):
+        return []
+    db.execute(text(f"LOCK TABLE {TABLE} IN EXCLUSIVE MODE"))
+    db.execute(text(
+        f"CREATE TABLE expenses_partitioned (LIKE {TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        "PARTITION BY RANGE (date)"
+    ))
+    current = (today or date.today()).replace(day=1)
+    oldest = db.execute(text(f"SELECT MIN(date) FROM {TABLE}")).scalar()
+    month = min(oldest.replace(day=1), current) if oldest else current
+    last = add_months(current, months_ahead)
+    created = []
+    while month <= last:
+        _create_partition(db, "expenses_partitioned", month)
+        created.append(partition_name(month))
+        month = add_months(month, 1)
+    db.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF expenses_partitioned DEFAULT"))
+    db.execute(text(f"INSERT INTO expenses_partitioned SELECT * FROM {TABLE}"))
+    _swap_in(db, "expenses_partitioned", "id, date")
+    logger.info(f"Partitioned {TABLE} into {len(created)} monthly partitions")
+    return created + [DEFAULT_PARTITION]
+
+
+def disable(db: Session) -> None:
+    """Rebuild expenses as a plain table from the attached partitions (detached ones are left alone)"""
+    if not is_partitioned(db):
+        return
+    db.execute(text(f"LOCK TABLE {TABLE} IN EXCLUSIVE MODE"))
+    db.execute(text(f"CREATE TABLE expenses_unpartitioned (LIKE {TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    db.execute(text(f"INSERT INTO expenses_unpartitioned SELECT * FROM {TABLE}"))
+    _swap_in(db, "expenses_unpartitioned", "id")
+
+
+def archive_detached(db: Session, name: str, store=None) -> Optional[ExpenseArchive]:
+    """
+    Write the rows of a detached partition table to the Parquet archive; returns its manifest entry.
+
+    Adds their rollups and logs them as ``archive`` changes, as
+    `archive.archive_expenses` does for rows it deletes. The table is left
+    in place; once this has committed it can be dropped.
+    """
+    detached = table(name, *(column(c.name, c.type) for c in Expense.__table__.columns))
+    rows = db.execute(select(detached).order_by(detached.c.date, detached.c.id)).all()
+    return archive.write_archive(db, rows, store)
+
+
+def detach(db: Session, month: date, store=None) -> str:
+    """
+    Detach one month's partition into a standalone table, archive its rows and return the table's name.
+
+    The month's expenses leave the live table but stay readable through the
+    archive, and analytics keep them through the rollups. Detaching only
+    changes the catalog, so the lock on expenses is held for a moment, not
+    for a copy. The caller commits; if the archive cannot be written the
+    transaction, detach included, must be rolled back.
+    """
+    name = partition_name(month)
+    if name not in {partition for partition, _ in list_partitions(db)}:
+        raise ValueError(f"No attached partition {name}")
+    db.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {name}"))
+    # Read after detaching: no write can reach the table any more
+    archive_detached(db, name, store)
+    return name
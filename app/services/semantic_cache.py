@@ -0,0 +1,132 @@
+"""
+Semantic cache for chat answers.
+
+Messages are normalized (stopwords dropped) and embedded locally as hashed
+word and character n-gram vectors (no model, no network). A new message
+reuses a cached answer when its cosine similarity to a cached message
+passes the threshold, both were asked against the same financial context,
+and they mention the same numbers, negations and categories ("spend on
+food" and "spend on travel" are close as strings but different questions).
+"""
+import math
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, FrozenSet, Hashable, Optional, Tuple
+
+from app.utils import categories
+
+DIMENSIONS = 1 << 12
+
+# Question scaffolding that does not change what is being asked
+STOPWORDS = frozenset(
+    "a an the i me my we our you your is are am was be do does did can could should would will "
+    "how what whats which when where why to of in on for about please tell give some any it this that".split()
+)
+NEGATIONS = frozenset("not no never dont cant without".split())
+
+_NON_WORD = re.compile(r"[^a-z0-9₹ ]+")
+_SPACES = re.compile(r"\s+")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+Vector = Dict[int, float]
+
+
+def normalize(message: str) -> str:
+    """Lowercase, drop punctuation and stopwords, collapse whitespace"""
+    text = _NON_WORD.sub(" ", message.lower().replace("'", ""))
+    return " ".join(word for word in _SPACES.split(text) if word and word not in STOPWORDS)
+
+
+def _bucket(feature: str) -> int:
+    return zlib.crc32(feature.encode("utf-8")) % DIMENSIONS
+
+
+def embed(text: str) -> Vector:
+    """L2-normalized sparse vector of hashed words, word bigrams and character trigrams"""
+    words = text.split()
+    features = list(words)
+    features.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+    padded = f" {text} "
+    features.extend(f"#{padded[i:i + 3]}" for i in range(len(padded) - 2))
+
+    vector: Vector = {}
+    for feature in features:
+        index = _bucket(feature)
+        vector[index] = vector.get(index, 0.0) + 1.0
+    norm = math.sqrt(sum(value * value for value in vector.values()))
+    return {index: value / norm for index, value in vector.items()} if norm else vector
+
+
+def cosine(a: Vector, b: Vector) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(value * b.get(index, 0.0) for index, value in a.items())
+
+
+def key_terms(text: str) -> FrozenSet[str]:
+    """Numbers, negations and category names in a normalized message; cached answers must match them exactly"""
+    words = set(text.split())
+    terms = set(_NUMBER.findall(text)) | (words & NEGATIONS)
+    terms.update(name for name in (name.lower() for name in categories.names()) if name in words)
+    return frozenset(terms)
+
+
+class SemanticCache:
+    """LRU of (context, message) -> answer with nearest-neighbour lookup"""
+
+    def __init__(self, max_entries: int = 256, threshold: float = 0.85, ttl_seconds: float = 3600,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        # (context, normalized message) -> (vector, key terms, answer, stored at)
+        self._entries: "OrderedDict[Tuple[Hashable, str], Tuple[Vector, FrozenSet[str], str, float]]" = OrderedDict()
+
+    def get(self, message: str, context: Hashable) -> Optional[str]:
+        """Cached answer for a message close enough to one asked in the same context"""
+        text = normalize(message)
+        if not text:
+            return None
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get((context, text))
+            if entry is not None and now - entry[3] < self.ttl_seconds:
+                self._entries.move_to_end((context, text))
+                return entry[2]
+            if not self._entries:
+                return None
+
+        vector = embed(text)
+        terms = key_terms(text)
+        best_key, best_score = None, self.threshold
+        with self._lock:
+            for key, (cached_vector, cached_terms, _, stored_at) in self._entries.items():
+                if key[0] != context or cached_terms != terms or now - stored_at >= self.ttl_seconds:
+                    continue
+                score = cosine(vector, cached_vector)
+                if score >= best_score:
+                    best_key, best_score = key, score
+            if best_key is None:
+                return None
+            self._entries.move_to_end(best_key)
+            return self._entries[best_key][2]
+
+    def put(self, message: str, context: Hashable, answer: str) -> None:
+        text = normalize(message)
+        if not text:
+            return
+        entry = (embed(text), key_terms(text), answer, self.clock())
+        with self._lock:
+            self._entries[(context, text)] = entry
+            self._entries.move_to_end((context, text))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
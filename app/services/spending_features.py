@@ -0,0 +1,199 @@
+"""
+Pre-aggregated spending features for the AI endpoints.
+
+Insights, savings suggestions, chat and spending trends all need the same
+inputs: totals, per-category and per-month sums, averages and a few sample
+transactions. They are computed here from one GROUP BY (date, category)
+query, frozen, and memoized per (data version, period) so repeated AI
+requests cost one index lookup (the latest change-log version) until the
+expenses change.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Expense
+from app.services import archive, change_log
+from app.utils import categories
+from app.utils.metrics import record_cache_lookup
+from app.utils.money import from_paise
+
+SAMPLE_SIZE = 10
+MAX_CACHED_PERIODS = 32
+
+Period = Tuple[Optional[date], Optional[date]]
+
+
+@dataclass(frozen=True)
+class SpendingFeatures:
+    """Aggregates over the expenses in one period (amounts in paise)"""
+    version: int
+    period_start: Optional[date]
+    period_end: Optional[date]
+    expense_count: int
+    total_paise: int
+    max_expense_paise: int
+    first_date: Optional[date]
+    last_date: Optional[date]
+    # Sorted by amount, largest first
+    category_totals_paise: Tuple[Tuple[str, int], ...]
+    category_counts: Tuple[Tuple[str, int], ...]
+    # ("YYYY-MM", paise), chronological
+    monthly_totals_paise: Tuple[Tuple[str, int], ...]
+    monthly_counts: Tuple[Tuple[str, int], ...]
+    # (date, paise), chronological
+    daily_totals_paise: Tuple[Tuple[date, int], ...]
+    # The first SAMPLE_SIZE expenses as prompt-ready dicts
+    sample_transactions: Tuple[Dict, ...]
+
+    @property
+    def is_empty(self) -> bool:
+        return self.expense_count == 0
+
+    @property
+    def total_spent(self) -> float:
+        return float(from_paise(self.total_paise))
+
+    @property
+    def average_expense(self) -> float:
+        return self.total_spent / self.expense_count if self.expense_count else 0.0
+
+    @property
+    def max_expense(self) -> float:
+        return float(from_paise(self.max_expense_paise))
+
+    @property
+    def category_totals(self) -> Dict[str, float]:
+        """Rupee totals per category, largest first"""
+        return {name: float(from_paise(paise)) for name, paise in self.category_totals_paise}
+
+    @property
+    def monthly_totals(self) -> Dict[str, float]:
+        """Rupee totals per YYYY-MM month, chronological"""
+        return {month: float(from_paise(paise)) for month, paise in self.monthly_totals_paise}
+
+    @property
+    def daily_totals(self) -> Dict[str, float]:
+        """Rupee totals per ISO date, chronological"""
+        return {day.isoformat(): float(from_paise(paise)) for day, paise in self.daily_totals_paise}
+
+    @property
+    def monthly_average(self) -> float:
+        if not self.monthly_totals_paise:
+            return 0.0
+        return self.total_spent / len(self.monthly_totals_paise)
+
+    def top_categories(self, limit: int) -> List[Tuple[str, float]]:
+        return list(self.category_totals.items())[:limit]
+
+
+# period -> (version, computed at, features); least recently used first
+_cache: "OrderedDict[Period, Tuple[int, float, SpendingFeatures]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def data_version(db: Session) -> int:
+    """Latest expense change version; shared by every worker process"""
+    return change_log.current_version(db)
+
+
+def compute(db: Session, period_start: Optional[date] = None, period_end: Optional[date] = None,
+            version: Optional[int] = None) -> SpendingFeatures:
+    """Aggregate the period's expenses from the database (no memoization)"""
+    version = data_version(db) if version is None else version
+    conditions = []
+    if period_start is not None:
+        conditions.append(Expense.date >= period_start)
+    if period_end is not None:
+        conditions.append(Expense.date <= period_end)
+
+    # Per day and category, archived expenses included through their rollups
+    rows = archive.grouped_totals(db, ("date", "category_id"), period_start, period_end)
+
+    category_paise: Dict[int, int] = {}
+    category_counts: Dict[int, int] = {}
+    daily: Dict[date, int] = {}
+    monthly: Dict[str, int] = {}
+    monthly_counts: Dict[str, int] = {}
+    total = count = largest = 0
+    for day, category_id, n, paise, day_max in rows:
+        total += paise
+        count += n
+        largest = max(largest, day_max)
+        category_paise[category_id] = category_paise.get(category_id, 0) + paise
+        category_counts[category_id] = category_counts.get(category_id, 0) + n
+        daily[day] = daily.get(day, 0) + paise
+        month = day.strftime("%Y-%m")
+        monthly[month] = monthly.get(month, 0) + paise
+        monthly_counts[month] = monthly_counts.get(month, 0) + n
+
+    samples = db.execute(
+        select(Expense.title, Expense.category_id, Expense.amount_paise, Expense.date, Expense.description)
+        .where(*conditions)
+        .order_by(Expense.date.desc(), Expense.id.desc())
+        .limit(SAMPLE_SIZE)
+    ).all() if rows else []
+
+    name = categories.category_name
+    by_amount = sorted(category_paise.items(), key=lambda item: item[1], reverse=True)
+    return SpendingFeatures(
+        version=version,
+        period_start=period_start,
+        period_end=period_end,
+        expense_count=count,
+        total_paise=total,
+        max_expense_paise=largest,
+        first_date=rows[0][0] if rows else None,
+        last_date=rows[-1][0] if rows else None,
+        category_totals_paise=tuple((name(category_id), paise) for category_id, paise in by_amount),
+        category_counts=tuple((name(category_id), category_counts[category_id]) for category_id, _ in by_amount),
+        monthly_totals_paise=tuple(sorted(monthly.items())),
+        monthly_counts=tuple(sorted(monthly_counts.items())),
+        daily_totals_paise=tuple(daily.items()),
+        sample_transactions=tuple(
+            {
+                "title": title,
+                "category": name(category_id),
+                "amount": float(from_paise(paise)),
+                "date": day.isoformat(),
+                "description": description or "",
+            }
+            for title, category_id, paise, day, description in samples
+        ),
+    )
+
+
+def get_features(db: Session, period_start: Optional[date] = None,
+                 period_end: Optional[date] = None) -> SpendingFeatures:
+    """Memoized features for a period (None bounds mean all time)"""
+    period = (period_start, period_end)
+    version = data_version(db)
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _cache.get(period)
+        if entry is not None and entry[0] == version and now - entry[1] < settings.FEATURES_CACHE_SECONDS:
+            _cache.move_to_end(period)
+            record_cache_lookup("spending_features", True)
+            return entry[2]
+
+    record_cache_lookup("spending_features", False)
+    features = compute(db, period_start, period_end, version=version)
+    with _cache_lock:
+        _cache[period] = (version, now, features)
+        _cache.move_to_end(period)
+        while len(_cache) > MAX_CACHED_PERIODS:
+            _cache.popitem(last=False)
+    return features
+
+
+def clear() -> None:
+    """Drop every memoized period"""
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,115 @@
+"""
+Group commit for high-rate single-row writes.
+
+Each POST /expenses normally pays for its own COMMIT (an fsync on SQLite).
+With batching enabled, concurrent writes are queued for up to
+`max_delay_ms` (or until `max_batch` are waiting) and written by one worker
+thread in a single transaction; each caller still gets back its own row,
+or its own exception. While a batch is being written, new writes queue up
+for the next one, so batches grow with the request rate instead of adding
+latency when traffic is light.
+"""
+import threading
+import time
+from typing import Any, Callable, List, Optional, Sequence
+
+from app.utils.metrics import Histogram
+
+BATCH_SIZE = Histogram(
+    "db_write_batch_size",
+    "Writes committed per group-commit transaction",
+    labelnames=("batcher",),
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+
+# Takes the queued items, returns one result per item (an Exception for items that failed);
+# raising fails the whole batch
+FlushFunction = Callable[[List[Any]], Sequence[Any]]
+
+
+class _Pending:
+    __slots__ = ("item", "queued_at", "result", "error", "done")
+
+    def __init__(self, item: Any):
+        self.item = item
+        self.queued_at = time.monotonic()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.done = threading.Event()
+
+
+class WriteBatcher:
+    """Queue of single writes flushed in batches by a background thread"""
+
+    def __init__(self, name: str, flush: FlushFunction, max_batch: int = 32, max_delay_ms: float = 5.0):
+        self.name = name
+        self.flush = flush
+        self.max_batch = max(max_batch, 1)
+        self.max_delay = max_delay_ms / 1000
+        self._condition = threading.Condition()
+        self._queue: List[_Pending] = []
+        self._worker: Optional[threading.Thread] = None
+        self._closing = False
+
+    def submit(self, item: Any) -> Any:
+        """Queue one write and wait for its batch to commit; returns its result or raises its error"""
+        pending = _Pending(item)
+        with self._condition:
+            if self._worker is None or not self._worker.is_alive():
+                self._closing = False
+                self._worker = threading.Thread(target=self._run, name=f"write-batcher-{self.name}", daemon=True)
+                self._worker.start()
+            self._queue.append(pending)
+            self._condition.notify()
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def close(self) -> None:
+        """Write whatever is queued and stop the worker (a later submit starts a new one)"""
+        with self._condition:
+            worker = self._worker
+            self._closing = True
+            self._condition.notify()
+        if worker is not None:
+            worker.join()
+
+    def _next_batch(self) -> List[_Pending]:
+        with self._condition:
+            while not self._queue and not self._closing:
+                self._condition.wait()
+            # The window opens with the oldest queued write, so writes that queued
+            # up while the previous batch was flushing do not wait a second window
+            deadline = self._queue[0].queued_at + self.max_delay if self._queue else time.monotonic()
+            while len(self._queue) < self.max_batch and not self._closing:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            batch = self._queue[:self.max_batch]
+            del self._queue[:self.max_batch]
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                # Closing with nothing left to write
+                return
+            BATCH_SIZE.observe(len(batch), self.name)
+            try:
+                results = self.flush([pending.item for pending in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"Batch flush returned {len(results)} results for {len(batch)} writes")
+                for pending, result in zip(batch, results):
+                    if isinstance(result, BaseException):
+                        pending.error = result
+                    else:
+                        pending.result = result
+            except Exception as e:
+                for pending in batch:
+                    pending.error = e
+            finally:
+                for pending in batch:
+                    pending.done.set()
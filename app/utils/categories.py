@@ -0,0 +1,94 @@
+"""
+In-memory registry of expense categories.
+
+Categories live in the ``categories`` lookup table and expenses reference them
+by a small integer id. The table is tiny and almost never changes, so it is
+read once at startup and every name <-> id conversion is a dict lookup.
+"""
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Seed rows for the categories table (also used until load() has run)
+DEFAULT_CATEGORIES: Tuple[Tuple[int, str], ...] = (
+    (1, "Food"),
+    (2, "Transportation"),
+    (3, "Entertainment"),
+    (4, "Shopping"),
+    (5, "Healthcare"),
+    (6, "Education"),
+    (7, "Utilities"),
+    (8, "Other"),
+)
+
+# Old category names still sent by some clients
+LEGACY_CATEGORY_NAMES: Dict[str, str] = {
+    "Food & Dining": "Food",
+    "Bills & Utilities": "Utilities",
+    "Others": "Other",
+    "Travel": "Other",
+}
+
+_ids_by_name: Dict[str, int] = {}
+_names_by_id: Dict[int, str] = {}
+
+
+def _set(rows: Iterable[Tuple[int, str]]) -> None:
+    global _ids_by_name, _names_by_id
+    rows = sorted(rows)
+    # Rebind rather than mutate so concurrent readers never see a half-built mapping
+    _names_by_id = {category_id: name for category_id, name in rows}
+    _ids_by_name = {name: category_id for category_id, name in rows}
+
+
+_set(DEFAULT_CATEGORIES)
+
+
+def load(connectable) -> int:
+    """Refresh the registry from the categories table; returns the number of categories"""
+    with connectable.connect() as conn:
+        rows = [tuple(row) for row in conn.execute(text("SELECT id, name FROM categories"))]
+    if rows:
+        _set(rows)
+    else:
+        logger.warning("categories table is empty, using the built-in category list")
+    return len(_names_by_id)
+
+
+def names() -> List[str]:
+    """Category names in id order"""
+    return list(_names_by_id.values())
+
+
+def items() -> List[Tuple[int, str]]:
+    """(id, name) pairs in id order"""
+    return list(_names_by_id.items())
+
+
+def canonical_name(name: str) -> str:
+    """Map a legacy category name to its current name"""
+    return LEGACY_CATEGORY_NAMES.get(name, name)
+
+
+def category_id(name: str) -> int:
+    """Id for a category name (legacy names accepted); raises ValueError for unknown names"""
+    try:
+        return _ids_by_name[canonical_name(name)]
+    except KeyError:
+        raise ValueError(f"Category must be one of: {', '.join(names())}") from None
+
+
+def category_name(category_id: Optional[int]) -> Optional[str]:
+    """Name for a category id"""
+    if category_id is None:
+        return None
+    return _names_by_id[category_id]
+
+
+def matching_ids(fragment: str) -> List[int]:
+    """Ids of categories whose name contains `fragment` (case-insensitive), as the old ILIKE filter matched"""
+    fragment = canonical_name(fragment).lower()
+    return [category_id for category_id, name in _names_by_id.items() if fragment in name.lower()]
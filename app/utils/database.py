@@ -1,8 +1,13 @@
 import os
-from sqlalchemy import create_engine
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import configure_mappers, sessionmaker
 from app.config import settings
+from app.utils.metrics import Gauge, record_cache_lookup
 
 # Get database URL from settings
 DATABASE_URL = settings.DATABASE_URL
@@ -29,10 +34,101 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Create Base class for models
 Base = declarative_base()
 
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def init_schema() -> str:
+    """
+    Bring the schema up to date with the Alembic migrations.
+
+    Falls back to create_all when Alembic or the migrations folder is not
+    available. Returns which of the two was used.
+    """
+    alembic_ini = os.path.join(PROJECT_ROOT, "alembic.ini")
+    try:
+        from alembic import command
+        from alembic.config import Config
+    except ImportError:
+        command = None
+
+    if command is None or not os.path.exists(alembic_ini):
+        Base.metadata.create_all(bind=engine)
+        return "create_all"
+
+    config = Config(alembic_ini)
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
+    return "alembic"
+
 # Dependency to get database session
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def warm_up_database():
+    """Configure ORM mappers and open a pooled connection so the first request doesn't pay for it"""
+    configure_mappers()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+def pool_status() -> Dict[str, int]:
+    """Connection pool usage (only the counters the active pool class supports)"""
+    status = {}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        getter = getattr(engine.pool, name, None)
+        if callable(getter):
+            status[name] = getter()
+    if "overflow" in status:
+        # QueuePool.overflow() starts at -pool_size and only goes positive once overflow connections open
+        status["overflow"] = max(0, status["overflow"])
+    return status
+
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Database connection pool usage by state",
+    labelnames=("state",),
+    callback=lambda: {(state,): value for state, value in pool_status().items()},
+)
+
+# Cached result of the last database ping, shared by every /health call
+_health_lock = threading.Lock()
+_health_result: Dict = {}
+
+def check_database(max_age: float = None) -> Dict:
+    """
+    Ping the database with SELECT 1, reusing the last result for `max_age` seconds.
+
+    While one caller is pinging, concurrent callers get the previous result
+    instead of queueing, so frequent health scrapes never add DB load.
+    """
+    global _health_result
+    max_age = settings.HEALTH_CACHE_SECONDS if max_age is None else max_age
+    cached = _health_result
+    if cached and time.monotonic() - cached["_checked"] < max_age:
+        record_cache_lookup("health", True)
+        return cached
+
+    if not _health_lock.acquire(blocking=not cached):
+        record_cache_lookup("health", True)
+        return cached
+
+    try:
+        record_cache_lookup("health", False)
+        start = time.perf_counter()
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            result = {"status": "ok", "error": None}
+        except Exception as e:
+            result = {"status": "error", "error": str(e)}
+        result.update({
+            "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+            "checked_at": datetime.now(timezone.utc).isoformat(),
+            "_checked": time.monotonic(),
+        })
+        _health_result = result
+        return result
+    finally:
+        _health_lock.release()
@@ -0,0 +1,266 @@
+"""
+Per-request instrumentation: timing middleware, SQLAlchemy query hooks,
+named timing spans and the opt-in ``?profile=1`` profiler (DEBUG only).
+"""
+import cProfile
+import functools
+import inspect
+import io
+import logging
+import pstats
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.utils.metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    labelnames=("method", "route"),
+)
+REQUEST_COUNT = Counter(
+    "http_requests_total",
+    "HTTP requests by route and status code",
+    labelnames=("method", "route", "status"),
+)
+
+
+class RequestTimings:
+    """Timing data collected while a single request is handled"""
+
+    __slots__ = ("started", "db_queries", "db_rows", "db_time", "spans", "profile", "profile_report")
+
+    def __init__(self, profile: bool = False):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_rows = 0
+        self.db_time = 0.0
+        self.spans: Dict[str, float] = {}
+        self.profile = profile
+        self.profile_report: Optional[tuple] = None  # (content type, body)
+
+    def add_span(self, name: str, elapsed: float) -> None:
+        self.spans[name] = self.spans.get(name, 0.0) + elapsed
+
+    def server_timing(self, total: float) -> str:
+        """Format as a Server-Timing header value (durations in ms)"""
+        parts = [f"app;dur={total * 1000:.1f}"]
+        if self.db_queries:
+            parts.append(f'db;dur={self.db_time * 1000:.1f};desc="{self.db_queries} queries, {self.db_rows} rows"')
+        for name, elapsed in self.spans.items():
+            parts.append(f"{name};dur={elapsed * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """Timings of the request being handled, or None outside a request"""
+    return _current_timings.get()
+
+
+@contextmanager
+def span(name: str):
+    """Time a block and attribute it to the current request under `name`"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = _current_timings.get()
+        if timings is not None:
+            timings.add_span(name, time.perf_counter() - start)
+
+
+class _CountingCursor:
+    """DBAPI cursor proxy that adds the rows fetched from it to a request's timings"""
+
+    __slots__ = ("_cursor", "_timings")
+
+    def __init__(self, cursor, timings: RequestTimings):
+        self._cursor = cursor
+        self._timings = timings
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._timings.db_rows += 1
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._cursor.fetchmany(*args)
+        self._timings.db_rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._timings.db_rows += len(rows)
+        return rows
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def install_sqlalchemy_hooks(engine: Engine) -> None:
+    """
+    Count queries, rows and DB time per request.
+
+    Rows are the rows fetched from result sets (the result's cursor is
+    swapped for a counting proxy) plus the DBAPI rowcount of DML without
+    RETURNING; rows a result never fetches are not counted.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        timings = _current_timings.get()
+        if timings is not None:
+            timings.db_queries += 1
+            timings.db_time += elapsed
+            if cursor.description is not None:
+                if context is not None and context.cursor is cursor:
+                    context.cursor = _CountingCursor(cursor, timings)
+            elif cursor.rowcount and cursor.rowcount > 0:
+                timings.db_rows += cursor.rowcount
+
+
+@contextmanager
+def _profile(timings: RequestTimings):
+    """Profile the enclosed block with pyinstrument if installed, else cProfile"""
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        Profiler = None
+
+    if Profiler is not None:
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            timings.profile_report = ("text/html; charset=utf-8", profiler.output_html().encode("utf-8"))
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            output = io.StringIO()
+            pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(50)
+            timings.profile_report = ("text/plain; charset=utf-8", output.getvalue().encode("utf-8"))
+
+
+def _instrument_endpoint(endpoint: Callable) -> Callable:
+    """Wrap an endpoint so ?profile=1 requests are profiled in the thread that runs it"""
+    if getattr(endpoint, "__instrumented__", False):
+        return endpoint
+
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            timings = _current_timings.get()
+            if timings is None or not timings.profile:
+                return await endpoint(*args, **kwargs)
+            with _profile(timings):
+                return await endpoint(*args, **kwargs)
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            timings = _current_timings.get()
+            if timings is None or not timings.profile:
+                return endpoint(*args, **kwargs)
+            with _profile(timings):
+                return endpoint(*args, **kwargs)
+
+    wrapper.__instrumented__ = True
+    return wrapper
+
+
+class InstrumentedRoute(APIRoute):
+    """APIRoute whose endpoint can be profiled on request"""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _instrument_endpoint(endpoint), **kwargs)
+
+
+class TimingMiddleware:
+    """
+    ASGI middleware that records per-route latency, adds a Server-Timing
+    header and, in DEBUG, replaces the response with a profile for ?profile=1.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = settings.DEBUG and b"profile=1" in scope.get("query_string", b"").split(b"&")
+        timings = RequestTimings(profile=profile)
+        token = _current_timings.set(timings)
+        status_code = 500
+        replaced = False
+
+        async def send_wrapper(message):
+            nonlocal status_code, replaced
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if timings.profile_report is not None:
+                    content_type, body = timings.profile_report
+                    replaced = True
+                    await send({
+                        "type": "http.response.start",
+                        "status": 200,
+                        "headers": [
+                            (b"content-type", content_type.encode("latin-1")),
+                            (b"content-length", str(len(body)).encode("latin-1")),
+                        ],
+                    })
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                if settings.SERVER_TIMING:
+                    headers = list(message.get("headers", []))
+                    total = time.perf_counter() - timings.started
+                    headers.append((b"server-timing", timings.server_timing(total).encode("latin-1")))
+                    message = {**message, "headers": headers}
+            elif replaced:
+                return
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_timings.reset(token)
+            elapsed = time.perf_counter() - timings.started
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            REQUEST_LATENCY.observe(elapsed, scope["method"], route_path)
+            REQUEST_COUNT.inc(scope["method"], route_path, str(status_code))
+
+            if elapsed * 1000 >= settings.SLOW_REQUEST_MS:
+                logger.warning(
+                    f"Slow request: {scope['method']} {route_path} {status_code} {elapsed * 1000:.1f}ms "
+                    f"(db {timings.db_queries} queries / {timings.db_time * 1000:.1f}ms, spans {timings.spans})"
+                )
+            else:
+                logger.debug(
+                    f"{scope['method']} {route_path} {status_code} {elapsed * 1000:.1f}ms "
+                    f"db={timings.db_queries}q/{timings.db_time * 1000:.1f}ms"
+                )
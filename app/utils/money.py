@@ -0,0 +1,30 @@
+"""
+Money helpers. Amounts are stored as integer paise so sums are exact;
+the API accepts and reports rupees with two decimal places.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Union
+
+CENT = Decimal("0.01")
+
+Amount = Union[Decimal, int, float, str]
+
+
+def to_paise(amount: Amount) -> int:
+    """Convert a rupee amount to integer paise, rounding half up to the nearest paisa"""
+    if isinstance(amount, float):
+        # str() gives the shortest repr, so 0.1 becomes Decimal("0.1") rather than its binary expansion
+        amount = str(amount)
+    return int(Decimal(amount).quantize(CENT, rounding=ROUND_HALF_UP).scaleb(2))
+
+
+def from_paise(paise: int) -> Decimal:
+    """Convert integer paise to an exact rupee Decimal"""
+    return Decimal(int(paise)).scaleb(-2)
+
+
+def mean_rupees(total_paise: int, count: int) -> Decimal:
+    """Average of `count` amounts totalling `total_paise`, rounded half up to the paisa"""
+    if not count:
+        return Decimal("0.00")
+    return (Decimal(int(total_paise)) / count).quantize(Decimal(1), rounding=ROUND_HALF_UP).scaleb(-2)
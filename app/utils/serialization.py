@@ -0,0 +1,88 @@
+"""
+Response serialization helpers: a fast JSON response class and the
+columnar (``?format=columns``) encoding used by list and analytics endpoints.
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Mapping, Sequence
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the stdlib encoder
+    orjson = None
+
+FORMAT_PATTERN = "^(json|columns)$"
+
+# Columns whose values repeat heavily are dictionary-encoded in columnar mode,
+# mapped to the top-level key that holds their dictionary
+DICTIONARY_FIELDS = {"category": "categories"}
+
+
+def _default(obj: Any) -> Any:
+    """Encode types that neither orjson nor the stdlib handle natively"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content,
+        default=_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (stdlib fallback) that also handles dates and Decimals"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def rows_to_dicts(rows: Iterable[Sequence[Any]], fields: Sequence[str]) -> List[Dict[str, Any]]:
+    """Turn positional rows (SQLAlchemy Row tuples) into JSON-ready dicts without model validation"""
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def to_columns(rows: Iterable[Sequence[Any]], fields: Sequence[str]) -> Dict[str, Any]:
+    """
+    Transpose positional rows into parallel arrays.
+
+    Fields listed in DICTIONARY_FIELDS are replaced by integer codes into a
+    dictionary returned alongside the columns, e.g. ``category: [0, 1, 0]``
+    with ``categories: ["Food", "Shopping"]``.
+    """
+    rows = list(rows)
+    transposed = list(zip(*rows)) if rows else [() for _ in fields]
+    columns: Dict[str, List[Any]] = {}
+    result: Dict[str, Any] = {"format": "columns", "count": len(rows), "columns": columns}
+
+    for field, values in zip(fields, transposed):
+        if field in DICTIONARY_FIELDS:
+            codes: Dict[Any, int] = {}
+            columns[field] = [codes.setdefault(value, len(codes)) for value in values]
+            result[DICTIONARY_FIELDS[field]] = list(codes)
+        else:
+            columns[field] = list(values)
+    return result
+
+
+def columnar_response(rows: Iterable[Any], fields: Sequence[str], **extra: Any) -> FastJSONResponse:
+    """Build a columnar response from positional rows or dicts, merging extra top-level keys (totals etc.)"""
+    rows = list(rows)
+    if rows and isinstance(rows[0], Mapping):
+        rows = [tuple(row[field] for field in fields) for row in rows]
+    content = to_columns(rows, fields)
+    content.update(extra)
+    return FastJSONResponse(content)
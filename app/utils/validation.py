@@ -0,0 +1,93 @@
+"""
+Expense write validation.
+
+One pipeline shared by the create, update and bulk paths: it runs once per
+payload (after Pydantic has checked types and ranges), normalizes each field
+and converts it to its column value. The ORM model has no per-attribute
+hooks, so nothing is validated twice.
+"""
+import re
+from typing import Any, Callable, Dict, Mapping, Tuple
+
+from app.utils import categories
+from app.utils.money import to_paise
+
+MAX_TITLE_LENGTH = 200
+MAX_DESCRIPTION_LENGTH = 500
+MAX_AMOUNT_PAISE = to_paise(1000000)
+
+REQUIRED_FIELDS = frozenset({"title", "category", "amount", "date"})
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def clean_title(title: str) -> str:
+    """Collapse whitespace; titles must be non-empty and at most 200 characters"""
+    if not title:
+        raise ValueError("Title cannot be empty")
+    cleaned = _WHITESPACE.sub(" ", title).strip()
+    if not cleaned:
+        raise ValueError("Title cannot be empty")
+    if len(cleaned) > MAX_TITLE_LENGTH:
+        raise ValueError("Title cannot exceed 200 characters")
+    return cleaned
+
+
+def amount_to_paise(amount) -> int:
+    """Rupee amount to paise; must be positive and at most ₹10,00,000"""
+    if amount is None:
+        raise ValueError("Amount is required")
+    paise = to_paise(amount)
+    if paise <= 0:
+        raise ValueError("Amount must be positive")
+    if paise > MAX_AMOUNT_PAISE:
+        raise ValueError("Amount cannot exceed ₹10,00,000")
+    return paise
+
+
+def clean_description(description):
+    """Strip whitespace; blank descriptions are stored as NULL"""
+    if description is None:
+        return None
+    cleaned = description.strip()
+    if len(cleaned) > MAX_DESCRIPTION_LENGTH:
+        raise ValueError("Description cannot exceed 500 characters")
+    return cleaned or None
+
+
+def _require_date(value):
+    if value is None:
+        raise ValueError("Date is required")
+    return value
+
+
+# API field -> (column, converter)
+PIPELINE: Dict[str, Tuple[str, Callable[[Any], Any]]] = {
+    "title": ("title", clean_title),
+    "category": ("category_id", categories.category_id),
+    "amount": ("amount_paise", amount_to_paise),
+    "date": ("date", _require_date),
+    "description": ("description", clean_description),
+}
+
+
+def expense_values(data: Mapping[str, Any], partial: bool = False) -> Dict[str, Any]:
+    """
+    Validate expense fields and return them as column values
+    (title, category_id, amount_paise, date, description).
+
+    With partial=True (updates) only the fields present are converted;
+    otherwise title, category, amount and date are required. Raises ValueError.
+    """
+    if not partial:
+        missing = REQUIRED_FIELDS.difference(data)
+        if missing:
+            raise ValueError(f"Missing required fields: {', '.join(sorted(missing))}")
+
+    values = {}
+    for field, value in data.items():
+        step = PIPELINE.get(field)
+        if step is not None:
+            column, convert = step
+            values[column] = convert(value)
+    return values
@@ -0,0 +1 @@
+# VegaKash benchmarks package
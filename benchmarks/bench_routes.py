@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Per-route microbenchmarks through an in-process ASGI client.
+
+Seeds a throwaway SQLite database (or uses --database-url as-is), then
+calls every API route sequentially and records latency percentiles.
+Results are written as JSON; pass --compare to diff against a baseline.
+
+    python -m benchmarks.bench_routes --rows 10000 --iterations 50
+    python -m benchmarks.bench_routes --save-baseline
+    python -m benchmarks.bench_routes --compare --fail-on-regression
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.common import DEFAULT_BASELINE, RESULTS_DIR, compare, environment, summarize, write_results
+
+NEW_EXPENSE = {
+    "title": "Benchmark expense",
+    "category": "Food",
+    "amount": 249.5,
+    "date": date.today().isoformat(),
+    "description": "Created by bench_routes",
+}
+
+# (name, method, path, params, json body); {id} is replaced with a seeded expense id
+ROUTES: List[Tuple[str, str, str, Dict, Dict]] = [
+    ("root", "GET", "/", {}, None),
+    ("health", "GET", "/health", {}, None),
+    ("list_expenses", "GET", "/expenses", {"limit": 100}, None),
+    ("list_expenses_columns", "GET", "/expenses", {"limit": 100, "format": "columns"}, None),
+    ("list_expenses_filtered", "GET", "/expenses", {"category": "Food", "min_amount": 100, "sort_by": "amount"}, None),
+    ("get_expense", "GET", "/expenses/{id}", {}, None),
+    ("create_expense", "POST", "/expenses", {}, NEW_EXPENSE),
+    ("update_expense", "PUT", "/expenses/{id}", {}, {"amount": 301.25}),
+    ("stats_summary", "GET", "/expenses/stats/summary", {}, None),
+    ("categories_list", "GET", "/expenses/categories/list", {}, None),
+    ("category_breakdown", "GET", "/expenses/analytics/category-breakdown", {}, None),
+    ("monthly_trends", "GET", "/expenses/analytics/monthly-trends", {}, None),
+    ("ai_spending_trends", "GET", "/ai/spending-trends", {"days": 30}, None),
+    ("dashboard", "GET", "/dashboard", {}, None),
+    ("ai_insights", "POST", "/ai/insights", {}, None),
+    ("ai_savings_suggestions", "POST", "/ai/savings-suggestions", {}, None),
+    ("ai_chat", "POST", "/ai/chat", {"message": "How should I budget my spending?"}, None),
+]
+
+
+async def bench_route(client, method: str, path: str, params: Dict, body: Dict,
+                      iterations: int, warmup: int) -> Dict:
+    latencies = []
+    errors = 0
+    for i in range(warmup + iterations):
+        start = time.perf_counter()
+        response = await client.request(method, path, params=params, json=body)
+        elapsed = time.perf_counter() - start
+        if response.status_code >= 400:
+            errors += 1
+        if i >= warmup:
+            latencies.append(elapsed)
+    return summarize(latencies, errors=errors)
+
+
+async def run(app, iterations: int, warmup: int, selected: Callable[[str], bool]) -> Dict[str, Dict]:
+    import httpx
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        seeded = await client.get("/expenses", params={"limit": 1})
+        expense_id = seeded.json()[0]["id"] if seeded.status_code == 200 and seeded.json() else 1
+
+        print(f"{'route':<28} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9} {'errors':>7}")
+        for name, method, path, params, body in ROUTES:
+            if not selected(name):
+                continue
+            stats = await bench_route(client, method, path.replace("{id}", str(expense_id)), params, body,
+                                      iterations, warmup)
+            results[name] = stats
+            print(f"{name:<28} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} "
+                  f"{stats['throughput_rps']:>9.1f} {stats['errors']:>7}")
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Benchmark an existing database instead of a seeded temp SQLite file")
+    parser.add_argument("--rows", type=int, default=10000, help="Rows to seed into the temp database")
+    parser.add_argument("--iterations", type=int, default=30, help="Timed calls per route")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed calls per route")
+    parser.add_argument("--routes", help="Comma-separated route names to run (default: all)")
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "routes.json"), help="Where to write results")
+    parser.add_argument("--save-baseline", action="store_true", help="Also write results to the baseline file")
+    parser.add_argument("--compare", action="store_true", help="Compare with the baseline file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline file path")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed p50 slowdown before flagging (0.10 = 10%%)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit non-zero when a route regresses")
+    args = parser.parse_args()
+
+    tmpdir = None
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        tmpdir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir.name, 'bench.db')}"
+
+    # The engine is created from DATABASE_URL at import time, so import the app only now
+    from app.main import app
+    from app.utils.database import engine
+    from benchmarks.datagen import populate
+
+    if tmpdir is not None:
+        print(f"Seeding {args.rows:,} expenses...")
+        populate(engine, args.rows)
+
+    wanted = set(args.routes.split(",")) if args.routes else None
+    results = asyncio.run(run(app, args.iterations, args.warmup, lambda name: wanted is None or name in wanted))
+
+    payload = {
+        "environment": environment(),
+        "config": {"rows": args.rows if tmpdir else None, "iterations": args.iterations, "warmup": args.warmup},
+        "benchmarks": results,
+    }
+    write_results(args.output, payload)
+    if args.save_baseline:
+        write_results(args.baseline, payload)
+
+    regressions = compare(results, args.baseline, threshold=args.threshold) if args.compare else []
+    engine.dispose()
+    if tmpdir is not None:
+        tmpdir.cleanup()
+    if regressions and args.fail_on_regression:
+        print(f"\n{len(regressions)} route(s) regressed: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
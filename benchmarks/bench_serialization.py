@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Read-path serialization benchmark.
+
+Compares the old ORM + ExpenseOut validation path with the column-select
+fast path used by GET /expenses and GET /expenses/{id}, and with a sparse
+fieldset (``fields=id,title,category,amount,date``), in rows/second and
+payload bytes.
+
+    python -m benchmarks.bench_serialization --rows 50000 --repeat 5
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Expense
+from app.routes.expense_routes import EXPENSE_COLUMNS, EXPENSE_FIELDS, select_fields, serialize_rows
+from app.schemas import ExpenseOut
+from app.utils.serialization import dumps
+from benchmarks.datagen import populate
+
+
+def orm_path(session) -> bytes:
+    """What FastAPI did before: hydrate ORM objects, validate into ExpenseOut, dump JSON"""
+    expenses = session.query(Expense).all()
+    adapter = TypeAdapter(List[ExpenseOut])
+    return adapter.dump_json(adapter.validate_python(expenses, from_attributes=True))
+
+
+def fast_path(session) -> bytes:
+    """Column select straight into JSON"""
+    return dumps(serialize_rows(session.query(*EXPENSE_COLUMNS).all(), EXPENSE_FIELDS))
+
+
+LIST_FIELDS = "id,title,category,amount,date"
+
+
+def sparse_path(session) -> bytes:
+    """Column select of a list view's fields only"""
+    names, columns = select_fields(LIST_FIELDS)
+    return dumps(serialize_rows(session.query(*columns).all(), names))
+
+
+def measure(name: str, func, session_factory, rows: int, repeat: int) -> float:
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        session = session_factory()
+        try:
+            start = time.perf_counter()
+            size = len(func(session))
+            best = min(best, time.perf_counter() - start)
+        finally:
+            session.close()
+    throughput = rows / best
+    print(f"{name:<28} {best * 1000:9.1f} ms  {throughput:12,.0f} rows/s  {size / 1024:10,.0f} KiB")
+    return throughput
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000, help="Number of expense rows to serialize")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per path (best time is reported)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        populate(engine, args.rows)
+        session_factory = sessionmaker(bind=engine)
+
+        print(f"Serializing {args.rows:,} rows (best of {args.repeat})")
+        before = measure("ORM + ExpenseOut", orm_path, session_factory, args.rows, args.repeat)
+        after = measure("Column select fast path", fast_path, session_factory, args.rows, args.repeat)
+        sparse = measure("Sparse fieldset", sparse_path, session_factory, args.rows, args.repeat)
+        print(f"Speedup: {after / before:.2f}x (sparse fieldset {sparse / before:.2f}x)")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
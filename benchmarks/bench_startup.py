@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Cold start benchmark.
+
+Each run starts a fresh interpreter and measures importing app.main, the
+lifespan startup (schema creation and warm-up), and the first and second
+GET /expenses. Pass environment overrides to compare configurations:
+
+    python -m benchmarks.bench_startup --runs 5
+    python -m benchmarks.bench_startup --env AUTO_CREATE_SCHEMA=false --env STARTUP_WARMUP=false
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.common import RESULTS_DIR, environment, write_results
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside the child interpreter; prints one JSON line of timings in ms
+PROBE = """
+import json, time
+from fastapi.testclient import TestClient
+t0 = time.perf_counter()
+import app.main
+t1 = time.perf_counter()
+with TestClient(app.main.app) as client:
+    t2 = time.perf_counter()
+    client.get("/expenses")
+    t3 = time.perf_counter()
+    client.get("/expenses")
+    t4 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000,
+    "startup_ms": (t2 - t1) * 1000,
+    "first_request_ms": (t3 - t2) * 1000,
+    "second_request_ms": (t4 - t3) * 1000,
+    "ready_ms": (t3 - t0) * 1000,
+}))
+"""
+
+
+def run_once(env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreter runs (median is reported)")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="Extra environment variable")
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "startup.json"), help="Where to write results")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tmp, 'startup.db')}")
+        env["LOG_LEVEL"] = "WARNING"
+        for item in args.env:
+            key, _, value = item.partition("=")
+            env[key] = value
+
+        runs = [run_once(env) for _ in range(args.runs)]
+
+    summary = {key: round(statistics.median(run[key] for run in runs), 2) for key in runs[0]}
+    for key, value in summary.items():
+        print(f"{key:<20} {value:>9.1f} ms")
+
+    write_results(args.output, {
+        "environment": environment(),
+        "config": {"runs": args.runs, "env": args.env},
+        "benchmarks": {"startup": summary},
+        "runs": runs,
+    })
+
+
+if __name__ == "__main__":
+    main()
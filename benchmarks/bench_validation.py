@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Write-path validation and insert benchmark.
+
+Feeds the same synthetic payloads through the shared validation pipeline
+and the three ways the API can write them, in rows/second:
+
+- validation only (Pydantic ExpenseCreate + app.utils.validation)
+- one ORM insert and commit per row, as N calls to POST /expenses
+- ORM add_all with a single commit
+- one executemany INSERT ... RETURNING, as POST /expenses/bulk
+
+    python -m benchmarks.bench_validation --rows 5000 --repeat 3
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, delete, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Expense
+from app.schemas import ExpenseCreate
+from app.utils import categories
+from app.utils.database import Base
+from app.utils.validation import expense_values
+from benchmarks.datagen import generate_rows
+
+PAYLOADS = TypeAdapter(List[ExpenseCreate])
+EXPENSES_TABLE = Expense.__table__
+
+
+def api_payloads(rows: int) -> List[Dict]:
+    """Synthetic expenses shaped like POST /expenses request bodies"""
+    return [
+        {
+            "title": row["title"],
+            "category": categories.category_name(row["category_id"]),
+            "amount": row["amount_paise"] / 100,
+            "date": row["date"].isoformat(),
+            "description": row["description"],
+        }
+        for row in generate_rows(rows)
+    ]
+
+
+def validate_only(session, payloads) -> None:
+    for expense in PAYLOADS.validate_python(payloads):
+        expense_values(expense.model_dump())
+
+
+def orm_per_row(session, payloads) -> None:
+    for payload in payloads:
+        expense = ExpenseCreate.model_validate(payload)
+        session.add(Expense(**expense_values(expense.model_dump())))
+        session.commit()
+
+
+def orm_add_all(session, payloads) -> None:
+    session.add_all(Expense(**expense_values(expense.model_dump())) for expense in PAYLOADS.validate_python(payloads))
+    session.commit()
+
+
+def bulk_insert(session, payloads) -> None:
+    rows = [expense_values(expense.model_dump()) for expense in PAYLOADS.validate_python(payloads)]
+    statement = insert(EXPENSES_TABLE).returning(EXPENSES_TABLE.c.id, sort_by_parameter_order=True)
+    session.execute(statement, rows).scalars().all()
+    session.commit()
+
+
+def measure(name: str, func, session_factory, payloads, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        session = session_factory()
+        try:
+            session.execute(delete(Expense))
+            session.commit()
+            start = time.perf_counter()
+            func(session, payloads)
+            best = min(best, time.perf_counter() - start)
+        finally:
+            session.close()
+    throughput = len(payloads) / best
+    print(f"{name:<28} {best * 1000:9.1f} ms  {throughput:12,.0f} rows/s")
+    return throughput
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000, help="Number of expenses to validate and insert")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per path (best time is reported)")
+    args = parser.parse_args()
+
+    payloads = api_payloads(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+
+        print(f"Writing {args.rows:,} expenses (best of {args.repeat})")
+        measure("Validation only", validate_only, session_factory, payloads, args.repeat)
+        per_row = measure("ORM, commit per row", orm_per_row, session_factory, payloads, args.repeat)
+        measure("ORM add_all, one commit", orm_add_all, session_factory, payloads, args.repeat)
+        bulk = measure("Bulk INSERT ... RETURNING", bulk_insert, session_factory, payloads, args.repeat)
+        print(f"Bulk vs per-row: {bulk / per_row:.1f}x")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Shared helpers for the benchmark scripts: latency statistics and JSON
+baseline files.
+"""
+import json
+import math
+import os
+import platform
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+DEFAULT_BASELINE = os.path.join(RESULTS_DIR, "baseline.json")
+LOAD_BASELINE = os.path.join(RESULTS_DIR, "load_baseline.json")
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100.0 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(latencies: List[float], elapsed: Optional[float] = None, errors: int = 0) -> Dict:
+    """Latency summary in milliseconds; throughput uses wall time when given"""
+    values = sorted(latencies)
+    count = len(values)
+    total = elapsed if elapsed is not None else sum(values)
+    return {
+        "requests": count,
+        "errors": errors,
+        "mean_ms": round(sum(values) / count * 1000, 3) if count else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if count else 0.0,
+        "throughput_rps": round(count / total, 1) if total else 0.0,
+    }
+
+
+def environment() -> Dict:
+    """Describe where the numbers came from"""
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "database_url": os.getenv("DATABASE_URL", ""),
+    }
+
+
+def write_results(path: str, results: Dict) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as fh:
+        json.dump(results, fh, indent=2, sort_keys=True)
+    print(f"Results written to {path}")
+
+
+def compare(current: Dict[str, Dict], baseline_path: str, metric: str = "p50_ms", threshold: float = 0.10) -> List[str]:
+    """
+    Compare per-benchmark stats with a saved baseline.
+
+    Returns the names that regressed by more than `threshold` (0.10 = 10%).
+    """
+    if not os.path.exists(baseline_path):
+        print(f"No baseline at {baseline_path}, skipping comparison")
+        return []
+
+    with open(baseline_path) as fh:
+        baseline = json.load(fh).get("benchmarks", {})
+
+    regressions = []
+    print(f"\n{'benchmark':<40} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, stats in current.items():
+        old = baseline.get(name, {}).get(metric)
+        new = stats.get(metric)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        flag = "  REGRESSION" if change > threshold else ""
+        print(f"{name:<40} {old:>10.3f} {new:>10.3f} {change:>+7.1%}{flag}")
+        if change > threshold:
+            regressions.append(name)
+    return regressions
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Synthetic expense data generator for benchmarks.
+
+Writes reproducible expenses (same --seed and --end-date give the same rows)
+spread across the categories from Expense.get_category_choices(), using
+batched core INSERTs so 10M rows stay practical.
+
+    python -m benchmarks.datagen --database-url sqlite:///./bench.db --rows 1000000
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from typing import Dict, Iterator, List
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.engine import Engine
+
+from app.models import Expense
+from app.utils import categories
+from app.utils.database import Base
+
+# Relative frequency of each category in generated data
+CATEGORY_WEIGHTS = {
+    "Food": 30,
+    "Transportation": 15,
+    "Entertainment": 10,
+    "Shopping": 15,
+    "Healthcare": 5,
+    "Education": 5,
+    "Utilities": 10,
+    "Other": 10,
+}
+
+TITLES = {
+    "Food": ["Groceries", "Restaurant", "Coffee", "Swiggy order", "Vegetables"],
+    "Transportation": ["Uber ride", "Metro card", "Fuel", "Bus fare", "Parking"],
+    "Entertainment": ["Movie tickets", "Netflix", "Concert", "Games", "Books"],
+    "Shopping": ["Clothes", "Electronics", "Amazon order", "Shoes", "Gifts"],
+    "Healthcare": ["Pharmacy", "Doctor visit", "Lab tests", "Gym membership"],
+    "Education": ["Online course", "School fees", "Stationery", "Tuition"],
+    "Utilities": ["Electricity bill", "Internet", "Mobile recharge", "Water bill", "Gas"],
+    "Other": ["Miscellaneous", "Donation", "Repairs", "Bank charges"],
+}
+
+# Median amount per category in rupees; amounts are log-normal around these
+MEDIAN_AMOUNTS = {
+    "Food": 400,
+    "Transportation": 250,
+    "Entertainment": 600,
+    "Shopping": 1500,
+    "Healthcare": 900,
+    "Education": 3000,
+    "Utilities": 1200,
+    "Other": 500,
+}
+
+
+def generate_rows(rows: int, seed: int = 42, days: int = 730, end_date: date = None) -> Iterator[Dict]:
+    """Yield expense column dicts ready for a core INSERT"""
+    rng = random.Random(seed)
+    choices = Expense.get_category_choices()
+    weights = [CATEGORY_WEIGHTS.get(category, 1) for category in choices]
+    end_date = end_date or date.today()
+    start_date = end_date - timedelta(days=days - 1)
+
+    for i in range(rows):
+        category = rng.choices(choices, weights)[0]
+        amount = min(max(rng.lognormvariate(0, 0.8) * MEDIAN_AMOUNTS.get(category, 500), 1), 100000)
+        yield {
+            "title": rng.choice(TITLES.get(category, ["Expense"])),
+            "category_id": categories.category_id(category),
+            "amount_paise": round(amount * 100),
+            "date": start_date + timedelta(days=rng.randrange(days)),
+            "description": f"Synthetic expense #{i}" if rng.random() < 0.3 else None,
+        }
+
+
+def populate(engine: Engine, rows: int, seed: int = 42, days: int = 730,
+             end_date: date = None, batch_size: int = 10000, verbose: bool = False) -> int:
+    """Create the schema if needed and insert `rows` synthetic expenses"""
+    Base.metadata.create_all(bind=engine)
+    table = Expense.__table__
+    inserted = 0
+    started = time.perf_counter()
+    batch: List[Dict] = []
+
+    with engine.begin() as conn:
+        for row in generate_rows(rows, seed=seed, days=days, end_date=end_date):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                conn.execute(insert(table), batch)
+                inserted += len(batch)
+                batch = []
+                if verbose and inserted % (batch_size * 10) == 0:
+                    print(f"  {inserted:,} rows ({inserted / (time.perf_counter() - started):,.0f} rows/s)")
+        if batch:
+            conn.execute(insert(table), batch)
+            inserted += len(batch)
+
+    return inserted
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True, help="Target database, e.g. sqlite:///./bench.db")
+    parser.add_argument("--rows", type=int, default=10000, help="Number of expenses to generate (10k-10M)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--days", type=int, default=730, help="Spread dates over this many days")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None, help="Last date (YYYY-MM-DD, default today)")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Rows per INSERT batch")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    started = time.perf_counter()
+    inserted = populate(engine, args.rows, seed=args.seed, days=args.days, end_date=args.end_date,
+                        batch_size=args.batch_size, verbose=True)
+    elapsed = time.perf_counter() - started
+    print(f"Inserted {inserted:,} expenses in {elapsed:.1f}s ({inserted / elapsed:,.0f} rows/s)")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Concurrent load driver.
+
+Runs a weighted mix of API calls from --concurrency workers for --duration
+seconds, either against a live server (--url) or in-process through ASGI,
+and reports p50/p95/p99 latency and throughput overall and per endpoint.
+
+    python -m benchmarks.load --url http://localhost:8000 --concurrency 32 --duration 30
+    python -m benchmarks.load --rows 50000 --concurrency 16 --duration 10 --save-baseline
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from benchmarks.common import LOAD_BASELINE, RESULTS_DIR, compare, environment, summarize, write_results
+
+# (name, weight, method, path, params, json body); {id} is replaced with a random known expense id
+SCENARIOS: Dict[str, List[Tuple[str, int, str, str, Dict, Dict]]] = {
+    "read-heavy": [
+        ("list_expenses", 40, "GET", "/expenses", {"limit": 50}, None),
+        ("get_expense", 20, "GET", "/expenses/{id}", {}, None),
+        ("stats_summary", 10, "GET", "/expenses/stats/summary", {}, None),
+        ("category_breakdown", 10, "GET", "/expenses/analytics/category-breakdown", {}, None),
+        ("monthly_trends", 5, "GET", "/expenses/analytics/monthly-trends", {}, None),
+        ("ai_spending_trends", 5, "GET", "/ai/spending-trends", {"days": 30}, None),
+        ("create_expense", 10, "POST", "/expenses", {}, {
+            "title": "Load test", "category": "Food", "amount": 120.0, "date": "2025-01-15",
+        }),
+    ],
+    "write-heavy": [
+        ("create_expense", 60, "POST", "/expenses", {}, {
+            "title": "Load test", "category": "Shopping", "amount": 999.0, "date": "2025-01-15",
+        }),
+        ("update_expense", 20, "PUT", "/expenses/{id}", {}, {"amount": 150.0}),
+        ("list_expenses", 20, "GET", "/expenses", {"limit": 20}, None),
+    ],
+    "ai": [
+        ("ai_insights", 40, "POST", "/ai/insights", {}, None),
+        ("ai_savings_suggestions", 30, "POST", "/ai/savings-suggestions", {}, None),
+        ("ai_chat", 30, "POST", "/ai/chat", {"message": "How do I start investing?"}, None),
+    ],
+}
+
+
+async def worker(client, mix, ids: List[int], deadline: float, rng: random.Random,
+                 latencies: Dict[str, List[float]], errors: Dict[str, int]) -> None:
+    names = [entry[0] for entry in mix]
+    weights = [entry[1] for entry in mix]
+    by_name = {entry[0]: entry for entry in mix}
+
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        _, _, method, path, params, body = by_name[name]
+        if "{id}" in path:
+            path = path.replace("{id}", str(rng.choice(ids)))
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, params=params, json=body)
+            failed = response.status_code >= 400
+        except Exception:
+            failed = True
+        latencies[name].append(time.perf_counter() - start)
+        if failed:
+            errors[name] += 1
+
+
+async def run(client, scenario: str, concurrency: int, duration: float, seed: int) -> Dict:
+    mix = SCENARIOS[scenario]
+    listing = await client.get("/expenses", params={"limit": 100})
+    ids = [row["id"] for row in listing.json()] if listing.status_code == 200 else []
+    ids = ids or [1]
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*[
+        worker(client, mix, ids, deadline, random.Random(seed + i), latencies, errors)
+        for i in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - started
+
+    per_endpoint = {
+        name: summarize(values, elapsed=elapsed, errors=errors[name]) for name, values in latencies.items()
+    }
+    all_latencies = [value for values in latencies.values() for value in values]
+    per_endpoint["__overall__"] = summarize(all_latencies, elapsed=elapsed, errors=sum(errors.values()))
+    return per_endpoint
+
+
+def report(results: Dict[str, Dict]) -> None:
+    print(f"\n{'endpoint':<26} {'requests':>9} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for name in sorted(results, key=lambda n: (n == "__overall__", n)):
+        s = results[name]
+        print(f"{name:<26} {s['requests']:>9} {s['throughput_rps']:>9.1f} {s['p50_ms']:>9.2f} "
+              f"{s['p95_ms']:>9.2f} {s['p99_ms']:>9.2f} {s['errors']:>7}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Base URL of a running server (default: run the app in-process)")
+    parser.add_argument("--database-url", help="In-process mode: use this database instead of a seeded temp file")
+    parser.add_argument("--rows", type=int, default=10000, help="In-process mode: rows to seed")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="read-heavy", help="Request mix")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent workers")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the request mix")
+    parser.add_argument("--output", default=os.path.join(RESULTS_DIR, "load.json"), help="Where to write results")
+    parser.add_argument("--save-baseline", action="store_true", help="Also write results to the baseline file")
+    parser.add_argument("--compare", action="store_true", help="Compare p99 with the baseline file")
+    parser.add_argument("--baseline", default=LOAD_BASELINE, help="Baseline file path")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed p99 slowdown before flagging")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit non-zero when an endpoint regresses")
+    args = parser.parse_args()
+
+    import httpx
+
+    tmpdir = None
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60)
+    else:
+        if args.database_url:
+            os.environ["DATABASE_URL"] = args.database_url
+        else:
+            tmpdir = tempfile.TemporaryDirectory()
+            os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir.name, 'load.db')}"
+
+        from app.main import app
+        from app.utils.database import engine
+        from benchmarks.datagen import populate
+
+        if tmpdir is not None:
+            print(f"Seeding {args.rows:,} expenses...")
+            populate(engine, args.rows)
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load", timeout=60)
+
+    print(f"Running '{args.scenario}' with {args.concurrency} workers for {args.duration:.0f}s "
+          f"against {args.url or 'in-process app'}")
+
+    async def go():
+        async with client:
+            return await run(client, args.scenario, args.concurrency, args.duration, args.seed)
+
+    results = asyncio.run(go())
+    report(results)
+
+    payload = {
+        "environment": environment(),
+        "config": {
+            "target": args.url or "in-process",
+            "scenario": args.scenario,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "rows": args.rows if tmpdir else None,
+        },
+        "benchmarks": results,
+    }
+    write_results(args.output, payload)
+    if args.save_baseline:
+        write_results(args.baseline, payload)
+
+    regressions = compare(results, args.baseline, metric="p99_ms", threshold=args.threshold) if args.compare else []
+    if tmpdir is not None:
+        tmpdir.cleanup()
+    if regressions and args.fail_on_regression:
+        print(f"\n{len(regressions)} endpoint(s) regressed: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Shared pytest setup: the app runs against a throwaway SQLite database.
+
+The environment is set before anything imports app.config, since the
+settings and the engine are read at import time.
+"""
+import os
+import tempfile
+
+import pytest
+
+_TMP = tempfile.mkdtemp(prefix="vegakash-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'test.db')}"
+os.environ["ARCHIVE_DIR"] = os.path.join(_TMP, "archive")
+
+# Scripts that need a running server (python test_api_endpoints.py), not pytest modules
+collect_ignore = ["test_api_endpoints.py", "test_simple_server.py", "test_app.py"]
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def expense(title: str = "Lunch", amount: float = 120.5, category: str = "Food", day: str = "2025-01-15") -> dict:
+    return {"title": title, "category": category, "amount": amount, "date": day}
@@ -1,9 +1,12 @@
 import { BrowserRouter as Router, Routes, Route } from 'react-router-dom';
-import React from 'react';
+import React, { useEffect } from 'react';
 import Home from './pages/Home';
 import Insights from './pages/Insights';
+import { startExpenseSync } from './services/expenseService';
 
 function App() {
+  useEffect(() => startExpenseSync(), []);
+
   return (
     <Router>
       <Routes>
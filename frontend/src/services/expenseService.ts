@@ -15,6 +15,8 @@ const apiClient = axios.create({
 
 // localStorage fallback for offline mode
 const STORAGE_KEY = 'vegakash_expenses';
+// Last change-feed version applied to the localStorage copy
+const SYNC_VERSION_KEY = 'vegakash_sync_version';
 let backendAvailable = true;
 
 // Check if backend is available
@@ -95,6 +97,7 @@ export interface Expense {
   description?: string;
   created_at?: string;
   updated_at?: string;
+  unsynced?: boolean; // created offline with a local id, not uploaded yet
 }
 
 export interface ExpenseFilters {
@@ -114,6 +117,106 @@ export interface InsightData {
   suggestions: string[];
 }
 
+export interface ExpenseChange {
+  version: number;
+  operation: 'upsert' | 'delete' | 'archive'; // archive: moved out of the live table, keep the local copy
+  id: number;
+  expense: Expense | null;
+}
+
+interface ExpenseChangesPage {
+  since: number;
+  version: number;
+  has_more: boolean;
+  changes: ExpenseChange[];
+}
+
+// Upload expenses created offline; returns the local ids that were uploaded
+const uploadUnsyncedExpenses = async (expenses: Expense[]): Promise<Set<number>> => {
+  const pending = expenses.filter(expense => expense.unsynced && expense.id !== undefined);
+  if (pending.length === 0) {
+    return new Set();
+  }
+  try {
+    await apiClient.post('/expenses/bulk', pending.map(({ title, category, amount, date, description }) => ({ title, category, amount, date, description })));
+    return new Set(pending.map(expense => expense.id as number));
+  } catch (error) {
+    console.warn('Uploading offline expenses failed, keeping them local:', error);
+    return new Set();
+  }
+};
+
+let syncInProgress: Promise<number> | null = null;
+
+// Bring the localStorage copy up to date from /expenses/changes, transferring
+// only what changed since the last sync (everything on the first sync).
+// Offline-created expenses are uploaded first (they come back in the feed
+// with server ids); any that could not be uploaded are kept.
+export const syncExpenses = (): Promise<number> => {
+  if (!syncInProgress) {
+    syncInProgress = runSync().finally(() => {
+      syncInProgress = null;
+    });
+  }
+  return syncInProgress;
+};
+
+const runSync = async (): Promise<number> => {
+  let since = Number(localStorage.getItem(SYNC_VERSION_KEY) || 0);
+  const uploaded = await uploadUnsyncedExpenses(getExpensesFromStorage());
+  const byId = new Map<number, Expense>();
+  if (since > 0) {
+    getExpensesFromStorage().forEach(expense => {
+      if (expense.id !== undefined && !expense.unsynced) {
+        byId.set(expense.id, expense);
+      }
+    });
+  }
+
+  let hasMore = true;
+  while (hasMore) {
+    const response = await apiClient.get<ExpenseChangesPage>('/expenses/changes', { params: { since, limit: 500 } });
+    response.data.changes.forEach(change => {
+      if (change.operation === 'delete') {
+        byId.delete(change.id);
+      } else if (change.expense) {
+        byId.set(change.id, change.expense);
+      }
+    });
+    since = response.data.version;
+    hasMore = response.data.has_more;
+  }
+
+  // Re-read storage so expenses added offline while this sync ran are not lost
+  getExpensesFromStorage().forEach(expense => {
+    if (expense.unsynced && expense.id !== undefined && !uploaded.has(expense.id)) {
+      byId.set(expense.id, expense);
+    }
+  });
+  saveExpensesToStorage(Array.from(byId.values()));
+  localStorage.setItem(SYNC_VERSION_KEY, String(since));
+  return since;
+};
+
+const SYNC_INTERVAL_MS = 60000;
+
+// Keep the offline copy current: sync now, whenever the window regains focus
+// and every SYNC_INTERVAL_MS while the backend is reachable. Returns a cleanup function.
+export const startExpenseSync = (): (() => void) => {
+  const sync = async () => {
+    if (await ensureBackendCheck()) {
+      syncExpenses().catch(error => console.warn('Expense sync failed:', error));
+    }
+  };
+  sync();
+  window.addEventListener('focus', sync);
+  const timer = window.setInterval(sync, SYNC_INTERVAL_MS);
+  return () => {
+    window.removeEventListener('focus', sync);
+    window.clearInterval(timer);
+  };
+};
+
 // Initialize backend check
 let backendCheckPromise: Promise<boolean> | null = null;
 
@@ -198,7 +301,8 @@ export const addExpense = async (expense: Omit<Expense, 'id' | 'created_at' | 'u
       ...expense,
       id: Date.now(), // Simple ID generation
       created_at: new Date().toISOString(),
-      updated_at: new Date().toISOString()
+      updated_at: new Date().toISOString(),
+      unsynced: true
     };
     expenses.push(newExpense);
     saveExpensesToStorage(expenses);
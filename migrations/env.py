@@ -0,0 +1,65 @@
+"""
+Alembic environment: runs migrations against settings.DATABASE_URL using
+the application's model metadata.
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool, text
+
+from app.config import settings
+from app.utils.database import Base
+import app.models  # noqa: F401  (registers the models on Base.metadata)
+from app.services import partitions
+
+config = context.config
+
+# Configure logging only when run from the alembic CLI, not from the app's lifespan
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """Leave the monthly expense partitions (app.services.partitions) out of autogenerate"""
+    return not (type_ == "table" and reflected and compare_to is None and partitions.is_partition_table(name))
+
+
+def run_migrations_offline() -> None:
+    """Emit SQL to stdout instead of executing it (alembic upgrade --sql)"""
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=settings.DATABASE_URL.startswith("sqlite"),
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connectable = create_engine(settings.DATABASE_URL, poolclass=pool.NullPool)
+
+    with connectable.connect() as connection:
+        if connection.dialect.name == "postgresql" and settings.MIGRATION_LOCK_TIMEOUT:
+            # Fail fast instead of queueing every query behind a blocked DDL lock
+            connection.execute(text(f"SET lock_timeout = '{settings.MIGRATION_LOCK_TIMEOUT}'"))
+            connection.commit()
+
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=connection.dialect.name == "sqlite",
+            transaction_per_migration=True,
+            include_object=include_object,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
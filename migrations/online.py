@@ -0,0 +1,84 @@
+"""
+Helpers for schema changes that must not block a live table.
+
+On PostgreSQL, indexes are built with CREATE/DROP INDEX CONCURRENTLY outside
+the migration transaction, so reads and writes continue during the build.
+Other databases fall back to a plain (transactional) CREATE/DROP INDEX.
+Data backfills run in primary-key ranges, each committed on its own on
+PostgreSQL, so row locks are held for one batch at a time rather than until
+the migration commits. While a column is being replaced, a sync trigger
+(PostgreSQL) fills the new column for rows that app versions still on the
+old schema insert or update, so the backfill never falls behind them.
+"""
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+BACKFILL_BATCH_SIZE = 50000
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def create_index_online(index_name: str, table_name: str, columns: Sequence, **kw) -> None:
+    """Create an index without holding a write lock on PostgreSQL"""
+    if _is_postgresql():
+        # CONCURRENTLY cannot run inside a transaction block
+        with op.get_context().autocommit_block():
+            op.create_index(index_name, table_name, columns, postgresql_concurrently=True,
+                            if_not_exists=True, **kw)
+    else:
+        op.create_index(index_name, table_name, columns, if_not_exists=True, **kw)
+
+
+def drop_index_online(index_name: str, table_name: str) -> None:
+    """Drop an index without holding a write lock on PostgreSQL"""
+    if _is_postgresql():
+        with op.get_context().autocommit_block():
+            op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True, if_exists=True)
+    else:
+        op.drop_index(index_name, table_name=table_name, if_exists=True)
+
+
+def backfill(statement: str, table_name: str, batch_size: int = BACKFILL_BATCH_SIZE) -> None:
+    """
+    Run an UPDATE over id ranges; `statement` must filter on :start <= id < :end.
+
+    On PostgreSQL this commits the migration's transaction so far (the new
+    column and its sync trigger become visible) and then commits every batch
+    separately. Elsewhere the batches run in the migration's transaction.
+    """
+    def run() -> None:
+        bind = op.get_bind()
+        max_id = bind.execute(sa.text(f"SELECT MAX(id) FROM {table_name}")).scalar() or 0
+        for start in range(0, max_id + 1, batch_size):
+            bind.execute(sa.text(statement), {"start": start, "end": start + batch_size})
+
+    if _is_postgresql():
+        with op.get_context().autocommit_block():
+            run()
+    else:
+        run()
+
+
+def create_sync_trigger(name: str, table_name: str, columns: Sequence[str], body: str) -> None:
+    """
+    Run `body` (PL/pgSQL assigning NEW fields) before every insert, and every
+    update of `columns`, on `table_name`. PostgreSQL only; a no-op elsewhere.
+    """
+    if not _is_postgresql():
+        return
+    op.execute(f"CREATE OR REPLACE FUNCTION {name}() RETURNS trigger AS $$ BEGIN {body} RETURN NEW; END $$ LANGUAGE plpgsql")
+    op.execute(
+        f"CREATE TRIGGER {name} BEFORE INSERT OR UPDATE OF {', '.join(columns)} ON {table_name} "
+        f"FOR EACH ROW EXECUTE FUNCTION {name}()"
+    )
+
+
+def drop_sync_trigger(name: str, table_name: str) -> None:
+    if not _is_postgresql():
+        return
+    op.execute(f"DROP TRIGGER IF EXISTS {name} ON {table_name}")
+    op.execute(f"DROP FUNCTION IF EXISTS {name}()")
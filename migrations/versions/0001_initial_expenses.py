@@ -0,0 +1,55 @@
+"""Initial expenses schema
+
+Matches the table previously created by Base.metadata.create_all, so
+databases that already have it are adopted without changes.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if sa.inspect(op.get_bind()).has_table("expenses"):
+        return
+
+    op.create_table(
+        "expenses",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("title", sa.String(length=200), nullable=False),
+        sa.Column("category", sa.String(length=100), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.CheckConstraint("amount > 0", name="check_positive_amount"),
+        sa.CheckConstraint("length(title) > 0", name="check_non_empty_title"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_expenses_id", "expenses", ["id"])
+    op.create_index("ix_expenses_title", "expenses", ["title"])
+    op.create_index("ix_expenses_category", "expenses", ["category"])
+    op.create_index("ix_expenses_date", "expenses", ["date"])
+    op.create_index("idx_expense_category_date", "expenses", ["category", "date"])
+    op.create_index("idx_expense_date_amount", "expenses", ["date", "amount"])
+    op.create_index("idx_expense_created_at", "expenses", ["created_at"])
+    op.create_index("idx_expense_amount_desc", "expenses", ["amount"])
+    op.create_index("idx_expense_title_search", "expenses", ["title"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("expenses")
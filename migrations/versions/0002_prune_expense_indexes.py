@@ -0,0 +1,44 @@
+"""Prune redundant expense indexes
+
+Every write maintained nine indexes on expenses. tools/index_advisor.py shows
+four of them are never chosen by the planner for any route query because
+another index already covers the same lookups:
+
+- ix_expenses_id: the primary key is already indexed
+- ix_expenses_title: duplicate of idx_expense_title_search
+- ix_expenses_category: leading prefix of idx_expense_category_date
+- ix_expenses_date: leading prefix of idx_expense_date_amount
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from migrations.online import create_index_online, drop_index_online
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+REDUNDANT_INDEXES = (
+    ("ix_expenses_id", ["id"]),
+    ("ix_expenses_title", ["title"]),
+    ("ix_expenses_category", ["category"]),
+    ("ix_expenses_date", ["date"]),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, _ in REDUNDANT_INDEXES:
+        drop_index_online(name, "expenses")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, columns in REDUNDANT_INDEXES:
+        create_index_online(name, "expenses", columns)
@@ -0,0 +1,77 @@
+"""Store expense amounts as integer paise
+
+Replaces the Float ``amount`` column with BigInteger ``amount_paise``, in
+expand/contract order:
+
+1. add ``amount_paise`` and, on PostgreSQL, a trigger that sets it from
+   ``amount`` on every insert/update, so app versions that still write
+   ``amount`` keep it filled;
+2. backfill existing rows in id-range batches, each committed on its own
+   on PostgreSQL (row locks are held per batch, not for the migration);
+3. contract: drop the trigger, make ``amount_paise`` NOT NULL, drop
+   ``amount`` and rebuild the amount indexes on the new column. This step
+   takes an exclusive lock while the table is altered, and app versions
+   that write ``amount`` must be stopped before it runs.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.online import (
+    backfill, create_index_online, create_sync_trigger, drop_index_online, drop_sync_trigger,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SYNC_TRIGGER = "expenses_sync_amount_paise"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("expenses", sa.Column("amount_paise", sa.BigInteger(), nullable=True))
+    create_sync_trigger(SYNC_TRIGGER, "expenses", ["amount"],
+                        "NEW.amount_paise := CAST(ROUND(NEW.amount * 100) AS BIGINT);")
+    backfill(
+        "UPDATE expenses SET amount_paise = CAST(ROUND(amount * 100) AS BIGINT) "
+        "WHERE id >= :start AND id < :end",
+        "expenses",
+    )
+
+    drop_sync_trigger(SYNC_TRIGGER, "expenses")
+    drop_index_online("idx_expense_date_amount", "expenses")
+    drop_index_online("idx_expense_amount_desc", "expenses")
+    with op.batch_alter_table("expenses") as batch_op:
+        batch_op.drop_constraint("check_positive_amount", type_="check")
+        batch_op.alter_column("amount_paise", existing_type=sa.BigInteger(), nullable=False)
+        batch_op.drop_column("amount")
+        batch_op.create_check_constraint("check_positive_amount", "amount_paise > 0")
+
+    create_index_online("idx_expense_date_amount", "expenses", ["date", "amount_paise"])
+    create_index_online("idx_expense_amount_desc", "expenses", ["amount_paise"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column("expenses", sa.Column("amount", sa.Float(), nullable=True))
+    backfill("UPDATE expenses SET amount = amount_paise / 100.0 WHERE id >= :start AND id < :end", "expenses")
+
+    drop_index_online("idx_expense_date_amount", "expenses")
+    drop_index_online("idx_expense_amount_desc", "expenses")
+    with op.batch_alter_table("expenses") as batch_op:
+        batch_op.drop_constraint("check_positive_amount", type_="check")
+        batch_op.alter_column("amount", existing_type=sa.Float(), nullable=False)
+        batch_op.drop_column("amount_paise")
+        batch_op.create_check_constraint("check_positive_amount", "amount > 0")
+
+    create_index_online("idx_expense_date_amount", "expenses", ["date", "amount"])
+    create_index_online("idx_expense_amount_desc", "expenses", ["amount"])
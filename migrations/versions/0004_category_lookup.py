@@ -0,0 +1,109 @@
+"""Move expense categories into a lookup table
+
+Creates ``categories`` with small integer ids and replaces the
+``expenses.category`` string with a ``category_id`` foreign key. Legacy
+names are mapped to their current category; anything unrecognised becomes
+"Other".
+
+Same expand/contract order as 0003: on PostgreSQL a trigger sets
+``category_id`` for rows app versions still on ``category`` write while
+the batched backfill (one commit per batch) runs; such versions must be
+stopped before the final step drops ``category``.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.online import (
+    backfill, create_index_online, create_sync_trigger, drop_index_online, drop_sync_trigger,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Snapshot of app.utils.categories at the time of this revision
+DEFAULT_CATEGORIES = (
+    (1, "Food"),
+    (2, "Transportation"),
+    (3, "Entertainment"),
+    (4, "Shopping"),
+    (5, "Healthcare"),
+    (6, "Education"),
+    (7, "Utilities"),
+    (8, "Other"),
+)
+LEGACY_CATEGORY_NAMES = {
+    "Food & Dining": "Food",
+    "Bills & Utilities": "Utilities",
+    "Others": "Other",
+    "Travel": "Other",
+}
+OTHER_ID = 8
+
+SYNC_TRIGGER = "expenses_sync_category_id"
+
+
+def _category_id_sql(category: str) -> str:
+    """SQL for the category id of the name in `category` (legacy names mapped, unknown ones -> Other)"""
+    legacy = " ".join(f"WHEN '{old}' THEN '{new}'" for old, new in LEGACY_CATEGORY_NAMES.items())
+    return (f"COALESCE((SELECT categories.id FROM categories WHERE categories.name = "
+            f"CASE {category} {legacy} ELSE {category} END), {OTHER_ID})")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    categories = op.create_table(
+        "categories",
+        sa.Column("id", sa.SmallInteger(), autoincrement=False, nullable=False),
+        sa.Column("name", sa.String(length=50), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+    )
+    op.bulk_insert(categories, [{"id": category_id, "name": name} for category_id, name in DEFAULT_CATEGORIES])
+
+    op.add_column("expenses", sa.Column("category_id", sa.SmallInteger(), nullable=True))
+    create_sync_trigger(SYNC_TRIGGER, "expenses", ["category"],
+                        f"NEW.category_id := {_category_id_sql('NEW.category')};")
+    backfill(
+        f"UPDATE expenses SET category_id = {_category_id_sql('expenses.category')} "
+        "WHERE id >= :start AND id < :end",
+        "expenses",
+    )
+
+    drop_sync_trigger(SYNC_TRIGGER, "expenses")
+    drop_index_online("idx_expense_category_date", "expenses")
+    with op.batch_alter_table("expenses") as batch_op:
+        batch_op.alter_column("category_id", existing_type=sa.SmallInteger(), nullable=False)
+        batch_op.create_foreign_key("fk_expenses_category_id", "categories", ["category_id"], ["id"])
+        batch_op.drop_column("category")
+
+    create_index_online("idx_expense_category_date", "expenses", ["category_id", "date"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column("expenses", sa.Column("category", sa.String(length=100), nullable=True))
+    backfill(
+        "UPDATE expenses SET category = "
+        "(SELECT categories.name FROM categories WHERE categories.id = expenses.category_id) "
+        "WHERE id >= :start AND id < :end",
+        "expenses",
+    )
+
+    drop_index_online("idx_expense_category_date", "expenses")
+    with op.batch_alter_table("expenses") as batch_op:
+        batch_op.drop_constraint("fk_expenses_category_id", type_="foreignkey")
+        batch_op.alter_column("category", existing_type=sa.String(length=100), nullable=False)
+        batch_op.drop_column("category_id")
+
+    create_index_online("idx_expense_category_date", "expenses", ["category", "date"])
+    op.drop_table("categories")
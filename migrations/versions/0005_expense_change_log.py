@@ -0,0 +1,47 @@
+"""Add the expense change log
+
+Creates ``expense_changes``, the append-only log behind
+``GET /expenses/changes``. Existing expenses are logged as inserts (in id
+order) so a client syncing from version 0 receives every current row.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.online import backfill
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "expense_changes",
+        sa.Column("version", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("expense_id", sa.Integer(), nullable=False),
+        sa.Column("operation", sa.String(length=10), nullable=False),
+        sa.Column("changed_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.CheckConstraint("operation IN ('insert', 'update', 'delete')", name="check_change_operation"),
+        sa.PrimaryKeyConstraint("version"),
+        sqlite_autoincrement=True,
+    )
+    backfill(
+        "INSERT INTO expense_changes (expense_id, operation, changed_at) "
+        "SELECT id, 'insert', created_at FROM expenses WHERE id >= :start AND id < :end ORDER BY id",
+        "expenses",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("expense_changes")
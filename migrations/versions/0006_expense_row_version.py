@@ -0,0 +1,33 @@
+"""Add a row version to expenses
+
+``expenses.version`` starts at 1 and is incremented by every update made
+through the API. It is exposed as the ETag of an expense, and
+``If-Match`` updates and deletes compare it in their WHERE clause.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A constant default fills existing rows without rewriting the table (PostgreSQL 11+, SQLite)
+    op.add_column("expenses", sa.Column("version", sa.Integer(), server_default="1", nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("expenses") as batch_op:
+        batch_op.drop_column("version")
@@ -0,0 +1,53 @@
+"""Add the expense archive manifest and rollups
+
+``expense_archives`` lists the Parquet files that hold archived expenses;
+``expense_rollups`` keeps their daily per-category totals in the database
+so analytics cover archived history without reading the files.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, Sequence[str], None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "expense_rollups",
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("category_id", sa.SmallInteger(), nullable=False),
+        sa.Column("total_paise", sa.BigInteger(), nullable=False),
+        sa.Column("expense_count", sa.Integer(), nullable=False),
+        sa.Column("max_paise", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(["category_id"], ["categories.id"], name="fk_expense_rollups_category_id"),
+        sa.PrimaryKeyConstraint("date", "category_id"),
+    )
+    op.create_table(
+        "expense_archives",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("name", sa.String(length=200), nullable=False),
+        sa.Column("first_date", sa.Date(), nullable=False),
+        sa.Column("last_date", sa.Date(), nullable=False),
+        sa.Column("row_count", sa.Integer(), nullable=False),
+        sa.Column("size_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("expense_archives")
+    op.drop_table("expense_rollups")
@@ -0,0 +1,39 @@
+"""Allow 'archive' entries in the expense change log
+
+Expenses moved to the Parquet archive (or a detached partition) are logged
+as ``archive`` instead of ``delete``, so delta-sync clients keep them.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, Sequence[str], None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _replace_check(operations: str) -> None:
+    # SQLite rebuilds the table; keep AUTOINCREMENT so versions are never reused
+    with op.batch_alter_table("expense_changes", table_kwargs={"sqlite_autoincrement": True}) as batch_op:
+        batch_op.drop_constraint("check_change_operation", type_="check")
+        batch_op.create_check_constraint("check_change_operation", f"operation IN ({operations})")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _replace_check("'insert', 'update', 'delete', 'archive'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Older clients only know tombstones
+    op.execute(sa.text("UPDATE expense_changes SET operation = 'delete' WHERE operation = 'archive'"))
+    _replace_check("'insert', 'update', 'delete'")
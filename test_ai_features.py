@@ -6,15 +6,18 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
+from datetime import date
+
 from app.routes.ai_routes import generate_fallback_insights
+from app.services.spending_features import SpendingFeatures
 
 # Test data
 test_expenses = [
-    type('Expense', (), {'amount': 500, 'category': 'Food', 'title': 'Grocery Shopping', 'date': '2025-01-01'}),
-    type('Expense', (), {'amount': 200, 'category': 'Transport', 'title': 'Uber ride', 'date': '2025-01-02'}),
-    type('Expense', (), {'amount': 1500, 'category': 'Food', 'title': 'Restaurant', 'date': '2025-01-03'}),
-    type('Expense', (), {'amount': 300, 'category': 'Entertainment', 'title': 'Movie tickets', 'date': '2025-01-04'}),
-    type('Expense', (), {'amount': 100, 'category': 'Transport', 'title': 'Bus fare', 'date': '2025-01-05'}),
+    {'amount': 500, 'category': 'Food', 'title': 'Grocery Shopping', 'date': '2025-01-01'},
+    {'amount': 200, 'category': 'Transport', 'title': 'Uber ride', 'date': '2025-01-02'},
+    {'amount': 1500, 'category': 'Food', 'title': 'Restaurant', 'date': '2025-01-03'},
+    {'amount': 300, 'category': 'Entertainment', 'title': 'Movie tickets', 'date': '2025-01-04'},
+    {'amount': 100, 'category': 'Transport', 'title': 'Bus fare', 'date': '2025-01-05'},
 ]
 
 category_totals = {
@@ -25,12 +28,30 @@ category_totals = {
 
 total_spent = 2600
 
+# The same data as the pre-aggregated features the AI routes work from (amounts in paise)
+test_features = SpendingFeatures(
+    version=0,
+    period_start=None,
+    period_end=None,
+    expense_count=len(test_expenses),
+    total_paise=total_spent * 100,
+    max_expense_paise=max(e['amount'] for e in test_expenses) * 100,
+    first_date=date(2025, 1, 1),
+    last_date=date(2025, 1, 5),
+    category_totals_paise=tuple((category, amount * 100) for category, amount in category_totals.items()),
+    category_counts=(('Food', 2), ('Transport', 2), ('Entertainment', 1)),
+    monthly_totals_paise=(('2025-01', total_spent * 100),),
+    monthly_counts=(('2025-01', len(test_expenses)),),
+    daily_totals_paise=tuple((date.fromisoformat(e['date']), e['amount'] * 100) for e in test_expenses),
+    sample_transactions=tuple(test_expenses),
+)
+
 def test_fallback_insights():
     """Test the fallback insights generation"""
     print("🧪 Testing fallback insights generation...")
     
     try:
-        insights = generate_fallback_insights(test_expenses, category_totals, total_spent)
+        insights = generate_fallback_insights(test_features)
         
         print("✅ Fallback insights generated successfully!")
         print(f"📊 Patterns: {len(insights['patterns'])}")
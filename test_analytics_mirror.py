@@ -0,0 +1,105 @@
+"""
+Tests for the DuckDB analytics mirror: incremental sync, lag fallback and
+agreement with the primary.
+"""
+from datetime import date
+
+import pytest
+
+pytest.importorskip("duckdb")
+
+from sqlalchemy import func, select
+
+from app.config import settings
+from app.models import Expense
+from app.services import analytics_mirror
+from app.services.analytics_mirror import AnalyticsMirror
+from app.utils.database import SessionLocal
+from conftest import expense
+
+PERIOD = (date(2032, 1, 1), date(2032, 12, 31))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def mirror(client, monkeypatch):
+    """A synced mirror installed as the app's mirror (the background thread is not started)"""
+    mirror = AnalyticsMirror(max_lag_seconds=30, clock=FakeClock())
+    monkeypatch.setattr(settings, "DUCKDB_MIRROR", True)
+    monkeypatch.setattr(analytics_mirror, "_mirror", mirror)
+    with SessionLocal() as db:
+        mirror.sync(db)
+    yield mirror
+    mirror.close()
+
+
+def _primary_totals(keys):
+    with SessionLocal() as db:
+        group = [getattr(Expense, key) for key in keys]
+        return [tuple(row) for row in db.execute(
+            select(*group, func.count(Expense.id), func.sum(Expense.amount_paise), func.max(Expense.amount_paise))
+            .where(Expense.date.between(*PERIOD)).group_by(*group).order_by(*group)
+        )]
+
+
+def _add(client, *payload):
+    response = client.post("/expenses/bulk", json=list(payload))
+    assert response.status_code == 200
+    return response.json()["ids"]
+
+
+def test_mirror_totals_match_the_primary(client, mirror):
+    ids = _add(client, expense("Mirror lunch", 120.5, "Food", "2032-01-05"),
+               expense("Mirror dinner", 80, "Food", "2032-01-05"),
+               expense("Mirror bus", 15.25, "Transportation", "2032-02-10"))
+    client.put(f"/expenses/{ids[1]}", json={"amount": 95, "date": "2032-03-01"})
+    client.delete(f"/expenses/{ids[2]}")
+
+    with SessionLocal() as db:
+        assert mirror.sync(db) > 0
+    for keys in (("date",), ("category_id",), ("date", "category_id")):
+        assert mirror.grouped_totals(keys, *PERIOD) == _primary_totals(keys)
+    assert mirror.grouped_totals(("date",), *PERIOD) == [(date(2032, 1, 5), 1, 12050, 12050),
+                                                         (date(2032, 3, 1), 1, 9500, 9500)]
+
+
+def test_sync_is_idempotent(client, mirror):
+    _add(client, expense("Idempotent", 10, "Food", "2032-04-01"))
+    with SessionLocal() as db:
+        assert mirror.sync(db) == 1
+        version = mirror.version
+        before = mirror.grouped_totals(("date", "category_id"), *PERIOD)
+        assert mirror.sync(db) == 0
+        assert mirror.sync(db) == 0
+    assert mirror.version == version
+    assert mirror.grouped_totals(("date", "category_id"), *PERIOD) == before
+
+
+def test_lagging_mirror_is_served_without_syncing_then_falls_back(client, mirror):
+    with SessionLocal() as db:
+        assert analytics_mirror.live_totals(db, ("date",), *PERIOD) == _primary_totals(("date",))
+
+    _add(client, expense("Lagging", 10, "Food", "2032-05-01"))
+    version = mirror.version
+    with SessionLocal() as db:
+        # Behind, but within max_lag_seconds: answered from the mirror as it stands
+        mirror.clock.now += 30
+        stale = analytics_mirror.live_totals(db, ("date",), *PERIOD)
+        assert mirror.version == version
+        assert (date(2032, 5, 1), 1, 1000, 1000) not in stale
+        assert analytics_mirror._wake.is_set()
+
+        # Too far behind: callers query the primary
+        mirror.clock.now += 0.1
+        assert analytics_mirror.live_totals(db, ("date",), *PERIOD) is None
+
+        mirror.sync(db)
+        assert analytics_mirror.live_totals(db, ("date",), *PERIOD) == _primary_totals(("date",))
+    analytics_mirror._wake.clear()
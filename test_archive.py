@@ -0,0 +1,89 @@
+"""
+Tests for the Parquet expense archive as seen through the API.
+"""
+from datetime import date
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from sqlalchemy import text
+
+from app.services import archive, partitions
+from app.utils.database import SessionLocal
+from conftest import expense
+
+
+@pytest.fixture(scope="module")
+def archived(client):
+    """Two expenses from 2000 moved to the archive, plus the change version before that"""
+    ids = client.post("/expenses/bulk", json=[expense("Archived lunch", 40, "Food", "2000-03-01"),
+                                              expense("Archived bus", 15, "Transportation", "2000-03-02")]).json()["ids"]
+    since = client.get("/expenses/changes", params={"since": 0}).json()["version"]
+    with SessionLocal() as db:
+        entry = archive.archive_expenses(db, date(2001, 1, 1))
+        db.commit()
+        assert entry.row_count == 2
+    return ids, since
+
+
+def test_archived_expenses_are_not_tombstones(client, archived):
+    ids, since = archived
+    changes = client.get("/expenses/changes", params={"since": since}).json()["changes"]
+    assert sorted((change["id"], change["operation"], change["expense"]) for change in changes) \
+        == sorted((expense_id, "archive", None) for expense_id in ids)
+
+
+def test_insert_before_archive_in_one_page_is_not_a_tombstone(client, archived):
+    ids, _ = archived
+    changes = client.get("/expenses/changes", params={"since": 0, "limit": 1000}).json()["changes"]
+    operations = {change["id"]: change["operation"] for change in changes}
+    assert [operations[expense_id] for expense_id in ids] == ["archive", "archive"]
+
+
+def test_get_archived_expense_by_id(client, archived):
+    ids, _ = archived
+    response = client.get(f"/expenses/{ids[0]}")
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["title"], body["category"], body["amount"], body["date"]) == ("Archived lunch", "Food", 40.0, "2000-03-01")
+    assert response.headers["ETag"] == '"1"'
+    assert client.get(f"/expenses/{ids[1]}", params={"fields": "id,title"}).json() == {"id": ids[1], "title": "Archived bus"}
+    # Read-only
+    assert client.put(f"/expenses/{ids[0]}", json={"title": "Nope"}).status_code == 404
+
+
+def test_undated_list_includes_archived_expenses(client, archived, monkeypatch):
+    ids, _ = archived
+    oldest = client.get("/expenses", params={"sort_by": "date", "sort_order": "asc", "limit": 2}).json()
+    assert [row["id"] for row in oldest] == ids
+    found = client.get("/expenses", params={"search": "Archived", "limit": 100}).json()
+    assert sorted(row["id"] for row in found) == sorted(ids)
+    # A page of recent live expenses does not need the archive and is unaffected
+    client.post("/expenses", json=expense("Live", 5, "Food", "2030-01-01"))
+    monkeypatch.setattr(archive, "archived_rows", lambda *args: pytest.fail("archive files were read"))
+    recent = client.get("/expenses", params={"limit": 1}).json()
+    assert recent[0]["date"] >= "2030-01-01"
+
+
+def test_detached_partition_is_archived_with_rollups(client):
+    """A detached month (simulated with a plain table on SQLite) stays in the feed, the API and analytics"""
+    ids = client.post("/expenses/bulk", json=[expense("Detached lunch", 40, "Food", "2001-05-03"),
+                                              expense("Detached taxi", 15, "Transportation", "2001-05-20")]).json()["ids"]
+    since = client.get("/expenses/changes", params={"since": 0}).json()["version"]
+    name = partitions.partition_name(date(2001, 5, 1))
+    with SessionLocal() as db:
+        db.execute(text(f"CREATE TABLE {name} AS SELECT * FROM expenses WHERE date >= '2001-05-01' AND date < '2001-06-01'"))
+        db.execute(text("DELETE FROM expenses WHERE date >= '2001-05-01' AND date < '2001-06-01'"))
+        entry = partitions.archive_detached(db, name)
+        db.commit()
+        assert (entry.row_count, entry.first_date, entry.last_date) == (2, date(2001, 5, 3), date(2001, 5, 20))
+        db.execute(text(f"DROP TABLE {name}"))
+        db.commit()
+
+    changes = client.get("/expenses/changes", params={"since": since}).json()["changes"]
+    assert sorted((change["id"], change["operation"]) for change in changes) == [(expense_id, "archive") for expense_id in ids]
+    assert client.get(f"/expenses/{ids[1]}").json()["title"] == "Detached taxi"
+    with SessionLocal() as db:
+        totals = archive.grouped_totals(db, ("category_id",), date(2001, 5, 1), date(2001, 5, 31))
+    assert totals == [(1, 1, 4000, 4000), (2, 1, 1500, 1500)]
@@ -0,0 +1,140 @@
+"""
+Tests for the circuit breaker state machine, driven by an injected clock.
+"""
+import pytest
+
+from app.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def _breaker(clock, **overrides):
+    options = dict(window=4, minimum_calls=4, failure_rate=0.5, slow_call_rate=0.5, slow_call_seconds=2.0,
+                   open_seconds=30.0, half_open_calls=2, clock=clock)
+    options.update(overrides)
+    return CircuitBreaker("test", **options)
+
+
+def _ok():
+    return "ok"
+
+
+def _fail():
+    raise RuntimeError("upstream down")
+
+
+def _run(breaker, func):
+    try:
+        return breaker.call(func)
+    except RuntimeError:
+        return None
+
+
+def _trip(breaker):
+    for func in (_ok, _ok, _fail, _fail):
+        _run(breaker, func)
+    assert breaker.state == OPEN
+
+
+def test_stays_closed_below_minimum_calls_and_failure_rate():
+    breaker = _breaker(FakeClock())
+    for _ in range(3):
+        _run(breaker, _fail)
+    # Three failures, but fewer than minimum_calls recorded
+    assert breaker.state == CLOSED
+
+    breaker.reset()
+    for func in (_ok, _ok, _ok, _fail):
+        _run(breaker, func)
+    # 1 in 4 is below the 50% failure rate
+    assert breaker.state == CLOSED
+
+
+def test_opens_at_failure_threshold_and_rejects_without_calling():
+    breaker = _breaker(FakeClock())
+    _trip(breaker)
+
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: calls.append(1))
+    assert calls == []
+    assert not breaker.allows_requests()
+
+
+def test_slow_calls_open_the_breaker():
+    clock = FakeClock()
+    breaker = _breaker(clock)
+
+    def slow():
+        clock.advance(2.5)
+        return "late"
+
+    for func in (_ok, _ok, slow, slow):
+        assert breaker.call(func) in ("ok", "late")
+    assert breaker.state == OPEN
+
+
+def test_half_opens_after_cooldown():
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    _trip(breaker)
+
+    clock.advance(29.9)
+    assert breaker.state == OPEN
+    clock.advance(0.1)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allows_requests()
+
+
+def test_successful_probes_close_the_breaker():
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    _trip(breaker)
+    clock.advance(30)
+
+    assert breaker.call(_ok) == "ok"
+    assert breaker.state == HALF_OPEN
+    assert breaker.call(_ok) == "ok"
+    assert breaker.state == CLOSED
+    # Closed again with a fresh window: one failure does not re-open it
+    _run(breaker, _fail)
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_reopens_for_another_cooldown():
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    _trip(breaker)
+    clock.advance(30)
+
+    _run(breaker, _fail)
+    assert breaker.state == OPEN
+    clock.advance(29)
+    assert breaker.state == OPEN
+    clock.advance(1)
+    assert breaker.state == HALF_OPEN
+
+
+def test_half_open_limits_concurrent_probes():
+    clock = FakeClock()
+    breaker = _breaker(clock, half_open_calls=1)
+    _trip(breaker)
+    clock.advance(30)
+
+    def probe():
+        # A second call while this probe is still in flight is rejected
+        with pytest.raises(CircuitOpenError):
+            breaker.call(_ok)
+        return "probe"
+
+    assert breaker.call(probe) == "probe"
+    assert breaker.state == CLOSED
@@ -0,0 +1,83 @@
+"""
+Tests for the delta-sync feed, GET /expenses/changes.
+"""
+from app.routes.expense_routes import router
+from conftest import expense
+
+
+def _changes(client, since, **params):
+    response = client.get("/expenses/changes", params={"since": since, **params})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_changes_route_is_declared_before_expense_id(client):
+    paths = [route.path for route in router.routes]
+    assert paths.index("/expenses/changes") < paths.index("/expenses/{expense_id}")
+    # Otherwise "changes" would be parsed as an expense id and rejected with a 422
+    assert client.get("/expenses/changes").status_code == 200
+
+
+def test_since_cursor(client):
+    start = _changes(client, 0)["version"]
+    created = client.post("/expenses", json=expense("Cursor")).json()
+
+    page = _changes(client, start)
+    assert page["since"] == start
+    assert page["version"] > start
+    assert [(change["operation"], change["id"]) for change in page["changes"]] == [("upsert", created["id"])]
+    assert page["changes"][0]["expense"]["title"] == "Cursor"
+
+    caught_up = _changes(client, page["version"])
+    assert caught_up == {"since": page["version"], "version": page["version"], "has_more": False, "changes": []}
+
+
+def test_update_is_reported_once_with_the_current_row(client):
+    start = _changes(client, 0)["version"]
+    created = client.post("/expenses", json=expense("Before")).json()
+    client.put(f"/expenses/{created['id']}", json={"title": "After"})
+
+    changes = _changes(client, start)["changes"]
+    assert len(changes) == 1
+    assert changes[0]["expense"]["title"] == "After"
+
+
+def test_delete_tombstone(client):
+    created = client.post("/expenses", json=expense("Doomed")).json()
+    start = _changes(client, 0)["version"]
+    assert client.delete(f"/expenses/{created['id']}").status_code == 200
+
+    changes = _changes(client, start)["changes"]
+    assert changes == [{"version": changes[0]["version"], "operation": "delete", "id": created["id"], "expense": None}]
+
+
+def test_insert_then_delete_in_one_page_is_a_tombstone(client):
+    start = _changes(client, 0)["version"]
+    created = client.post("/expenses", json=expense("Brief")).json()
+    client.delete(f"/expenses/{created['id']}")
+
+    changes = _changes(client, start)["changes"]
+    assert [(change["operation"], change["id"]) for change in changes] == [("delete", created["id"])]
+
+
+def test_has_more_paging(client):
+    start = _changes(client, 0)["version"]
+    ids = client.post("/expenses/bulk", json=[expense(f"Page {n}") for n in range(5)]).json()["ids"]
+
+    seen, since, pages = [], start, 0
+    while True:
+        page = _changes(client, since, limit=2)
+        pages += 1
+        assert len(page["changes"]) <= 2
+        seen += [change["id"] for change in page["changes"]]
+        since = page["version"]
+        if not page["has_more"]:
+            break
+    assert seen == ids
+    assert pages == 3
+    assert _changes(client, since)["changes"] == []
+
+
+def test_since_and_limit_are_validated(client):
+    assert client.get("/expenses/changes", params={"since": -1}).status_code == 422
+    assert client.get("/expenses/changes", params={"limit": 0}).status_code == 422
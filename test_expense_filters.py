@@ -0,0 +1,129 @@
+"""
+Tests for the expense list filter planner (app.services.expense_filters).
+"""
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.services.expense_filters import SORT_COLUMNS, _amount, _date, parse_range, plan
+from app.utils import categories
+from conftest import expense
+
+
+def test_parse_range_closed_and_open_sides():
+    assert parse_range("2025-01-01..2025-01-31", _date) == (date(2025, 1, 1), date(2025, 1, 31))
+    assert parse_range("2025-01-01..", _date) == (date(2025, 1, 1), None)
+    assert parse_range("..2025-01-31", _date) == (None, date(2025, 1, 31))
+    assert parse_range(" 10 .. 20.50 ", _amount) == (1000, 2050)
+    assert parse_range("5..5", _amount) == (500, 500)
+
+
+@pytest.mark.parametrize("value, message", [
+    ("2025-01-01", "must look like start..end"),
+    ("..", "needs a start or an end"),
+    ("2025-02-01..2025-01-01", "starts after it ends"),
+    ("2025-13-01..", "Invalid date"),
+])
+def test_parse_range_rejects_bad_dates(value, message):
+    with pytest.raises(ValueError, match=message):
+        parse_range(value, _date)
+
+
+@pytest.mark.parametrize("value, message", [
+    ("abc..10", "Invalid amount"),
+    ("20..10", "starts after it ends"),
+])
+def test_parse_range_rejects_bad_amounts(value, message):
+    with pytest.raises(ValueError, match=message):
+        parse_range(value, _amount)
+
+
+def test_plan_without_filters_scans_in_sort_index_order():
+    result = plan()
+    assert result.conditions == []
+    assert not result.empty
+    assert (result.index, result.ordered_by_index) == ("idx_expense_date_amount", True)
+    assert result.describe() == "index=idx_expense_date_amount; order by date desc (index)"
+
+
+def test_plan_sort_whitelist():
+    for sort_by in SORT_COLUMNS:
+        assert plan(sort_by=sort_by, sort_order="ASC").sort_by == sort_by
+    assert plan(sort_by="category").ordered_by_index is False
+    with pytest.raises(ValueError, match="Cannot sort by 'description'"):
+        plan(sort_by="description")
+    with pytest.raises(ValueError, match="Cannot sort by"):
+        plan(sort_by="amount_paise; DROP TABLE expenses")
+
+
+def test_plan_sort_order():
+    assert plan(sort_order="asc").descending is False
+    assert plan(sort_order="DESC").descending is True
+    assert plan(sort_by="amount", sort_order="asc").describe().endswith("order by amount asc (index)")
+
+
+def test_plan_unknown_category_is_empty(client):
+    result = plan(category="No Such Category")
+    assert result.empty
+    assert result.category_ids == []
+    assert result.index is None
+    assert result.describe().startswith("skipped (no possible matches)")
+
+
+def test_plan_categories_resolve_to_ids(client):
+    food = categories.category_id("Food")
+    single = plan(category="food")
+    assert single.category_ids == [food]
+    assert (single.index, single.ordered_by_index) == ("idx_expense_category_date", True)
+
+    several = plan(category="Food, Transportation, No Such Category")
+    assert several.category_ids == sorted([food, categories.category_id("Transportation")])
+    assert several.ordered_by_index is False
+
+
+def test_plan_ranges_are_anded_across_lists_and_ored_within():
+    result = plan(date_from=date(2025, 1, 1), date_ranges=["2025-01-01..2025-01-10", "2025-03-01.."],
+                  min_amount=Decimal("10"), amount_ranges=["..99.99"])
+    assert result.date_filters == [[(date(2025, 1, 1), None)],
+                                   [(date(2025, 1, 1), date(2025, 1, 10)), (date(2025, 3, 1), None)]]
+    assert result.amount_filters == [[(1000, None)], [(None, 9999)]]
+    assert len(result.conditions) == 4
+    assert result.index == "idx_expense_date_amount"
+
+
+def test_plan_bad_range_raises():
+    with pytest.raises(ValueError):
+        plan(date_ranges=["yesterday..today"])
+    with pytest.raises(ValueError):
+        plan(amount_ranges=["10..5"])
+
+
+@pytest.mark.parametrize("params", [
+    {"date_range": "2025-02-01..2025-01-01"},
+    {"date_range": "not-a-date.."},
+    {"amount_range": "ten..20"},
+    {"amount_range": "50"},
+    {"sort_by": "description"},
+])
+def test_list_rejects_bad_filters_with_400(client, params):
+    response = client.get("/expenses", params=params)
+    assert response.status_code == 400, response.text
+
+
+def test_list_filters_and_query_plan_header(client):
+    client.post("/expenses/bulk", json=[expense("Plan cheap", 5, "Transportation", "2031-05-02"),
+                                        expense("Plan dear", 500, "Transportation", "2031-05-03"),
+                                        expense("Plan other", 50, "Transportation", "2031-07-01")])
+    response = client.get("/expenses", params={"category": "transport", "date_range": "2031-05-01..2031-05-31",
+                                               "amount_range": "10..", "sort_by": "amount"})
+    assert response.status_code == 200
+    assert [row["title"] for row in response.json()] == ["Plan dear"]
+    header = response.headers["X-Query-Plan"]
+    assert header.startswith("index=idx_expense_category_date; ")
+    assert "date in [2031-05-01..2031-05-31]" in header
+    assert header.endswith("order by amount desc (sort)")
+
+    empty = client.get("/expenses", params={"category": "No Such Category"})
+    assert empty.json() == []
+    assert empty.headers["X-Query-Plan"].startswith("skipped")
@@ -0,0 +1,71 @@
+"""
+Tests for the shared expense validation pipeline (app.utils.validation)
+and for the single-row and bulk create paths agreeing on it.
+"""
+from datetime import date
+
+import pytest
+
+from app.utils.validation import expense_values
+from conftest import expense
+
+
+def _version(client):
+    return client.get("/expenses/changes", params={"since": 0}).json()["version"]
+
+
+@pytest.mark.parametrize("data, message", [
+    ({"title": "   "}, "Title cannot be empty"),
+    ({"title": "x" * 201}, "Title cannot exceed 200 characters"),
+    ({"category": "Groceries"}, "Category must be one of"),
+    ({"amount": "0.004"}, "Amount must be positive"),
+    ({"amount": "1000000.01"}, "Amount cannot exceed"),
+    ({"date": None}, "Date is required"),
+    ({"description": "x" * 501}, "Description cannot exceed 500 characters"),
+])
+def test_pipeline_rejects(data, message):
+    values = {**expense(), "date": date(2025, 1, 15), **data}
+    with pytest.raises(ValueError, match=message):
+        expense_values(values)
+
+
+def test_missing_fields_are_rejected_unless_partial():
+    with pytest.raises(ValueError, match="Missing required fields: amount, date"):
+        expense_values({"title": "Lunch", "category": "Food"})
+    assert expense_values({"title": "  Late   lunch "}, partial=True) == {"title": "Late lunch"}
+
+
+def test_pipeline_converts_to_column_values():
+    values = expense_values({**expense("  Team \t lunch ", amount=10.005, category="Food & Dining"),
+                             "date": date(2025, 1, 15), "description": "   "})
+    assert values == {"title": "Team lunch", "category_id": 1, "amount_paise": 1001,
+                      "date": date(2025, 1, 15), "description": None}
+
+
+def test_single_create_rejects_what_the_pipeline_rejects(client):
+    start = _version(client)
+    response = client.post("/expenses", json=expense("   "))
+    assert response.status_code == 400
+    assert "Title cannot be empty" in response.json()["detail"]
+    assert _version(client) == start
+
+
+def test_bulk_rejects_the_whole_batch_on_one_bad_row(client):
+    start = _version(client)
+    response = client.post("/expenses/bulk", json=[expense("Fine"), expense("Bad", category="Groceries")])
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Error in expense 1: Category must be one of")
+    assert _version(client) == start
+
+
+def test_bulk_and_single_create_store_the_same_row(client):
+    payload = {**expense("  Team \t lunch ", amount=10.005, category="Food & Dining"), "description": "  "}
+    single = client.post("/expenses", json=payload).json()
+    bulk = client.post("/expenses/bulk", json=[payload])
+    assert bulk.status_code == 200
+    stored = client.get(f"/expenses/{bulk.json()['ids'][0]}").json()
+
+    fields = ("title", "category", "amount", "date", "description")
+    assert {name: stored[name] for name in fields} == {name: single[name] for name in fields}
+    assert (single["title"], single["category"], single["amount"], single["description"]) == \
+        ("Team lunch", "Food", 10.01, None)
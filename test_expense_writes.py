@@ -0,0 +1,81 @@
+"""
+Tests for the expense write contract: row versions, ETags and If-Match.
+"""
+from conftest import expense
+
+
+def _create(client, title="Versioned"):
+    response = client.post("/expenses", json=expense(title))
+    assert response.status_code == 200
+    return response
+
+
+def test_create_returns_version_and_etag(client):
+    response = _create(client)
+    body = response.json()
+    assert body["version"] == 1
+    assert response.headers["ETag"] == '"1"'
+
+
+def test_get_returns_the_same_etag(client):
+    created = _create(client).json()
+    response = client.get(f"/expenses/{created['id']}")
+    assert response.headers["ETag"] == '"1"'
+    assert response.json()["version"] == 1
+
+
+def test_update_with_matching_version_bumps_version(client):
+    created = _create(client).json()
+    response = client.put(f"/expenses/{created['id']}", json={"amount": 99}, headers={"If-Match": '"1"'})
+    assert response.status_code == 200
+    assert response.json()["version"] == 2
+    assert response.json()["amount"] == 99
+    assert response.headers["ETag"] == '"2"'
+
+    # Weak validators and * are accepted too
+    weak = client.put(f"/expenses/{created['id']}", json={"title": "Weak"}, headers={"If-Match": 'W/"2"'})
+    assert weak.headers["ETag"] == '"3"'
+    star = client.put(f"/expenses/{created['id']}", json={"title": "Star"}, headers={"If-Match": "*"})
+    assert star.headers["ETag"] == '"4"'
+
+
+def test_update_without_if_match_still_bumps_version(client):
+    created = _create(client).json()
+    response = client.put(f"/expenses/{created['id']}", json={"title": "Unconditional"})
+    assert response.json()["version"] == 2
+
+
+def test_update_with_stale_version_is_412_and_changes_nothing(client):
+    created = _create(client, "Original").json()
+    client.put(f"/expenses/{created['id']}", json={"title": "First writer"})
+
+    response = client.put(f"/expenses/{created['id']}", json={"title": "Second writer"}, headers={"If-Match": '"1"'})
+    assert response.status_code == 412
+    current = client.get(f"/expenses/{created['id']}").json()
+    assert (current["title"], current["version"]) == ("First writer", 2)
+
+
+def test_update_missing_expense_is_404_even_with_if_match(client):
+    response = client.put("/expenses/987654321", json={"title": "Ghost"}, headers={"If-Match": '"1"'})
+    assert response.status_code == 404
+
+
+def test_invalid_if_match_is_400(client):
+    created = _create(client).json()
+    response = client.put(f"/expenses/{created['id']}", json={"title": "Bad"}, headers={"If-Match": "not-a-version"})
+    assert response.status_code == 400
+
+
+def test_delete_with_stale_version_is_412(client):
+    created = _create(client).json()
+    client.put(f"/expenses/{created['id']}", json={"title": "Changed"})
+
+    assert client.delete(f"/expenses/{created['id']}", headers={"If-Match": '"1"'}).status_code == 412
+    assert client.get(f"/expenses/{created['id']}").status_code == 200
+
+
+def test_delete_with_matching_version(client):
+    created = _create(client).json()
+    assert client.delete(f"/expenses/{created['id']}", headers={"If-Match": '"1"'}).status_code == 200
+    assert client.get(f"/expenses/{created['id']}").status_code == 404
+    assert client.delete(f"/expenses/{created['id']}").status_code == 404
@@ -0,0 +1,47 @@
+"""
+Tests for the Alembic migrations, run against a fresh SQLite database.
+"""
+import os
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, text
+
+from app.config import settings
+from app.utils.database import PROJECT_ROOT
+
+
+@pytest.fixture
+def migrate(tmp_path, monkeypatch):
+    """Run `alembic <command> <revision>` against an empty database; returns that database's engine"""
+    url = f"sqlite:///{tmp_path / 'migrations.db'}"
+    monkeypatch.setattr(settings, "DATABASE_URL", url)
+    config = Config(os.path.join(PROJECT_ROOT, "alembic.ini"))
+    config.attributes["configure_logger"] = False
+    engine = create_engine(url)
+
+    def run(name, revision):
+        getattr(command, name)(config, revision)
+        return engine
+
+    yield run
+    engine.dispose()
+
+
+def _table_sql(engine, name):
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                            {"name": name}).scalar()
+
+
+def test_change_log_keeps_autoincrement_through_upgrade_and_downgrade(migrate):
+    engine = migrate("upgrade", "head")
+    ddl = _table_sql(engine, "expense_changes")
+    assert "AUTOINCREMENT" in ddl
+    assert "'archive'" in ddl
+
+    engine = migrate("downgrade", "0007")
+    ddl = _table_sql(engine, "expense_changes")
+    assert "AUTOINCREMENT" in ddl
+    assert "'archive'" not in ddl
@@ -0,0 +1,107 @@
+"""
+Tests for the semantic chat cache: hits, misses, TTL expiry and invalidation.
+"""
+from app.routes import ai_routes
+from app.services import model_backends
+from app.services.semantic_cache import SemanticCache
+from conftest import expense
+
+QUESTION = "How much did I spend on food this month?"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _cache(clock=None, **options):
+    return SemanticCache(clock=clock or FakeClock(), **options)
+
+
+def test_exact_and_paraphrased_questions_hit():
+    cache = _cache()
+    cache.put(QUESTION, "v1", "About ₹4,200")
+
+    assert cache.get(QUESTION, "v1") == "About ₹4,200"
+    # Same words once punctuation and stopwords are dropped
+    assert cache.get("please tell me how much I spend on food this month", "v1") == "About ₹4,200"
+    # Close enough by cosine similarity
+    assert cache.get("So how much did I spend on food this month", "v1") == "About ₹4,200"
+
+
+def test_different_questions_miss():
+    cache = _cache()
+    cache.put(QUESTION, "v1", "About ₹4,200")
+
+    assert cache.get("How much did I spend on healthcare this month?", "v1") is None
+    assert cache.get("How much did I spend on food in the last 3 months?", "v1") is None
+    assert cache.get("What did I not spend on food this month?", "v1") is None
+    assert cache.get("Where can I cut costs?", "v1") is None
+    assert cache.get("???", "v1") is None
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = _cache(clock, ttl_seconds=60)
+    cache.put(QUESTION, "v1", "About ₹4,200")
+
+    clock.now += 59
+    assert cache.get(QUESTION, "v1") == "About ₹4,200"
+    assert cache.get("So how much did I spend on food this month", "v1") == "About ₹4,200"
+    clock.now += 1
+    assert cache.get(QUESTION, "v1") is None
+    assert cache.get("So how much did I spend on food this month", "v1") is None
+
+
+def test_changed_context_and_clear_invalidate():
+    cache = _cache()
+    cache.put(QUESTION, "v1", "About ₹4,200")
+
+    assert cache.get(QUESTION, "v2") is None
+    cache.clear()
+    assert cache.get(QUESTION, "v1") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = _cache(max_entries=2)
+    cache.put("How much on food?", "v1", "food")
+    cache.put("How much on shopping?", "v1", "shopping")
+    cache.get("How much on food?", "v1")
+    cache.put("How much on education?", "v1", "education")
+
+    assert cache.get("How much on shopping?", "v1") is None
+    assert cache.get("How much on food?", "v1") == "food"
+    assert cache.get("How much on education?", "v1") == "education"
+
+
+class CountingBackend(model_backends.MockBackend):
+    def __init__(self):
+        super().__init__(latency_ms=0, tokens=20)
+        self.calls = 0
+
+    def complete(self, messages, temperature=0.3, max_tokens=200):
+        self.calls += 1
+        return super().complete(messages, temperature, max_tokens)
+
+
+def test_chat_answers_are_invalidated_by_expense_changes(client, monkeypatch):
+    backend = CountingBackend()
+    monkeypatch.setattr(model_backends, "_backend", backend)
+    ai_routes.CHAT_CACHE.clear()
+    ai_routes.MODEL_BREAKER.reset()
+
+    def chat():
+        response = client.post("/ai/chat", params={"message": QUESTION})
+        assert response.status_code == 200
+        return response.json()["response"]
+
+    first = chat()
+    assert (chat(), backend.calls) == (first, 1)
+
+    # A write bumps the expense change version, which is part of the cache context
+    assert client.post("/expenses", json=expense("Invalidate chat cache")).status_code == 200
+    chat()
+    assert backend.calls == 2
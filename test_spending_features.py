@@ -0,0 +1,21 @@
+"""
+Tests for the pre-aggregated spending features behind the AI endpoints.
+"""
+from datetime import date
+
+from app.services import spending_features
+from app.utils.database import SessionLocal
+from conftest import expense
+
+
+def test_samples_are_the_most_recent_expenses(client):
+    days = [f"2031-03-{day:02d}" for day in range(1, 13)]
+    # Inserted oldest first, plus an even older row last, so neither id order matches date order
+    payload = [expense(f"Sample {day}", day=day) for day in days] + [expense("Oldest", day="2031-02-28")]
+    assert client.post("/expenses/bulk", json=payload).status_code == 200
+
+    with SessionLocal() as db:
+        features = spending_features.compute(db, date(2031, 2, 1), date(2031, 3, 31))
+
+    samples = [sample["date"] for sample in features.sample_transactions]
+    assert samples == sorted(days, reverse=True)[:spending_features.SAMPLE_SIZE]
@@ -0,0 +1,181 @@
+"""
+Tests for group-commit batching (app.services.write_batcher) and the
+expense insert flush behind POST /expenses.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import select
+
+from app.config import settings
+from app.models import Expense, ExpenseChange
+from app.routes.expense_routes import insert_expense_batch
+from app.schemas import ExpenseCreate
+from app.services import change_log
+from app.services.write_batcher import WriteBatcher
+from app.utils.database import SessionLocal
+from app.utils.validation import expense_values
+from conftest import expense
+
+
+def _values(title: str) -> dict:
+    """Column values for an expense, as POST /expenses queues them"""
+    return expense_values(ExpenseCreate(**expense(title)).model_dump())
+
+
+class RecordingFlush:
+    """Flush function that records each batch and when it started"""
+
+    def __init__(self, delay: float = 0.0):
+        self.batches = []
+        self.started = []
+        self.delay = delay
+
+    def __call__(self, items):
+        self.started.append(time.monotonic())
+        self.batches.append(list(items))
+        time.sleep(self.delay)
+        return [item * 10 for item in items]
+
+
+def _submit_all(batcher, items):
+    with ThreadPoolExecutor(max_workers=len(items)) as pool:
+        return list(pool.map(batcher.submit, items))
+
+
+def test_full_batch_flushes_without_waiting_for_the_deadline():
+    flush = RecordingFlush()
+    batcher = WriteBatcher("test", flush, max_batch=4, max_delay_ms=10000)
+    try:
+        start = time.monotonic()
+        assert _submit_all(batcher, [1, 2, 3, 4]) == [10, 20, 30, 40]
+        assert time.monotonic() - start < 5
+        assert [sorted(batch) for batch in flush.batches] == [[1, 2, 3, 4]]
+    finally:
+        batcher.close()
+
+
+def test_batches_never_exceed_max_batch():
+    flush = RecordingFlush()
+    batcher = WriteBatcher("test", flush, max_batch=3, max_delay_ms=50)
+    try:
+        assert _submit_all(batcher, list(range(10))) == [n * 10 for n in range(10)]
+        assert all(len(batch) <= 3 for batch in flush.batches)
+        assert sorted(item for batch in flush.batches for item in batch) == list(range(10))
+    finally:
+        batcher.close()
+
+
+def test_lone_write_is_flushed_at_the_deadline():
+    flush = RecordingFlush()
+    batcher = WriteBatcher("test", flush, max_batch=64, max_delay_ms=100)
+    try:
+        start = time.monotonic()
+        assert batcher.submit(7) == 70
+        elapsed = time.monotonic() - start
+        assert 0.09 <= elapsed < 2
+        assert flush.batches == [[7]]
+    finally:
+        batcher.close()
+
+
+def test_writes_queued_during_a_flush_do_not_wait_a_new_window():
+    flush = RecordingFlush(delay=0.4)
+    batcher = WriteBatcher("test", flush, max_batch=64, max_delay_ms=100)
+    try:
+        first = threading.Thread(target=batcher.submit, args=(1,))
+        first.start()
+        # Queued while the first batch is being written (it flushes at ~0.1s and takes 0.4s)
+        time.sleep(0.25)
+        assert batcher.submit(2) == 20
+        first.join()
+        assert flush.batches == [[1], [2]]
+        # The second window opened at ~0.25s and closed during the first flush,
+        # so the second batch starts as soon as the first one finishes
+        first_end = flush.started[0] + flush.delay
+        assert flush.started[1] - first_end < 0.05
+    finally:
+        batcher.close()
+
+
+def test_errors_are_delivered_per_item():
+    def flush(items):
+        return [ValueError(f"bad {item}") if item % 2 else item for item in items]
+
+    batcher = WriteBatcher("test", flush, max_batch=2, max_delay_ms=10000)
+    try:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            good, bad = pool.submit(batcher.submit, 2), pool.submit(batcher.submit, 3)
+            assert good.result() == 2
+            with pytest.raises(ValueError, match="bad 3"):
+                bad.result()
+    finally:
+        batcher.close()
+
+
+def test_a_failing_flush_fails_the_whole_batch_and_the_worker_survives():
+    calls = []
+
+    def flush(items):
+        calls.append(items)
+        if len(calls) == 1:
+            raise RuntimeError("database is down")
+        return items
+
+    batcher = WriteBatcher("test", flush, max_batch=64, max_delay_ms=10)
+    try:
+        with pytest.raises(RuntimeError, match="database is down"):
+            batcher.submit("a")
+        assert batcher.submit("b") == "b"
+    finally:
+        batcher.close()
+
+
+def test_close_flushes_queued_writes():
+    flush = RecordingFlush()
+    batcher = WriteBatcher("test", flush, max_batch=64, max_delay_ms=60000)
+    waiter = threading.Thread(target=batcher.submit, args=(5,))
+    waiter.start()
+    time.sleep(0.05)
+    batcher.close()
+    waiter.join(timeout=5)
+    assert not waiter.is_alive()
+    assert flush.batches == [[5]]
+
+
+def test_insert_batch_falls_back_to_savepoints_when_one_row_fails(client):
+    good = [_values(f"Batch {n}") for n in range(3)]
+    # NOT NULL violation: fails the executemany, then only its own savepoint
+    bad = {**good[0], "title": None}
+    with SessionLocal() as db:
+        start = change_log.current_version(db)
+    results = insert_expense_batch([good[0], bad, good[1], good[2]])
+
+    assert len(results) == 4
+    assert isinstance(results[1], Exception)
+    inserted = [results[0], results[2], results[3]]
+    assert [row.title for row in inserted] == ["Batch 0", "Batch 1", "Batch 2"]
+    with SessionLocal() as db:
+        ids = [row.id for row in inserted]
+        assert db.execute(select(Expense.title).where(Expense.id.in_(ids)).order_by(Expense.id)).scalars().all() \
+            == ["Batch 0", "Batch 1", "Batch 2"]
+        logged = db.execute(select(ExpenseChange.expense_id).where(ExpenseChange.version > start)).scalars().all()
+        assert sorted(logged) == sorted(ids)
+
+
+def test_insert_batch_uses_one_statement_when_every_row_is_valid(client):
+    results = insert_expense_batch([_values(f"Fast {n}") for n in range(3)])
+    assert [row.title for row in results] == ["Fast 0", "Fast 1", "Fast 2"]
+    assert results[0].id < results[1].id < results[2].id
+
+
+def test_batched_route_returns_each_callers_row(client, monkeypatch):
+    monkeypatch.setattr(settings, "WRITE_BATCHING", True)
+    titles = [f"Concurrent {n}" for n in range(8)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        responses = list(pool.map(lambda title: client.post("/expenses", json=expense(title)), titles))
+    assert [response.status_code for response in responses] == [200] * 8
+    assert [response.json()["title"] for response in responses] == titles
+    assert len({response.json()["id"] for response in responses}) == 8
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Move old expenses into the Parquet archive (see app.services.archive).
+
+    python -m tools.archive                      # older than ARCHIVE_AFTER_DAYS
+    python -m tools.archive --before 2024-01-01
+    python -m tools.archive --list
+
+Run it from cron or a scheduled job; each run writes one file. Uses
+DATABASE_URL and the ARCHIVE_* settings, like the application.
+"""
+import argparse
+import sys
+from datetime import date, timedelta
+from typing import List, Optional
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from app.config import settings
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--before", type=date.fromisoformat,
+                        help="Archive expenses dated before this day (default: today - ARCHIVE_AFTER_DAYS)")
+    parser.add_argument("--list", action="store_true", help="List the archive files instead")
+    args = parser.parse_args(argv)
+
+    from sqlalchemy import select
+    from app.models import ExpenseArchive
+    from app.services import archive
+    from app.utils.database import SessionLocal, engine
+
+    with SessionLocal() as db:
+        if args.list:
+            for entry in db.execute(select(ExpenseArchive).order_by(ExpenseArchive.first_date)).scalars():
+                print(f"{entry.name}  {entry.first_date}..{entry.last_date}  "
+                      f"{entry.row_count} rows  {entry.size_bytes} bytes")
+        else:
+            cutoff = args.before or date.today() - timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+            entry = archive.archive_expenses(db, cutoff)
+            db.commit()
+            if entry is None:
+                print(f"No expenses dated before {cutoff}")
+            else:
+                print(f"Archived {entry.row_count} expenses ({entry.first_date}..{entry.last_date}) "
+                      f"to {entry.name}, {entry.size_bytes} bytes")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Index advisor for the expenses table.
+
+Drives the real API routes in-process, captures every SELECT they issue,
+runs EXPLAIN on each one (SQLite: EXPLAIN QUERY PLAN, PostgreSQL:
+EXPLAIN (FORMAT JSON)) and reports:
+
+- which indexes the route queries actually use
+- indexes that are duplicates, prefixes of a composite index, or shadow the primary key
+- a proposed minimal index set (used indexes minus redundant ones)
+
+    python -m tools.index_advisor                       # seeded temp SQLite database
+    python -m tools.index_advisor --database-url postgresql://... --json report.json
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+TABLE = "expenses"
+
+# Requests that exercise every query shape the API can produce
+WORKLOAD: List[Tuple[str, str, Dict]] = [
+    ("GET", "/expenses", {}),
+    ("GET", "/expenses", {"sort_by": "amount"}),
+    ("GET", "/expenses", {"sort_by": "title", "sort_order": "asc"}),
+    ("GET", "/expenses", {"sort_by": "created_at"}),
+    ("GET", "/expenses", {"category": "Food"}),
+    ("GET", "/expenses", {"category": "Food", "date_from": "2025-01-01", "date_to": "2025-03-31"}),
+    ("GET", "/expenses", {"date_from": "2025-01-01", "date_to": "2025-01-31"}),
+    ("GET", "/expenses", {"date_from": "2025-01-01", "min_amount": 500, "sort_by": "amount"}),
+    ("GET", "/expenses", {"min_amount": 1000, "max_amount": 2000}),
+    ("GET", "/expenses", {"search": "coffee"}),
+    ("GET", "/expenses/{id}", {}),
+    ("GET", "/expenses/stats/summary", {}),
+    ("GET", "/expenses/categories/list", {}),
+    ("GET", "/expenses/analytics/category-breakdown", {}),
+    ("GET", "/expenses/analytics/monthly-trends", {}),
+    ("GET", "/ai/spending-trends", {"days": 30}),
+    ("GET", "/dashboard", {}),
+    ("GET", "/expenses/changes", {"since": 0, "limit": 500}),
+    ("GET", "/expenses", {"category": "Food,Shopping", "date_range": "2025-01-01..2025-03-31"}),
+    ("POST", "/ai/insights", {}),
+    ("POST", "/ai/savings-suggestions", {}),
+    ("POST", "/ai/chat", {"message": "How is my spending?"}),
+]
+
+_SQLITE_INDEX = re.compile(r"USING (?:COVERING )?INDEX (\w+)")
+_SQLITE_PK = re.compile(r"USING INTEGER PRIMARY KEY")
+
+
+def capture_queries(app, engine, expense_id: int) -> Dict[str, Tuple[str, object, Set[str]]]:
+    """Run the workload and collect distinct SELECT statements with sample parameters"""
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+
+    captured: Dict[str, Tuple[str, object, Set[str]]] = {}
+    current_route = {"name": ""}
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and f" {TABLE}" in statement:
+            entry = captured.setdefault(statement, (statement, parameters, set()))
+            entry[2].add(current_route["name"])
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        with TestClient(app) as client:
+            for method, path, params in WORKLOAD:
+                path = path.replace("{id}", str(expense_id))
+                current_route["name"] = f"{method} {path}" + (f"?{params}" if params else "")
+                client.request(method, path, params=params)
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+    return captured
+
+
+def explain(conn, statement: str, parameters) -> Tuple[List[str], Set[str], bool]:
+    """Return (plan lines, index names used, whether the table is scanned in full)"""
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+        lines = [row[-1] for row in rows]
+        used = {match for line in lines for match in _SQLITE_INDEX.findall(line)}
+        if any(_SQLITE_PK.search(line) for line in lines):
+            used.add("PRIMARY KEY")
+        full_scan = any(re.fullmatch(rf"SCAN {TABLE}", line.strip()) for line in lines)
+        return lines, used, full_scan
+
+    if dialect == "postgresql":
+        plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        lines, used, full_scan = [], set(), False
+
+        def walk(node, depth=0):
+            nonlocal full_scan
+            relation = node.get("Relation Name", "")
+            index = node.get("Index Name")
+            lines.append("  " * depth + node["Node Type"] + (f" on {relation}" if relation else "")
+                         + (f" using {index}" if index else ""))
+            if index:
+                used.add(index)
+            if node["Node Type"] == "Seq Scan" and relation.startswith(TABLE):
+                full_scan = True
+            for child in node.get("Plans", []):
+                walk(child, depth + 1)
+
+        walk(plan[0]["Plan"])
+        return lines, used, full_scan
+
+    raise SystemExit(f"EXPLAIN parsing is not implemented for {dialect}")
+
+
+def inventory(engine) -> Tuple[Dict[str, Tuple[str, ...]], Tuple[str, ...]]:
+    """Declared indexes on the table as {name: columns}, plus the primary key columns"""
+    from sqlalchemy import inspect
+
+    inspector = inspect(engine)
+    indexes = {ix["name"]: tuple(ix["column_names"]) for ix in inspector.get_indexes(TABLE)}
+    primary_key = tuple(inspector.get_pk_constraint(TABLE)["constrained_columns"])
+    return indexes, primary_key
+
+
+def find_redundant(indexes: Dict[str, Tuple[str, ...]], primary_key: Tuple[str, ...]) -> Dict[str, str]:
+    """Map redundant index name -> reason"""
+    redundant: Dict[str, str] = {}
+    names = sorted(indexes)
+    for name in names:
+        columns = indexes[name]
+        if columns == primary_key:
+            redundant[name] = f"duplicates the primary key ({', '.join(columns)})"
+            continue
+        for other in names:
+            if other == name or other in redundant:
+                continue
+            other_columns = indexes[other]
+            if other_columns == columns and other < name:
+                redundant[name] = f"duplicate of {other} ({', '.join(columns)})"
+                break
+            if len(other_columns) > len(columns) and other_columns[:len(columns)] == columns:
+                redundant[name] = f"leading prefix of {other} ({', '.join(other_columns)})"
+                break
+    return redundant
+
+
+def analyse(engine, captured) -> Dict:
+    indexes, primary_key = inventory(engine)
+    usage: Dict[str, Set[str]] = defaultdict(set)
+    queries = []
+
+    with engine.connect() as conn:
+        for statement, parameters, routes in captured.values():
+            lines, used, full_scan = explain(conn, statement, parameters)
+            for index in used:
+                usage[index].update(routes)
+            queries.append({
+                "routes": sorted(routes),
+                "statement": " ".join(statement.split()),
+                "plan": lines,
+                "indexes": sorted(used),
+                "full_scan": full_scan,
+            })
+
+    redundant = find_redundant(indexes, primary_key)
+    unused = sorted(name for name in indexes if name not in usage)
+    proposed = sorted(name for name in indexes if name in usage and name not in redundant)
+    # A redundant index the planner picked today is served by the index that covers it
+    for name in sorted(usage):
+        reason = redundant.get(name, "")
+        if reason.startswith("leading prefix of "):
+            covering = reason.split()[3]
+            if covering not in proposed:
+                proposed.append(covering)
+
+    return {
+        "table": TABLE,
+        "dialect": engine.dialect.name,
+        "indexes": {name: list(columns) for name, columns in indexes.items()},
+        "primary_key": list(primary_key),
+        "usage": {name: sorted(routes) for name, routes in usage.items()},
+        "unused": unused,
+        "redundant": redundant,
+        "proposed": sorted(proposed),
+        "drop": sorted(name for name in indexes if name not in proposed),
+        "queries": queries,
+    }
+
+
+def print_report(report: Dict) -> None:
+    print(f"\nIndexes on {report['table']} ({report['dialect']}):")
+    for name, columns in sorted(report["indexes"].items()):
+        routes = report["usage"].get(name, [])
+        status = f"used by {len(routes)} route(s)" if routes else "UNUSED"
+        note = f"  [redundant: {report['redundant'][name]}]" if name in report["redundant"] else ""
+        print(f"  {name:<28} ({', '.join(columns)}) - {status}{note}")
+
+    full_scans = [q for q in report["queries"] if q["full_scan"]]
+    if full_scans:
+        print("\nQueries that scan the whole table:")
+        for query in full_scans:
+            print(f"  {', '.join(query['routes'])}")
+            print(f"    {query['statement'][:160]}")
+
+    print("\nProposed index set: " + (", ".join(report["proposed"]) or "(primary key only)"))
+    print("Candidates to drop:  " + (", ".join(report["drop"]) or "(none)"))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Analyse this database instead of a seeded temp SQLite file")
+    parser.add_argument("--rows", type=int, default=20000, help="Rows to seed into the temp database")
+    parser.add_argument("--json", dest="json_path", help="Also write the full report (plans included) as JSON")
+    args = parser.parse_args(argv)
+
+    tmpdir = None
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        tmpdir = tempfile.TemporaryDirectory()
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir.name, 'advisor.db')}"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    # The engine is created from DATABASE_URL at import time
+    from app.main import app
+    from app.utils.database import engine, init_schema
+
+    init_schema()
+    if tmpdir is not None:
+        from benchmarks.datagen import populate
+        populate(engine, args.rows)
+        with engine.begin() as conn:
+            # Give the SQLite planner statistics, as a long-running database would have
+            conn.exec_driver_sql("ANALYZE")
+
+    with engine.connect() as conn:
+        expense_id = conn.exec_driver_sql(f"SELECT MIN(id) FROM {TABLE}").scalar() or 1
+
+    report = analyse(engine, capture_queries(app, engine, expense_id))
+    print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, "w") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"\nFull report written to {args.json_path}")
+
+    engine.dispose()
+    if tmpdir is not None:
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Manage the monthly partitions of the expenses table (PostgreSQL only).
+
+    python -m tools.partitions enable                  # rebuild expenses as a partitioned table
+    python -m tools.partitions list
+    python -m tools.partitions create --months-ahead 6 # pre-create future months
+    python -m tools.partitions detach 2024-01          # move a month to the Parquet archive
+    python -m tools.partitions detach 2024-01 --drop   # ... and drop the detached table
+    python -m tools.partitions disable                 # back to a plain table
+
+Uses DATABASE_URL, like the application.
+"""
+import argparse
+import sys
+from datetime import date, datetime
+from typing import List, Optional
+
+
+def _month(value: str) -> date:
+    try:
+        return datetime.strptime(value, "%Y-%m").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{value}' is not a month (expected YYYY-MM)")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from app.config import settings
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name in ("enable", "create"):
+        command = commands.add_parser(name)
+        command.add_argument("--months-ahead", type=int, default=settings.PARTITION_MONTHS_AHEAD,
+                             help="Future months to create partitions for")
+    commands.add_parser("list")
+    detach = commands.add_parser("detach")
+    detach.add_argument("month", type=_month, help="Month to detach (YYYY-MM)")
+    detach.add_argument("--drop", action="store_true",
+                        help="Drop the detached table once its rows are written to the archive")
+    commands.add_parser("disable")
+    args = parser.parse_args(argv)
+
+    from sqlalchemy import text
+    from app.services import partitions
+    from app.utils.database import SessionLocal, engine
+
+    with SessionLocal() as db:
+        if args.command == "enable":
+            created = partitions.enable(db, args.months_ahead)
+            print(f"Partitioned expenses: {', '.join(created)}" if created else "expenses is already partitioned")
+        elif args.command == "create":
+            if not partitions.is_partitioned(db):
+                sys.exit("expenses is not partitioned (run `python -m tools.partitions enable` first)")
+            created = partitions.ensure_partitions(db, args.months_ahead)
+            print(f"Created: {', '.join(created)}" if created else "All partitions already exist")
+        elif args.command == "list":
+            for name, bound in partitions.list_partitions(db):
+                print(f"{name:24} {bound}")
+        elif args.command == "detach":
+            # Writes the month to the archive first; raises (and nothing is dropped) if that fails
+            name = partitions.detach(db, args.month)
+            if args.drop:
+                db.execute(text(f"DROP TABLE {name}"))
+                print(f"Detached {name}, archived its rows and dropped it")
+            else:
+                print(f"Detached {name} and archived its rows; drop the table when done")
+        elif args.command == "disable":
+            partitions.disable(db)
+            print("expenses is a plain table")
+        db.commit()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])